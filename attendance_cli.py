@@ -0,0 +1,247 @@
+"""Headless command-line access to the employee attendance database.
+
+Runs the monthly payroll and low-attendance reports, imports and exports
+attendance, and performs database maintenance through the same DB layer as
+the desktop app, without importing Tk, tkcalendar or matplotlib, so it can be
+scheduled from cron. Results are streamed to stdout as CSV (with a header
+row) or as JSON Lines (one object per row).
+
+    python attendance_cli.py payroll 2026-01:2026-12 > payroll_2026.csv
+    python attendance_cli.py payroll 2022-01:2026-12 --workers 8 > payroll_5_years.csv
+    python attendance_cli.py --format json low-attendance 2026-09 --threshold 60
+    python attendance_cli.py export --output attendance.csv
+    python attendance_cli.py export --changes --output changes_today.csv
+    python attendance_cli.py import punches.csv
+    python attendance_cli.py import --employees new_hires.xlsx
+    python attendance_cli.py delete-employees 1041 1042 1057
+    python attendance_cli.py maintenance rebuild-summary
+    python attendance_cli.py archive 2022 2023
+    python attendance_cli.py archive 2022 --restore
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+from datetime import datetime
+
+import emp_attendance_trackerr as tracker
+
+
+def parse_months(spec):
+    """Parses 'YYYY-MM' or an inclusive range 'YYYY-MM:YYYY-MM' into [(year, month), ...]."""
+    try:
+        first, _, last = spec.partition(":")
+        start = datetime.strptime(first, "%Y-%m")
+        end = datetime.strptime(last, "%Y-%m") if last else start
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM or YYYY-MM:YYYY-MM, got {spec!r}")
+    if end < start:
+        raise argparse.ArgumentTypeError(f"range {spec!r} ends before it starts")
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class RowWriter:
+    """Writes rows to a stream as CSV with a header, or as JSON Lines."""
+    def __init__(self, stream, fields, output_format):
+        self.stream = stream
+        self.fields = fields
+        self.output_format = output_format
+        if output_format == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(fields)
+
+    def write(self, row):
+        if self.output_format == "csv":
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(dict(zip(self.fields, row))) + "\n")
+
+
+def run_payroll(args, out):
+    writer = RowWriter(out, ["year_month", "employee_id", "name", "present_days", "percentage", "salary"], args.format)
+    months = [m for spec in args.months for m in spec]
+    for rows in tracker.iter_payroll_report(months, args.employee or None, args.workers, args.shard):
+        for row in rows:
+            writer.write(row)
+
+
+def run_low_attendance(args, out):
+    writer = RowWriter(out, ["year_month", "employee_id", "name", "present_days", "percentage"], args.format)
+    for year, month in [m for spec in args.months for m in spec]:
+        _, _, days_in_month = tracker.month_window(year, month)
+        year_month = tracker.year_month_key(year, month)
+        for emp_id, name, present_days in tracker.get_employees_low_attendance(year, month, args.threshold):
+            percentage = tracker.attendance_percentage_for(present_days, days_in_month)
+            writer.write([year_month, emp_id, name, present_days, round(percentage, 2)])
+
+
+def run_export(args, out):
+    stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else out
+    try:
+        if args.changes:
+            # The watermark only moves once every row has been written
+            with tracker.pending_attendance_changes() as (_, chunks):
+                write_rows(RowWriter(stream, ["employee_id", "name", "date", "status", "change"], args.format), chunks)
+        else:
+            write_rows(RowWriter(stream, ["employee_id", "name", "date", "status"], args.format), tracker.iter_attendance_chunks())
+    finally:
+        if args.output:
+            stream.close()
+
+
+def write_rows(writer, chunks):
+    for rows in chunks:
+        for row in rows:
+            writer.write(row)
+
+
+def run_import(args, out):
+    """Upserts attendance (or with --employees, employees) from a CSV or XLSX file."""
+    importer = tracker.import_employees if args.employees else tracker.import_attendance
+    summary = importer(args.file, reject_path=args.rejects)
+    if summary["rejected"]:
+        print(f"{args.file}: {summary['rejected']} rows rejected, see {summary['reject_path']}", file=sys.stderr)
+    writer = RowWriter(out, ["rows", "inserted", "updated", "rejected"], args.format)
+    writer.write([summary["rows"], summary["inserted"], summary["updated"], summary["rejected"]])
+
+
+def run_delete_employees(args, out):
+    """Deletes the given employees and all their attendance in one transaction."""
+    deleted = tracker.delete_employees(args.ids)
+    if deleted < len(set(args.ids)):
+        print(f"{len(set(args.ids)) - deleted} of the IDs matched no employee", file=sys.stderr)
+    RowWriter(out, ["deleted"], args.format).write([deleted])
+
+
+MAINTENANCE_ACTIONS = {
+    "rebuild-summary": "Recompute the attendance_monthly summary table",
+    "analyze": "Refresh the query planner statistics",
+    "optimize": "Run PRAGMA optimize",
+    "integrity-check": "Run PRAGMA integrity_check",
+    "vacuum": "Rebuild the database file to reclaim free space",
+    "checkpoint": "Copy the WAL into the database and truncate the -wal file",
+    "storage-bitmap": "Move attendance into compact per employee-month bitmaps",
+    "storage-rows": "Move attendance back to one row per employee per day",
+}
+
+
+def run_maintenance(args, out):
+    writer = RowWriter(out, ["action", "result"], args.format)
+    conn = tracker.get_connection()
+    if args.action == "rebuild-summary":
+        tracker.rebuild_attendance_monthly()
+        writer.write([args.action, "ok"])
+    elif args.action == "analyze":
+        conn.execute("ANALYZE")
+        writer.write([args.action, "ok"])
+    elif args.action == "optimize":
+        conn.execute("PRAGMA optimize")
+        writer.write([args.action, "ok"])
+    elif args.action == "integrity-check":
+        for (result,) in conn.execute("PRAGMA integrity_check"):
+            writer.write([args.action, result])
+    elif args.action == "vacuum":
+        conn.execute("VACUUM")
+        writer.write([args.action, "ok"])
+    elif args.action == "checkpoint":
+        busy, wal_pages, checkpointed = tracker.checkpoint_wal("TRUNCATE")
+        writer.write([args.action, "busy" if busy else f"{checkpointed} of {wal_pages} pages"])
+    elif args.action in ("storage-bitmap", "storage-rows"):
+        moved = tracker.migrate_attendance_storage(args.action.split("-")[1])
+        writer.write([args.action, f"{moved} records moved"])
+
+
+def run_archive(args, out):
+    """Archives (or with --restore, restores) the given years, or lists the archives when none are given."""
+    if not args.years:
+        writer = RowWriter(out, ["year", "file", "records", "archived_at"], args.format)
+        for row in tracker.get_attendance_archives():
+            writer.write(row)
+        return
+    writer = RowWriter(out, ["year", "action", "records"], args.format)
+    for year in args.years:
+        if args.restore:
+            writer.write([year, "restored", tracker.restore_archived_year(year)])
+        else:
+            writer.write([year, "archived", tracker.archive_year(year)])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless payroll, report, import/export and maintenance runs.")
+    parser.add_argument("--db", default=tracker.DB_NAME, help="database file (default: %(default)s)")
+    parser.add_argument("--profile", choices=list(tracker.CONNECTION_PROFILES), default=tracker.DB_PROFILE,
+                        help="connection settings (default: %(default)s, or $ATTENDANCE_DB_PROFILE)")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv",
+                        help="output format; json writes one object per line (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    payroll = commands.add_parser("payroll", help="monthly attendance percentage and salary per employee")
+    payroll.add_argument("months", nargs="+", type=parse_months, help="YYYY-MM or YYYY-MM:YYYY-MM")
+    payroll.add_argument("--employee", type=int, action="append", help="only this employee ID (repeatable)")
+    payroll.add_argument("--workers", type=int, default=1,
+                         help="processes computing the report, for long ranges on large databases (default: %(default)s)")
+    payroll.add_argument("--shard", choices=[tracker.SHARD_BY_MONTH, tracker.SHARD_BY_EMPLOYEES],
+                         help="split the work by month or by employee ID range (default: by month when there are "
+                              "at least as many months as workers)")
+    payroll.set_defaults(run=run_payroll)
+
+    low = commands.add_parser("low-attendance", help="employees below an attendance threshold")
+    low.add_argument("months", nargs="+", type=parse_months, help="YYYY-MM or YYYY-MM:YYYY-MM")
+    low.add_argument("--threshold", type=float, default=50, help="percentage (default: %(default)s)")
+    low.set_defaults(run=run_low_attendance)
+
+    export = commands.add_parser("export", help="every attendance record, ordered by name and date")
+    export.add_argument("--output", help="write to this file instead of stdout")
+    export.add_argument("--changes", action="store_true",
+                        help="only records new, updated or deleted since the last --changes export, with a change column")
+    export.set_defaults(run=run_export)
+
+    importer = commands.add_parser("import", help="upsert attendance (Employee ID or Name, Date, Status) from a CSV or XLSX file")
+    importer.add_argument("file")
+    importer.add_argument("--employees", action="store_true",
+                          help="import employees (Employee ID, Employee Name, Join Date, Salary, Password) instead")
+    importer.add_argument("--rejects", help="file for rows that cannot be imported (default: FILE with .rejects.csv)")
+    importer.set_defaults(run=run_import)
+
+    delete = commands.add_parser("delete-employees", help="delete employees and all their attendance records")
+    delete.add_argument("ids", nargs="+", type=int, metavar="ID")
+    delete.set_defaults(run=run_delete_employees)
+
+    maintenance = commands.add_parser("maintenance", help="database upkeep")
+    maintenance.add_argument("action", choices=list(MAINTENANCE_ACTIONS),
+                             help="; ".join(f"{name}: {text}" for name, text in MAINTENANCE_ACTIONS.items()))
+    maintenance.set_defaults(run=run_maintenance)
+
+    archive = commands.add_parser("archive", help="move closed years of attendance into per-year database files")
+    archive.add_argument("years", nargs="*", type=int, help="years to archive (none: list the archives)")
+    archive.add_argument("--restore", action="store_true", help="move the years back into the main database")
+    archive.set_defaults(run=run_archive)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    tracker.DB_NAME = args.db
+    tracker.DB_PROFILE = args.profile
+    try:
+        tracker.init_db(preload_dummy_data=False)
+        args.run(args, sys.stdout)
+    except sqlite3.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError: # e.g. piped into `head`
+        sys.stderr.close()
+    except (OSError, ValueError) as e: # e.g. an import file that is missing or lacks a needed column
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Per-year archive databases: live database size, query latency and equivalence.
+
+Generates a dataset, runs the report, history and export queries, then
+moves every closed year into its own archive file with archive_year() and
+runs them again. Every query must return exactly what it returned before
+archiving, with the archives attached on demand; writes to an archived year
+must be refused, and deleting an employee must also delete their archived
+records. Restoring every year must reproduce the original records. Both
+storages are measured; the script exits non-zero on any mismatch. Sizes
+are of VACUUM INTO copies, so free pages left by the move are not counted.
+
+    python benchmarks/bench_archive.py [--employees 2000] [--years 3] [--calls 200] [--storage rows bitmap]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from common import per_call_us, report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def compact_size_mb():
+    path = os.path.join(tempfile.mkdtemp(prefix="attendance_vacuum_"), "copy.db")
+    tracker.get_connection().execute("VACUUM INTO ?", (path,))
+    size = os.path.getsize(path) / 2**20
+    os.remove(path)
+    return size
+
+
+def all_records():
+    """Every record, live and archived, as {(employee_id, date): status}."""
+    return {(emp_id, date): status for rows in tracker.iter_attendance_chunks() for emp_id, _, date, status in rows}
+
+
+def full_history(emp_id):
+    """An employee's history read page by page, like the employee view does."""
+    pages, before = [], None
+    while True:
+        page = tracker.get_attendance_page(emp_id, before)
+        if not page:
+            return pages
+        pages.append(page)
+        before = page[-1][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--storage", nargs="+", default=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP],
+                        choices=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+    args = parser.parse_args()
+
+    failures = []
+    for storage in args.storage:
+        use_temp_db()
+        with tracker.pending_attendance_changes():
+            pass # Starts the change log, as a first incremental export would
+        generate(args.employees, args.years)
+        if storage == tracker.STORAGE_BITMAP:
+            tracker.migrate_attendance_storage(storage)
+        rng = random.Random(1)
+        conn = tracker.get_connection()
+        employee_ids = [row[0] for row in conn.execute("SELECT id FROM employees")]
+        months = [tuple(map(int, ym.split("-"))) for (ym,) in
+                  conn.execute(f"SELECT DISTINCT year_month FROM {tracker._monthly_counts_source()} ORDER BY year_month")]
+        # The employee with the oldest record has history in the archived years
+        emp_id = conn.execute(f"SELECT employee_id FROM {tracker._attendance_days_source()} ORDER BY date LIMIT 1").fetchone()[0]
+        dates = sorted(row[0] for row in conn.execute(
+            f"SELECT date FROM {tracker._attendance_days_source()} WHERE employee_id = ?", (emp_id,)))
+        emp_months = [(rng.choice(employee_ids),) + rng.choice(months) for _ in range(args.calls)]
+        sample_dates = [rng.choice(dates) for _ in range(args.calls)]
+        closed_years = sorted({year for year, _ in months if year < time.localtime().tm_year})
+
+        queries = {
+            "get_monthly_status_counts": lambda i: tracker.get_monthly_status_counts(*emp_months[i]),
+            "get_monthly_payroll": lambda i: tracker.get_monthly_payroll(*months[i % len(months)]),
+            "get_employees_low_attendance": lambda i: tracker.get_employees_low_attendance(*months[i % len(months)], 60),
+            "get_attendance_by_date": lambda i: tracker.get_attendance_by_date(sample_dates[i]),
+            "get_attendance_page (first page)": lambda i: tracker.get_attendance_page(emp_months[i][0]),
+            "get_attendance_page (whole history)": lambda i: full_history(emp_months[i][0]),
+            "get_attendance_by_employee": lambda i: tracker.get_attendance_by_employee(emp_months[i][0]),
+            "count_attendance_records": lambda i: tracker.count_attendance_records(),
+        }
+        if tracker.load_numpy():
+            queries["load_attendance_matrix (12 months)"] = lambda i: tracker.load_attendance_matrix(
+                *months[i % len(months)], months=12).payroll()
+        heavy = {"get_monthly_payroll", "get_employees_low_attendance", "get_attendance_by_date",
+                 "count_attendance_records", "load_attendance_matrix (12 months)"}
+
+        def measure(label):
+            results = {}
+            for name, query in queries.items():
+                calls = max(1, args.calls // 20) if name in heavy else args.calls
+                tracker.clear_caches()
+                results[name] = [query(i) for i in range(calls)]
+                counter = iter(range(10**9))
+                report(f"[{storage}, {label}] {name}", per_call_us(lambda: query(next(counter) % calls), calls), "us/call")
+            start = time.perf_counter()
+            results["export"] = all_records()
+            report(f"[{storage}, {label}] export (every record)", time.perf_counter() - start, "s")
+            return results
+
+        def compare(expected, actual, what):
+            for name, value in actual.items():
+                if value != expected[name]:
+                    failures.append(f"{storage}: {name} differs {what}")
+
+        report(f"[{storage}] live database size", compact_size_mb(), "MB")
+        live = measure("live")
+
+        start = time.perf_counter()
+        moved = sum(tracker.archive_year(year) for year in closed_years)
+        report(f"[{storage}] archive_year x {len(closed_years)} ({moved:,} records)", time.perf_counter() - start, "s")
+        report(f"[{storage}] live database size after archiving", compact_size_mb(), "MB")
+        report(f"[{storage}] archive files", sum(os.path.getsize(path) for _, path, _, _ in
+                                                tracker.get_attendance_archives()) / 2**20, "MB")
+        tracker.close_connection() # A fresh connection attaches the archives on demand
+        compare(live, measure("archived"), "with closed years archived")
+
+        try:
+            tracker.mark_attendance(emp_id, dates[0], "Present")
+            failures.append(f"{storage}: mark_attendance wrote to an archived year")
+        except ValueError:
+            pass
+
+        start = time.perf_counter()
+        restored = sum(tracker.restore_archived_year(year) for year in closed_years)
+        report(f"[{storage}] restore_archived_year x {len(closed_years)} ({restored:,} records)", time.perf_counter() - start, "s")
+        if restored != moved or all_records() != live["export"]:
+            failures.append(f"{storage}: restoring did not reproduce the records")
+
+        # Deleting an employee reaches into the archives and logs the deletes
+        for year in closed_years:
+            tracker.archive_year(year)
+        conn = tracker.get_connection()
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM attendance_changes").fetchone()[0]
+        tracker.delete_employee(emp_id)
+        tombstones = conn.execute("SELECT COUNT(*) FROM attendance_changes WHERE seq > ? AND employee_id = ? AND status IS NULL",
+                                  (seq, emp_id)).fetchone()[0]
+        expected = {key: status for key, status in live["export"].items() if key[0] != emp_id}
+        if tracker.get_attendance_by_employee(emp_id) or all_records() != expected:
+            failures.append(f"{storage}: delete_employee left archived records behind")
+        if tombstones != len(dates):
+            failures.append(f"{storage}: delete_employee logged {tombstones} deletes for {len(dates)} records")
+        for year in closed_years:
+            tracker.restore_archived_year(year)
+        if all_records() != expected:
+            failures.append(f"{storage}: restoring after delete_employee did not reproduce the records")
+
+    for failure in failures:
+        print(f"MISMATCH: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
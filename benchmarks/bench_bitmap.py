@@ -0,0 +1,103 @@
+"""Row storage vs bitmap storage of attendance: disk size, query latency and equivalence.
+
+Generates a dataset in the default row format, times the report and history
+queries, then migrates it to one attendance_bitmap row per employee-month
+and times them again. Every query must return exactly what it returned in
+row format, and migrating back must reproduce the original records; the
+script exits non-zero otherwise. Sizes are of a VACUUM INTO copy, so free
+pages left by the migration are not counted.
+
+    python benchmarks/bench_bitmap.py [--employees 2000] [--years 3] [--calls 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from common import per_call_us, report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def compact_size_mb():
+    path = os.path.join(tempfile.mkdtemp(prefix="attendance_vacuum_"), "copy.db")
+    tracker.get_connection().execute("VACUUM INTO ?", (path,))
+    size = os.path.getsize(path) / 2**20
+    os.remove(path)
+    return size
+
+
+def all_records():
+    return tracker.get_connection().execute(
+        f"SELECT employee_id, date, status FROM {tracker._attendance_days_source()} ORDER BY employee_id, date").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temp_db()
+    generate(args.employees, args.years)
+    rng = random.Random(1)
+    conn = tracker.get_connection()
+    employee_ids = [row[0] for row in conn.execute("SELECT id FROM employees")]
+    months = [tuple(map(int, ym.split("-"))) for (ym,) in
+              conn.execute("SELECT DISTINCT year_month FROM attendance_monthly ORDER BY year_month")][-12:]
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM attendance ORDER BY date DESC LIMIT 60")]
+    emp_months = [(rng.choice(employee_ids),) + rng.choice(months) for _ in range(args.calls)]
+
+    queries = {
+        "get_monthly_attendance_percentage (cold)": lambda i: (tracker.clear_caches(), tracker.get_monthly_attendance_percentage(*emp_months[i]))[1],
+        "get_monthly_status_counts (employee chart)": lambda i: tracker.get_monthly_status_counts(*emp_months[i]),
+        "get_employees_low_attendance": lambda i: tracker.get_employees_low_attendance(*months[i % len(months)], 60),
+        "get_monthly_payroll": lambda i: tracker.get_monthly_payroll(*months[i % len(months)]),
+        "get_attendance_by_employee": lambda i: tracker.get_attendance_by_employee(emp_months[i][0]),
+        "get_attendance_page": lambda i: tracker.get_attendance_page(emp_months[i][0], dates[i % len(dates)]),
+        "get_attendance_by_date": lambda i: tracker.get_attendance_by_date(dates[i % len(dates)]),
+        "count_attendance_records": lambda i: tracker.count_attendance_records(),
+    }
+    heavy = {"get_employees_low_attendance", "get_monthly_payroll", "get_attendance_by_date", "count_attendance_records"}
+
+    def measure(storage):
+        results = {}
+        for name, query in queries.items():
+            calls = max(1, args.calls // 20) if name in heavy else args.calls
+            results[name] = [query(i) for i in range(calls)]
+            counter = iter(range(10**9))
+            report(f"[{storage}] {name}", per_call_us(lambda: query(next(counter) % calls), calls), "us/call")
+        return results
+
+    def time_marks(storage, records):
+        """Flips the status of records one mark_attendance() call at a time."""
+        flips = [(emp_id, date, "Absent" if status == "Present" else "Present") for emp_id, date, status in records]
+        pending = list(reversed(flips))
+        report(f"[{storage}] mark_attendance", per_call_us(lambda: tracker.mark_attendance(*pending.pop()), len(flips)), "us/call")
+        return flips
+
+    original = all_records()
+    report("[rows] database size", compact_size_mb(), "MB")
+    rows_results = measure("rows")
+
+    moved = tracker.migrate_attendance_storage(tracker.STORAGE_BITMAP)
+    report("records migrated to bitmaps", moved, "records")
+    report("[bitmap] database size", compact_size_mb(), "MB")
+    failures = [name for name, value in measure("bitmap").items() if value != rows_results[name]]
+    for name in failures:
+        print(f"MISMATCH: {name} differs between row and bitmap storage")
+    sample = rng.sample(original, args.calls)
+    expected = {(emp_id, date): status for emp_id, date, status in original}
+    expected.update({(emp_id, date): status for emp_id, date, status in time_marks("bitmap", sample)})
+
+    tracker.migrate_attendance_storage(tracker.STORAGE_ROWS)
+    if all_records() != [key + (status,) for key, status in sorted(expected.items())]:
+        failures.append("round trip")
+        print("MISMATCH: migrating back to rows did not reproduce the records")
+    time_marks("rows", sample)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Throughput of marking a whole shift: one transaction per mark vs mark_attendance_bulk.
+
+"per-mark" issues UPSERT_ATTENDANCE_SQL in its own transaction for every
+employee, which is what calling mark_attendance in a loop does (without the
+dialogs).
+
+    python benchmarks/bench_bulk_mark.py [--employees 2000]
+"""
+import argparse
+import time
+
+from common import report, tracker, use_temp_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    args = parser.parse_args()
+
+    use_temp_db()
+    with tracker.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO employees (name, join_date, salary, password) VALUES (?, '2020-01-01', 50000, 'x')",
+            ((f"Shift Worker {i}",) for i in range(args.employees)))
+    employee_ids = [emp[0] for emp in tracker.get_employees()]
+
+    start = time.perf_counter()
+    for emp_id in employee_ids:
+        with tracker.transaction() as cursor:
+            cursor.execute(tracker.UPSERT_ATTENDANCE_SQL, (emp_id, "2030-01-01", "Present"))
+    per_mark = len(employee_ids) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    summary = tracker.mark_attendance_bulk((emp_id, "2030-01-02", "Present") for emp_id in employee_ids)
+    bulk = len(employee_ids) / (time.perf_counter() - start)
+    assert summary == {'inserted': len(employee_ids), 'updated': 0}, summary
+
+    start = time.perf_counter()
+    summary = tracker.mark_attendance_bulk((emp_id, "2030-01-02", "Absent") for emp_id in employee_ids)
+    bulk_update = len(employee_ids) / (time.perf_counter() - start)
+    assert summary == {'inserted': 0, 'updated': len(employee_ids)}, summary
+
+    report(f"one transaction per mark, {len(employee_ids):,} employees", per_mark, "marks/s")
+    report("mark_attendance_bulk, new records", bulk, "marks/s")
+    report("mark_attendance_bulk, overwriting records", bulk_update, "marks/s")
+
+
+if __name__ == "__main__":
+    main()
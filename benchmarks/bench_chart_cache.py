@@ -0,0 +1,106 @@
+"""Chart image cache: cache hit vs full query and render, and data-version invalidation checks.
+
+Times a cache hit (data version lookup plus PNG fetch) against a miss (the
+chart's queries, a render on an off-screen ChartPanel and the PNG encode)
+for the employee pie and the all-employees chart, in memory and with the
+disk tier. Then checks, in row and in bitmap storage, that marking
+attendance changes the version of exactly that month and that re-marking a
+day with the same status or changing a password does not. Exits non-zero
+if any check fails.
+
+    python benchmarks/bench_chart_cache.py [--employees 2000] [--calls 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+
+from bench_charts import OffscreenChartPanel
+from common import report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def median_ms(fn, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_db()
+    generate(args.employees, years=1)
+    today = date.today()
+    year, month = today.year, today.month
+    emp_id = tracker.get_employees()[0][0]
+    panel = OffscreenChartPanel(None)
+
+    def render(chart):
+        key = tracker.chart_cache_key(chart, emp_id if chart == 'employee' else None, year, month)
+        if chart == 'employee':
+            counts = tracker.get_monthly_status_counts(emp_id, year, month)
+            panel.show_pie("Employee", list(counts), list(counts.values()),
+                           [tracker.COLOR_PRIMARY, tracker.COLOR_ERROR][:len(counts)], [0.1, 0][:len(counts)])
+        else:
+            payroll = tracker.get_monthly_payroll_with_streaks(year, month)
+            panel.show_percentages("All employees", [row[1] for row in payroll], [row[3] for row in payroll])
+        return key, panel.render_png()
+
+    def hit(cache, chart):
+        png = cache.get(tracker.chart_cache_key(chart, emp_id if chart == 'employee' else None, year, month))
+        assert png is not None
+        return png
+
+    for disk in (False, True):
+        cache = tracker.ChartCache(disk=disk)
+        tier = "disk" if disk else "memory"
+        for chart in ('employee', 'monthly'):
+            report(f"{chart} chart, query and render (miss)", median_ms(lambda: render(chart), max(1, args.calls // 4)), "ms")
+            key, png = render(chart)
+            cache.put(key, png)
+            if disk:
+                cache = tracker.ChartCache(disk=True) # Fresh memory tier, as after a restart
+                report(f"{chart} chart, hit from disk after restart", median_ms(lambda: (cache.memory.clear(), hit(cache, chart)), args.calls) * 1000, "us")
+            report(f"{chart} chart, hit ({tier})", median_ms(lambda: hit(cache, chart), args.calls) * 1000, "us")
+            report(f"{chart} chart PNG size", len(png) / 1024, "KB")
+
+    failures = []
+    def check(name, condition):
+        if not condition:
+            failures.append(name)
+            print(f"FAILED: {name}")
+
+    other_month = (year, month - 1) if month > 1 else (year - 1, 12)
+    day = date(year, month, 1).isoformat()
+    for storage in (tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP):
+        tracker.migrate_attendance_storage(storage)
+        versions = lambda: (tracker.get_data_version(tracker.attendance_scope(year, month)),
+                            tracker.get_data_version(tracker.attendance_scope(*other_month)),
+                            tracker.get_data_version('employees'))
+        before = versions()
+        tracker.mark_attendance(emp_id, day, "Absent")
+        after_mark = versions()
+        check(f"[{storage}] marking bumps the month", after_mark[0] > before[0] and after_mark[1:] == before[1:])
+        tracker.mark_attendance(emp_id, day, "Absent")
+        check(f"[{storage}] re-marking the same status does not bump", versions() == after_mark)
+        tracker.mark_attendance_bulk([(emp_id, day, "Present")])
+        after_bulk = versions()
+        check(f"[{storage}] bulk marking bumps the month", after_bulk[0] > after_mark[0] and after_bulk[1:] == after_mark[1:])
+        tracker.update_employee_password(emp_id, "new password")
+        check(f"[{storage}] password change does not bump", versions() == after_bulk)
+    employee = tracker.get_employee_by_id(emp_id)
+    tracker.update_employee(emp_id, employee[1] + " Jr", employee[2], employee[3], employee[4])
+    check("renaming an employee bumps employees", versions()[2] > after_bulk[2])
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
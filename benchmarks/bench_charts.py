@@ -0,0 +1,78 @@
+"""Redraw time of the all-employees chart by headcount: a new figure per click vs the reused ChartPanel.
+
+The "rebuild" rows replay the old drawing code, which made a new figure
+and canvas, one bar and one text label per employee and ran tight_layout
+on every click. The "panel" rows update one ChartPanel in place. Above
+CHART_BAR_LIMIT employees the panel switches to a histogram, so its time
+should flatten out while the rebuild keeps growing. Both render to an
+off-screen Agg canvas, so no display is needed; rebuilds are skipped above
+--rebuild-limit employees, where they take many seconds each.
+
+    python benchmarks/bench_charts.py [--sizes 10 100 300 1000 10000 50000] [--redraws 5]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from common import report, tracker
+
+
+class OffscreenChartPanel(tracker.ChartPanel):
+    def _create_canvas(self, master):
+        return FigureCanvasAgg(self.figure)
+
+
+def rebuild_chart(names, percentages):
+    """The pre-ChartPanel bar chart: everything is created from scratch."""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    bars = ax.bar(names, percentages, color=tracker.COLOR_PRIMARY)
+    ax.set_ylim(0, 100)
+    ax.tick_params(axis='x', labelrotation=45)
+    for bar in bars:
+        yval = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2, yval + 1, f'{yval:.1f}%', ha='center', va='bottom', fontsize=8)
+    fig.tight_layout()
+    FigureCanvasAgg(fig).draw()
+
+
+def median_ms(fn, redraws):
+    samples = []
+    for _ in range(redraws):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 300, 1000, 10_000, 50_000])
+    parser.add_argument("--redraws", type=int, default=5)
+    parser.add_argument("--rebuild-limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    panel = OffscreenChartPanel(None)
+    for size in args.sizes:
+        names = [f"Employee {i}" for i in range(size)]
+        months = [[min(100.0, rng.gauss(85, 12)) for _ in range(size)] for _ in range(2)]
+        flip = iter(range(10**9))
+        if size <= args.rebuild_limit:
+            report(f"rebuild, {size:,} employees", median_ms(lambda: rebuild_chart(names, months[next(flip) % 2]), args.redraws), "ms")
+        # Alternate months so every redraw really changes the data
+        report(f"panel, {size:,} employees", median_ms(
+            lambda: panel.show_percentages("All employees", names, months[next(flip) % 2]), args.redraws), "ms")
+        panel.show_pie("One employee", ["Present", "Absent"], [20, 2], [tracker.COLOR_PRIMARY, tracker.COLOR_ERROR], (0.1, 0))
+        report(f"panel, pie after {size:,} employees", median_ms(
+            lambda: panel.show_pie("One employee", ["Present", "Absent"], [20, next(flip) % 5],
+                                   [tracker.COLOR_PRIMARY, tracker.COLOR_ERROR], (0.1, 0)), args.redraws), "ms")
+    report("panel artists after all sizes", len(panel.ax.get_children()), "artists")
+
+
+if __name__ == "__main__":
+    main()
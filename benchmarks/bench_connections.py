@@ -0,0 +1,50 @@
+"""Per-call latency of the DB functions: connect-per-call vs the pooled connection.
+
+The "before" numbers replay the original pattern (sqlite3.connect, one query,
+close) so both sides run exactly the same SQL. The result caches are cleared
+before every pooled call, so the figures measure the connection pool rather
+than cache hits.
+
+    python benchmarks/bench_connections.py [--calls N]
+"""
+import argparse
+import sqlite3
+
+from common import per_call_us, report, tracker, use_temp_db
+
+
+def connect_per_call(sql, params):
+    conn = sqlite3.connect(tracker.DB_NAME)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    use_temp_db()
+    cases = [
+        ("get_employee_by_id",
+         "SELECT id, name, join_date, salary, password FROM employees WHERE id = ?", (3,),
+         lambda: tracker.get_employee_by_id(3)),
+        ("get_employees",
+         "SELECT id, name, join_date, salary FROM employees ORDER BY name", (),
+         tracker.get_employees),
+        ("get_attendance_by_employee",
+         "SELECT date, status FROM attendance WHERE employee_id = ? ORDER BY date DESC", (3,),
+         lambda: tracker.get_attendance_by_employee(3)),
+    ]
+    for name, sql, params, pooled in cases:
+        before = per_call_us(lambda: connect_per_call(sql, params), args.calls)
+        after = per_call_us(lambda: (tracker.clear_caches(), pooled()), args.calls)
+        report(f"{name} (connect per call)", before, "us/call")
+        report(f"{name} (pooled connection)", after, "us/call")
+        report(f"{name} speedup", before / after, "x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Onboarding and offboarding: one call per employee vs the batch employee functions.
+
+Adds --employees employees with add_employee() one at a time and then with
+add_employees(), updates them all with update_employee() and
+update_employees(), and deletes employees with a year of attendance each
+(one closed year archived) with delete_employee() and delete_employees().
+Checks that both ways leave the same employees, that deleted employees
+leave no attendance, summary rows or archived records behind and that
+every deleted record is in the change log, that an invalid record makes a
+batch write nothing, and exits non-zero otherwise.
+
+    python benchmarks/bench_employee_batch.py [--employees 500] [--days 250]
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from common import report, tracker, use_temp_db
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    report(f"{label} ({count:,} employees)", elapsed * 1000, "ms")
+    return result
+
+
+def employees_table():
+    return tracker.get_connection().execute("SELECT name, join_date, salary, password FROM employees ORDER BY id").fetchall()
+
+
+def leftovers(emp_ids):
+    """Rows still held anywhere for the given employees, live or archived."""
+    conn = tracker.get_connection()
+    ids = ",".join(map(str, emp_ids))
+    count = sum(conn.execute(f"SELECT COUNT(*) FROM {table} WHERE employee_id IN ({ids})").fetchone()[0]
+                for table in ("attendance", "attendance_monthly", "attendance_bitmap"))
+    for year in tracker.archived_years():
+        schema = tracker._archive_schema(year)
+        count += sum(conn.execute(f"SELECT COUNT(*) FROM {schema}.{table} WHERE employee_id IN ({ids})").fetchone()[0]
+                     for table in ("attendance", "attendance_monthly"))
+    return count + conn.execute(f"SELECT COUNT(*) FROM employees WHERE id IN ({ids})").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=250, help="attendance days per deleted employee")
+    args = parser.parse_args()
+
+    failures = []
+    new_hires = [(f"New Hire {i}", "2026-01-05", 40000 + i, f"pw{i}") for i in range(args.employees)]
+    changed = [(name + " Jr", join_date, salary * 1.1, password) for name, join_date, salary, password in new_hires]
+    tables = {}
+    for mode in ("one by one", "batch"):
+        use_temp_db()
+        tracker.delete_employees([row[0] for row in tracker.get_employees()])
+        with tracker.pending_attendance_changes():
+            pass # Starts the change log, as a first incremental export would
+        if mode == "one by one":
+            ids = timed(f"[{mode}] add_employee", args.employees, lambda: [tracker.add_employee(*e) for e in new_hires])
+            timed(f"[{mode}] update_employee", args.employees,
+                  lambda: [tracker.update_employee(i, *e) for i, e in zip(ids, changed)])
+        else:
+            ids = timed(f"[{mode}] add_employees", args.employees, lambda: tracker.add_employees(new_hires))
+            missing = timed(f"[{mode}] update_employees", args.employees,
+                            lambda: tracker.update_employees([(i,) + e for i, e in zip(ids, changed)] + [(10**9,) + changed[0]]))
+            if missing != [10**9]:
+                failures.append(f"update_employees reported {missing} as missing")
+        tables[mode] = employees_table()
+
+        # A year of attendance each, the first half of it in an archived year
+        start = date(date.today().year - 1, 12, 31) - timedelta(days=args.days // 2)
+        records = [(emp_id, (start + timedelta(days=d)).isoformat(), "Present" if (emp_id + d) % 5 else "Absent")
+                   for emp_id in ids for d in range(args.days)]
+        tracker.mark_attendance_bulk(records)
+        tracker.archive_year(start.year)
+        seq = tracker.get_connection().execute("SELECT COALESCE(MAX(seq), 0) FROM attendance_changes").fetchone()[0]
+        if mode == "one by one":
+            deleted = timed(f"[{mode}] delete_employee", args.employees,
+                            lambda: sum(tracker.delete_employee(emp_id) for emp_id in ids))
+        else:
+            deleted = timed(f"[{mode}] delete_employees", args.employees, lambda: tracker.delete_employees(ids))
+        tombstones = tracker.get_connection().execute(
+            "SELECT COUNT(*) FROM attendance_changes WHERE seq > ? AND status IS NULL", (seq,)).fetchone()[0]
+        if deleted != len(ids) or leftovers(ids):
+            failures.append(f"{mode}: deleting left rows behind")
+        if tombstones != len(records):
+            failures.append(f"{mode}: {tombstones} deletes logged for {len(records)} records")
+
+    if tables["one by one"] != tables["batch"]:
+        failures.append("batch and one-by-one writes left different employees")
+    before = employees_table()
+    try:
+        tracker.add_employees(new_hires[:10] + [("Broken", "not a date", 1, "x")])
+        failures.append("add_employees accepted an invalid join date")
+    except ValueError:
+        pass
+    if employees_table() != before:
+        failures.append("a rejected add_employees batch wrote employees")
+
+    for failure in failures:
+        print(f"MISMATCH: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
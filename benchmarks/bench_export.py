@@ -0,0 +1,76 @@
+"""Excel export time and peak memory: fetchall + normal Workbook vs streaming export.
+
+The database is built once; each export then runs in its own child process
+so its peak RSS (ru_maxrss) is not polluted by the data generation or by
+the other mode.
+
+    python benchmarks/bench_export.py [--rows 5000000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+from common import fill_attendance, report, tracker, use_temp_db
+
+EXPORT_SQL = """
+    SELECT e.id, e.name, a.date, a.status
+    FROM employees e JOIN attendance a ON e.id = a.employee_id
+    ORDER BY e.name, a.date
+"""
+
+
+def legacy_export(file_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Attendance Data"
+    sheet.append(["Employee ID", "Employee Name", "Date", "Status"])
+    for record in tracker.get_connection().execute(EXPORT_SQL).fetchall():
+        sheet.append(record)
+    workbook.save(file_path)
+
+
+def run_child(mode, db_path):
+    tracker.DB_NAME = db_path
+    out_path = os.path.join(tempfile.mkdtemp(prefix="attendance_export_"), "export.xlsx")
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_export(out_path)
+    else:
+        tracker.export_attendance_to_excel(out_path)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed} {peak_mb}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--skip-legacy", action="store_true", help="only run the streaming export")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+
+    db_path = use_temp_db()
+    fill_attendance(args.rows, args.employees)
+    tracker.close_connection()
+
+    modes = ["streaming"] if args.skip_legacy else ["legacy", "streaming"]
+    for mode in modes:
+        output = subprocess.run([sys.executable, __file__, "--child", mode, db_path],
+                                check=True, capture_output=True, text=True).stdout.split()
+        elapsed, peak_mb = map(float, output[-2:])
+        report(f"{mode} export, {args.rows:,} rows", elapsed, "s")
+        report(f"{mode} export peak RSS", peak_mb, "MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Bulk import throughput: a 1M-row badge-reader CSV (and a smaller XLSX) through import_attendance().
+
+The punch file has an in and an out punch for every employee on every
+working day, as ISO timestamps with no status column, plus a few bad rows
+(unknown badges, garbled dates). It is imported into an empty attendance
+table, then imported again (every record already exists, so all upserts
+are updates). The same records are then written as an Excel file with a
+Status column and imported through the read-only openpyxl reader. Both
+storages are measured. Exits non-zero unless every good record landed
+with the right status and every bad row is in the reject file.
+
+    python benchmarks/bench_import.py [--rows 1000000] [--xlsx-rows 100000] [--storage rows bitmap]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import openpyxl
+
+from common import report, tracker, use_temp_db
+
+BAD_ROW_RATE = 0.001
+
+
+def make_punches(path, employee_ids, rows, rng):
+    """Writes the punch CSV and returns ({(employee_id, date): 'Present'}, number of bad rows)."""
+    expected, bad = {}, 0
+    day = date(2026, 1, 1)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Badge ID", "Punch Time"])
+        written = 0
+        while written < rows:
+            if day.weekday() < 5:
+                for emp_id in employee_ids:
+                    for hour in (8, 17):
+                        if written >= rows:
+                            break
+                        if rng.random() < BAD_ROW_RATE:
+                            writer.writerow(rng.choice([[999_999, f"{day} 08:00:00"], [emp_id, "31/02/2026"]]))
+                            bad += 1
+                        else:
+                            writer.writerow([emp_id, f"{day} {hour:02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"])
+                            expected[(emp_id, day.isoformat())] = "Present"
+                        written += 1
+            day += timedelta(days=1)
+    return expected, bad
+
+
+def make_workbook(path, expected, rows, rng):
+    """Writes up to `rows` records as an .xlsx with real dates and a Status column; returns them."""
+    records = {key: rng.choice(("Present", "Absent")) for key in list(expected)[:rows]}
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Attendance")
+    sheet.append(tracker.EXPORT_COLUMNS)
+    for (emp_id, day), status in records.items():
+        sheet.append([emp_id, "", date.fromisoformat(day), status])
+    workbook.save(path)
+    return records
+
+
+def stored_records():
+    return {(emp_id, day): status for emp_id, day, status in tracker.get_connection().execute(
+        f"SELECT employee_id, date, status FROM {tracker._attendance_days_source()}")}
+
+
+def timed_import(label, path, rows):
+    start = time.perf_counter()
+    summary = tracker.import_attendance(path)
+    elapsed = time.perf_counter() - start
+    report(f"{label} ({rows:,} rows)", elapsed, "s")
+    report(f"{label} throughput", rows / elapsed, "rows/s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--xlsx-rows", type=int, default=100_000)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--storage", nargs="+", default=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP],
+                        choices=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    work_dir = tempfile.mkdtemp(prefix="attendance_import_")
+    csv_path = os.path.join(work_dir, "punches.csv")
+    xlsx_path = os.path.join(work_dir, "attendance.xlsx")
+    failures = []
+    for storage in args.storage:
+        use_temp_db()
+        with tracker.transaction() as cursor:
+            cursor.execute("DELETE FROM attendance")
+            cursor.executemany(
+                "INSERT INTO employees (name, join_date, salary, password) VALUES (?, '2020-01-01', 50000, 'x')",
+                ((f"Badge Holder {i}",) for i in range(args.employees)))
+        if storage == tracker.STORAGE_BITMAP:
+            tracker.migrate_attendance_storage(storage)
+        employee_ids = [row[0] for row in tracker.get_connection().execute("SELECT id FROM employees ORDER BY id")]
+        expected, bad = make_punches(csv_path, employee_ids, args.rows, rng)
+
+        first = timed_import(f"[{storage}] CSV import, new records", csv_path, args.rows)
+        again = timed_import(f"[{storage}] CSV import again, all updates", csv_path, args.rows)
+        with open(first["reject_path"] or os.devnull) as f:
+            rejected_lines = sum(1 for _ in f) - 1
+        if stored_records() != expected:
+            failures.append(f"{storage}: stored records differ from the punch file")
+        # A chunk can end between an employee's in and out punch; the out punch is then an update
+        if (first["inserted"], first["rejected"]) != (len(expected), bad) or rejected_lines != bad:
+            failures.append(f"{storage}: unexpected first import summary {first}")
+        if again["inserted"] or again["updated"] < len(expected):
+            failures.append(f"{storage}: unexpected second import summary {again}")
+
+        records = make_workbook(xlsx_path, expected, args.xlsx_rows, rng)
+        timed_import(f"[{storage}] XLSX import, read-only workbook", xlsx_path, len(records))
+        expected.update(records)
+        if stored_records() != expected:
+            failures.append(f"{storage}: stored records differ after the XLSX import")
+
+    for failure in failures:
+        print(f"MISMATCH: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Incremental attendance export: a day's changes vs the full history, and a replica consistency check.
+
+Generates a dataset, takes a first incremental export (everything, as
+'new'), then simulates --days days of work: every day each employee is
+marked once through mark_attendance_bulk, a few marks are corrected with
+mark_attendance, and an employee is occasionally deleted. After each day
+an incremental CSV export is applied to a replica, the way the payroll
+vendor would apply it, and the replica must equal the live records. The
+change log must stay empty before the first export and be pruned by the
+last one. Runs in row and in bitmap storage and exits non-zero on any
+mismatch. Times are for the export call only.
+
+    python benchmarks/bench_incremental_export.py [--employees 2000] [--years 2] [--days 5]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def live_records():
+    conn = tracker.get_connection()
+    return {(emp_id, day): status for emp_id, day, status in conn.execute(f"""
+        SELECT a.employee_id, a.date, a.status FROM {tracker._attendance_days_source()} a
+        JOIN employees e ON e.id = a.employee_id
+    """)}
+
+
+def apply_export(replica, path):
+    """Applies an incremental CSV export to replica; returns the number of rows."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        key = (int(row["Employee ID"]), row["Date"])
+        if row["Change"] == "deleted":
+            replica.pop(key)
+        else:
+            replica[key] = row["Status"]
+    return len(rows)
+
+
+def timed_export(path):
+    start = time.perf_counter()
+    tracker.export_attendance_changes(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--days", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_db()
+    end = date.today() - timedelta(days=args.days + 1)
+    generate(args.employees, args.years, end=end)
+    out_dir = tempfile.mkdtemp(prefix="attendance_changes_")
+    rng = random.Random(1)
+    failures = []
+
+    for storage in (tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP):
+        tracker.migrate_attendance_storage(storage)
+        replica = {}
+        if tracker.get_connection().execute("SELECT COUNT(*) FROM attendance_changes").fetchone()[0]:
+            failures.append(f"{storage} change log")
+            print("MISMATCH: changes were logged before the first incremental export")
+        path = os.path.join(out_dir, f"{storage}_initial.csv")
+        report(f"[{storage}] first export (full history)", timed_export(path), "ms")
+        apply_export(replica, path)
+        full_path = os.path.join(out_dir, f"{storage}_full.xlsx")
+        start = time.perf_counter()
+        tracker.export_attendance_to_excel(full_path)
+        report(f"[{storage}] export_attendance_to_excel, full history", (time.perf_counter() - start) * 1000, "ms")
+
+        for offset in range(args.days):
+            day = (end + timedelta(days=offset + 1)).isoformat()
+            employee_ids = [row[0] for row in tracker.get_employees()]
+            tracker.mark_attendance_bulk([(emp_id, day, rng.choice(("Present", "Present", "Absent"))) for emp_id in employee_ids])
+            for emp_id in rng.sample(employee_ids, 10):
+                tracker.mark_attendance(emp_id, day, "Absent")
+                tracker.mark_attendance(emp_id, (end - timedelta(days=rng.randrange(30))).isoformat(), "Present")
+            if offset % 2:
+                tracker.delete_employee(rng.choice(employee_ids))
+            path = os.path.join(out_dir, f"{storage}_{day}.csv")
+            elapsed = timed_export(path)
+            rows = apply_export(replica, path)
+            report(f"[{storage}] incremental export, {day}: {rows:,} rows", elapsed, "ms")
+            if replica != live_records():
+                failures.append(f"{storage} {day}")
+                print(f"MISMATCH: replica differs from the live records after {day}")
+        pending = tracker.get_connection().execute("SELECT COUNT(*) FROM attendance_changes").fetchone()[0]
+        report(f"[{storage}] change log entries left after the last export", pending, "rows")
+        if pending:
+            failures.append(f"{storage} change log")
+            print("MISMATCH: the last export did not prune the change log")
+        tracker.close_connection()
+        tracker.get_connection().execute("DELETE FROM app_settings WHERE key = ?", (tracker.EXPORT_WATERMARK_KEY,))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Marks per second against a large attendance table: SELECT-then-write vs UPSERT.
+
+"before" replays the original mark_attendance (unindexed SELECT by employee
+and date, then UPDATE or INSERT) on a copy of the table without the unique
+index; "after" runs UPSERT_ATTENDANCE_SQL, exactly as mark_attendance does,
+minus the confirmation dialog.
+
+    python benchmarks/bench_mark_attendance.py [--rows 2000000] [--marks N]
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from common import fill_attendance, report, tracker, use_temp_db
+
+
+def legacy_mark(cursor, employee_id, day, status):
+    cursor.execute("SELECT id FROM attendance_legacy WHERE employee_id = ? AND date = ?", (employee_id, day))
+    existing = cursor.fetchone()
+    if existing:
+        cursor.execute("UPDATE attendance_legacy SET status = ? WHERE id = ?", (status, existing[0]))
+    else:
+        cursor.execute("INSERT INTO attendance_legacy (employee_id, date, status) VALUES (?, ?, ?)",
+                       (employee_id, day, status))
+
+
+def marks_per_second(mark, marks, employees, days):
+    rng = random.Random(42)
+    start = time.perf_counter()
+    for _ in range(marks):
+        day = (date(2000, 1, 1) + timedelta(days=rng.randrange(days + 30))).isoformat()
+        with tracker.transaction() as cursor:
+            mark(cursor, rng.randrange(11, 11 + employees), day, rng.choice(("Present", "Absent")))
+    return marks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--marks", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temp_db()
+    days = fill_attendance(args.rows, args.employees)
+    with tracker.transaction() as cursor:
+        cursor.execute("CREATE TABLE attendance_legacy AS SELECT * FROM attendance")
+
+    before = marks_per_second(legacy_mark, max(args.marks // 10, 5), args.employees, days)
+    after = marks_per_second(
+        lambda cursor, *row: cursor.execute(tracker.UPSERT_ATTENDANCE_SQL, row), args.marks, args.employees, days)
+    report(f"SELECT + UPDATE/INSERT, {args.rows:,} rows, no index", before, "marks/s")
+    report(f"UPSERT on unique (employee_id, date), {args.rows:,} rows", after, "marks/s")
+
+
+if __name__ == "__main__":
+    main()
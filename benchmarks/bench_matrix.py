@@ -0,0 +1,90 @@
+"""Attendance matrix vs the SQL report queries: load and statistics time for a full month.
+
+Generates one complete month of attendance (the last full month before
+today) for --employees employees, or uses --db, then times
+load_attendance_matrix() and the vectorized statistics against
+get_monthly_payroll() and get_employees_low_attendance(). The payroll and
+low-attendance rows must come out identical from both engines, in row and
+in bitmap storage; the script exits non-zero otherwise.
+
+    python benchmarks/bench_matrix.py [--employees 50000] [--calls 5]
+    python benchmarks/bench_matrix.py --db /tmp/attendance_50k.db --year 2026 --month 9 --months 12
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from common import report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def median_ms(fn, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="existing dataset from generate_dataset.py")
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--month", type=int)
+    parser.add_argument("--months", type=int, default=1, help="also time a matrix of this many months")
+    parser.add_argument("--threshold", type=float, default=50)
+    parser.add_argument("--calls", type=int, default=5)
+    args = parser.parse_args()
+    if not tracker.load_numpy():
+        parser.error("NumPy is not installed")
+
+    last_month = date.today().replace(day=1) - timedelta(days=1)
+    year, month = args.year or last_month.year, args.month or last_month.month
+    if args.db:
+        tracker.DB_NAME = args.db
+        tracker.init_db(preload_dummy_data=False)
+    else:
+        use_temp_db()
+        generate(args.employees, years=0, end=date(year, month, tracker.month_window(year, month)[2]))
+
+    failures = []
+    # An existing database is left in the storage it came in
+    storages = [tracker.attendance_storage()] if args.db else [tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP]
+    for storage in storages:
+        tracker.migrate_attendance_storage(storage)
+        sql_ms, sql_payroll = median_ms(lambda: tracker.get_monthly_payroll(year, month), args.calls)
+        report(f"[{storage}] get_monthly_payroll", sql_ms, "ms")
+        low_ms, sql_low = median_ms(lambda: tracker.get_employees_low_attendance(year, month, args.threshold), args.calls)
+        report(f"[{storage}] get_employees_low_attendance", low_ms, "ms")
+
+        load_ms, matrix = median_ms(lambda: tracker.load_attendance_matrix(year, month), args.calls)
+        report(f"[{storage}] load_attendance_matrix, {matrix.codes.shape[0]:,} x {matrix.days} days", load_ms, "ms")
+        stats_ms, _ = median_ms(lambda: (matrix.present_days(), matrix.absent_days(), matrix.salaries(),
+                                         matrix.below_threshold(args.threshold), matrix.longest_streaks(),
+                                         matrix.longest_streaks(matrix.ABSENT), matrix.current_streaks()), args.calls)
+        report(f"[{storage}] counts, salaries, threshold and streaks", stats_ms, "ms")
+        payroll_ms, payroll = median_ms(lambda: tracker.load_attendance_matrix(year, month).payroll(), args.calls)
+        report(f"[{storage}] matrix payroll rows, load included", payroll_ms, "ms")
+        if payroll != sql_payroll:
+            failures.append(f"{storage} payroll")
+        if matrix.low_attendance(args.threshold) != sql_low:
+            failures.append(f"{storage} low attendance")
+
+        if args.months > 1:
+            first = year * 12 + month - args.months
+            span_ms, span = median_ms(lambda: tracker.load_attendance_matrix(first // 12, first % 12 + 1, args.months), args.calls)
+            report(f"[{storage}] load_attendance_matrix, {args.months} months ({span.days} days)", span_ms, "ms")
+            streak_ms, _ = median_ms(lambda: span.longest_streaks(span.ABSENT), args.calls)
+            report(f"[{storage}] longest absence streaks, {args.months} months", streak_ms, "ms")
+
+    for name in failures:
+        print(f"MISMATCH: {name} differs between the matrix and the SQL query")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
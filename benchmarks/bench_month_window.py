@@ -0,0 +1,71 @@
+"""Monthly report queries: STRFTIME month filter vs month_window() range predicates.
+
+Also checks, via EXPLAIN QUERY PLAN, that every rewritten monthly query is
+answered from one of the attendance indexes rather than a table scan, and
+exits non-zero if one is not.
+
+    python benchmarks/bench_month_window.py [--rows 1000000]
+"""
+import argparse
+import sys
+
+from common import fill_attendance, per_call_us, report, tracker, use_temp_db
+
+STRFTIME_PRESENT_SQL = """
+    SELECT COUNT(*) FROM attendance
+    WHERE employee_id = ? AND STRFTIME('%Y-%m', date) = ? AND status = 'Present'
+"""
+RANGE_PRESENT_SQL = """
+    SELECT COUNT(*) FROM attendance
+    WHERE employee_id = ? AND date >= ? AND date < ? AND status = 'Present'
+"""
+RANGE_STATUS_COUNTS_SQL = """
+    SELECT status, COUNT(*) FROM attendance
+    WHERE employee_id = ? AND date >= ? AND date < ? GROUP BY status
+"""
+RANGE_LOW_ATTENDANCE_SQL = """
+    SELECT e.id, e.name, SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END)
+    FROM employees e LEFT JOIN attendance a ON e.id = a.employee_id
+    WHERE a.date >= ? AND a.date < ? GROUP BY e.id, e.name
+"""
+
+
+def uses_index(sql, params):
+    plan = tracker.get_connection().execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    details = [row[-1] for row in plan if "attendance" in row[-1] or " a " in f" {row[-1]} "]
+    return details, all("USING" in d and "INDEX" in d for d in details) and bool(details)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_db()
+    fill_attendance(args.rows, args.employees)
+    tracker.get_connection().execute("ANALYZE")
+    first_day, next_month, _ = tracker.month_window(2000, 6)
+
+    ok = True
+    for name, sql, params in [
+        ("employee present days", RANGE_PRESENT_SQL, (20, first_day, next_month)),
+        ("employee status counts", RANGE_STATUS_COUNTS_SQL, (20, first_day, next_month)),
+        ("low attendance", RANGE_LOW_ATTENDANCE_SQL, (first_day, next_month)),
+    ]:
+        details, indexed = uses_index(sql, params)
+        ok = ok and indexed
+        print(f"{'OK  ' if indexed else 'SCAN'} {name}: {'; '.join(details)}")
+
+    before = per_call_us(
+        lambda: tracker.get_connection().execute(STRFTIME_PRESENT_SQL, (20, "2000-06")).fetchone(), args.calls)
+    after = per_call_us(
+        lambda: tracker.get_connection().execute(RANGE_PRESENT_SQL, (20, first_day, next_month)).fetchone(), args.calls)
+    report(f"present days, STRFTIME filter, {args.rows:,} rows", before, "us/call")
+    report(f"present days, month_window range, {args.rows:,} rows", after, "us/call")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Multi-month payroll report: one process vs a ProcessPoolExecutor, sharded by month and by employee range.
+
+Times iter_payroll_report() over every month of the dataset with 1, 2, 4
+... up to --max-workers processes, for both shardings, and checks that
+every run returns exactly the rows of the single-process run (exits
+non-zero otherwise). Then times export_payroll_report() to CSV and XLSX
+with the default worker count. Speedups need as many idle cores as
+workers; on a machine with fewer, the extra workers only add start-up
+and pickling overhead.
+
+    python benchmarks/bench_payroll_report.py --db /tmp/attendance_50k.db
+    python benchmarks/bench_payroll_report.py [--employees 10000] [--years 3] [--max-workers 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from common import report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="existing dataset from generate_dataset.py")
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.db:
+        tracker.close_connection()
+        tracker.DB_NAME = args.db
+        tracker.init_db(preload_dummy_data=False)
+    else:
+        use_temp_db()
+        generate(args.employees, args.years)
+    print(f"{os.cpu_count()} CPUs")
+    months = [tuple(map(int, ym.split("-"))) for (ym,) in tracker.get_connection().execute(
+        "SELECT DISTINCT year_month FROM attendance_monthly ORDER BY year_month")]
+
+    expected, serial = timed(lambda: list(tracker.iter_payroll_report(months)))
+    rows = sum(len(month_rows) for month_rows in expected)
+    report(f"{len(months)} months, 1 process", serial, "s")
+    report("rows", rows, "rows")
+
+    failures = []
+    worker_counts = [2 ** i for i in range(1, 8) if 2 ** i <= args.max_workers]
+    for shard in (tracker.SHARD_BY_MONTH, tracker.SHARD_BY_EMPLOYEES):
+        for workers in worker_counts:
+            result, elapsed = timed(lambda: list(tracker.iter_payroll_report(months, workers=workers, shard=shard)))
+            report(f"{workers} workers, sharded by {shard}", elapsed, "s")
+            report(f"{workers} workers, sharded by {shard}: speedup", serial / elapsed, "x")
+            if result != expected:
+                failures.append(f"{workers} workers, sharded by {shard}")
+
+    out_dir = tempfile.mkdtemp(prefix="attendance_payroll_")
+    for name in ("payroll.csv", "payroll.xlsx"):
+        written, elapsed = timed(lambda: tracker.export_payroll_report(os.path.join(out_dir, name), months))
+        report(f"export_payroll_report -> {name} ({written:,} rows)", elapsed, "s")
+
+    for failure in failures:
+        print(f"MISMATCH: {failure} differs from the single-process report")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Employee search latency with many employees: LIKE scan vs trigram index vs refinement.
+
+    python benchmarks/bench_search.py [--employees 100000]
+"""
+import argparse
+import random
+
+from common import per_call_us, report, tracker, use_temp_db
+
+FIRST = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Grace", "Henry", "Ivy", "Jack", "Kumar", "Lena"]
+LAST = ["Smith", "Johnson", "Brown", "Prince", "Adams", "White", "Lee", "King", "Chen", "Green", "Rao", "Novak"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_db()
+    rng = random.Random(7)
+    with tracker.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO employees (name, join_date, salary, password) VALUES (?, '2020-01-01', 50000, 'x')",
+            ((f"{rng.choice(FIRST)} {rng.choice(LAST)}{rng.randrange(10_000)}",) for _ in range(args.employees)))
+    conn = tracker.get_connection()
+
+    def like_scan(query):
+        return conn.execute("SELECT id, name, join_date, salary FROM employees WHERE name LIKE ? OR "
+                            "CAST(id AS TEXT) LIKE ? ORDER BY name", (f"%{query}%", f"%{query}%")).fetchall()
+
+    query = "Novak12"
+    report(f"LIKE '%q%' scan, {args.employees:,} employees", per_call_us(lambda: like_scan(query), args.calls), "us/call")
+    report("search_employees (trigram index)",
+           per_call_us(lambda: tracker.search_employees(query), args.calls), "us/call")
+    report("search_employees (numeric ID)",
+           per_call_us(lambda: tracker.search_employees("54321"), args.calls), "us/call")
+
+    def typed():
+        search = tracker.EmployeeSearch()
+        for end in range(1, len(query) + 1):
+            search.search(query[:end])
+    report(f"EmployeeSearch, typing '{query}' key by key", per_call_us(typed, 5), "us/word")
+    report(f"LIKE scan per keystroke, typing '{query}'",
+           per_call_us(lambda: [like_scan(query[:end]) for end in range(1, len(query) + 1)], 5), "us/word")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cold-start cost: module import time, init_db() on an existing database, and time to the login window.
+
+Every measurement runs in a fresh interpreter so nothing is already
+imported. The "eager" rows replay the old top-level imports (matplotlib,
+FigureCanvasTkAgg, tkcalendar, openpyxl) before importing the module; the
+"full schema check" row resets PRAGMA user_version so init_db() re-runs
+every CREATE ... IF NOT EXISTS and migration check like it used to. The
+login-window rows need a display and are skipped without one.
+
+    python benchmarks/bench_startup.py [--runs 7]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER_IMPORTS = """
+import tkinter, tkinter.ttk, tkinter.messagebox, tkinter.filedialog
+import matplotlib.pyplot
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkcalendar import DateEntry
+import openpyxl
+"""
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+{eager}
+import emp_attendance_trackerr as tracker
+tracker.DB_NAME = {db!r}
+if {stage!r} == "import":
+    tracker.load_gui_modules()
+elif {stage!r} in ("init_db", "full_init_db"):
+    if {stage!r} == "full_init_db":
+        tracker.get_connection().execute("PRAGMA user_version = 0")
+    start = time.perf_counter()
+    tracker.init_db()
+elif {stage!r} == "login":
+    tracker.init_db()
+    tracker.load_gui_modules()
+    try:
+        root = tracker.tk.Tk()
+    except tracker.tk.TclError:
+        print("skip")
+        sys.exit()
+    app = tracker.EmployeeAttendanceApp(root)
+    root.update()
+print(time.perf_counter() - start)
+"""
+
+
+def time_child(stage, db_path, eager, runs):
+    """Median wall time in ms of `stage` over `runs` fresh interpreters, or None if skipped."""
+    code = CHILD.format(repo=REPO, db=db_path, stage=stage, eager=EAGER_IMPORTS if eager else "")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+        if output[-1] == "skip":
+            return None
+        samples.append(float(output[-1]) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per measurement (median reported)")
+    args = parser.parse_args()
+
+    from common import report, tracker, use_temp_db
+    db_path = use_temp_db()
+    tracker.close_connection()
+
+    cases = [
+        ("import, eager GUI/chart/Excel modules", "import", True),
+        ("import, lazy (Tk only)", "import", False),
+        ("init_db(), full schema check", "full_init_db", False),
+        ("init_db(), user_version current", "init_db", False),
+        ("start to login window, eager imports", "login", True),
+        ("start to login window, lazy imports", "login", False),
+    ]
+    for label, stage, eager in cases:
+        elapsed = time_child(stage, db_path, eager, args.runs)
+        if elapsed is None:
+            print(f"{label:<50} {'skipped (no display)':>15}")
+        else:
+            report(label, elapsed, "ms")
+
+
+if __name__ == "__main__":
+    main()
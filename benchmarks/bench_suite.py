@@ -0,0 +1,190 @@
+"""Times every DB function and report path against a generated dataset and writes the results as JSON.
+
+Point --db at a database built by generate_dataset.py, or pass --employees
+and --years to generate a temporary one first. Each case is called --calls
+times with arguments sampled from the dataset (cached functions are timed
+both cold and warm); full-table paths such as the exports run once. The
+results file can be passed back as --compare on a later run to print the
+change per case, and --fail-over makes the run exit non-zero when any case
+got slower than that ratio.
+
+Write cases re-mark records with the status they already have, so the
+dataset is unchanged between runs.
+
+    python benchmarks/bench_suite.py --db /tmp/attendance_50k.db --output results.json
+    python benchmarks/bench_suite.py --employees 2000 --years 2 --compare results.json --fail-over 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from common import tracker, use_temp_db
+from generate_dataset import generate
+
+
+def time_calls(fn, arguments, setup=None):
+    """Calls fn(*args) for each args tuple and returns the latencies in milliseconds."""
+    samples = []
+    for args in arguments:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "calls": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min_ms": ordered[0],
+        "max_ms": ordered[-1],
+    }
+
+
+def describe_dataset():
+    conn = tracker.get_connection()
+    first_date, last_date = conn.execute("SELECT MIN(date), MAX(date) FROM attendance").fetchone()
+    return {
+        "db": os.path.abspath(tracker.DB_NAME),
+        "size_mb": os.path.getsize(tracker.DB_NAME) / 2**20,
+        "employees": conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0],
+        "attendance_rows": conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0],
+        "first_date": first_date,
+        "last_date": last_date,
+    }
+
+
+def build_cases(rng, calls, dataset):
+    """Returns (name, fn, argument tuples, setup) for every case, sampling arguments from the dataset."""
+    conn = tracker.get_connection()
+    employee_ids = [row[0] for row in conn.execute("SELECT id FROM employees")]
+    months = [tuple(map(int, ym.split("-"))) for (ym,) in
+              conn.execute("SELECT DISTINCT year_month FROM attendance_monthly ORDER BY year_month")]
+    recent_months = months[-12:]
+    name_terms = [tracker.get_employee_by_id(rng.choice(employee_ids))[1].split()[1] for _ in range(calls)]
+
+    def sample_records(count):
+        picks = []
+        while len(picks) < count:
+            emp_id = rng.choice(employee_ids)
+            row = conn.execute("SELECT employee_id, date, status FROM attendance WHERE employee_id = ? ORDER BY date DESC LIMIT 1",
+                               (emp_id,)).fetchone()
+            if row:
+                picks.append(row)
+        return picks
+
+    records = sample_records(calls)
+    emp_months = [(rng.choice(employee_ids),) + rng.choice(recent_months) for _ in range(calls)]
+    day_batches = [conn.execute("SELECT employee_id, date, status FROM attendance WHERE date = ? LIMIT 1000",
+                                (record[1],)).fetchall() for record in records[:max(1, calls // 5)]]
+
+    full_scan = [()]
+    cases = [
+        ("get_employees", tracker.get_employees, [()] * max(1, calls // 5), None),
+        ("get_employees search by name", tracker.get_employees, [(term,) for term in name_terms], None),
+        ("get_employees search by id", tracker.get_employees, [(str(rng.choice(employee_ids)),) for _ in range(calls)], None),
+        ("get_employee_by_id cold", tracker.get_employee_by_id, [(rng.choice(employee_ids),) for _ in range(calls)], tracker.clear_caches),
+        ("get_attendance_by_employee", tracker.get_attendance_by_employee, [(rng.choice(employee_ids),) for _ in range(calls)], None),
+        ("get_attendance_page", tracker.get_attendance_page, [(rng.choice(employee_ids),) for _ in range(calls)], None),
+        ("get_attendance_by_date", tracker.get_attendance_by_date, [(record[1],) for record in records], None),
+        ("get_monthly_attendance_percentage cold", tracker.get_monthly_attendance_percentage, emp_months, tracker.clear_caches),
+        ("get_monthly_attendance_percentage warm", tracker.get_monthly_attendance_percentage, emp_months, None),
+        ("get_monthly_status_counts (employee chart)", tracker.get_monthly_status_counts, emp_months, None),
+        ("calculate_salary cold", tracker.calculate_salary, emp_months, tracker.clear_caches),
+        ("get_monthly_payroll (monthly stats, bar chart)", tracker.get_monthly_payroll,
+         [rng.choice(recent_months) for _ in range(max(1, calls // 5))], None),
+        ("get_employees_low_attendance", tracker.get_employees_low_attendance,
+         [rng.choice(recent_months) + (50,) for _ in range(max(1, calls // 5))], None),
+        ("mark_attendance (re-mark)", tracker.mark_attendance, records, None),
+        ("mark_attendance_bulk (one day, <=1000 employees)", tracker.mark_attendance_bulk, [(batch,) for batch in day_batches], None),
+        ("count_attendance_records", tracker.count_attendance_records, full_scan, None),
+        ("iter_attendance_chunks full pass (CSV export)", lambda: sum(len(rows) for rows in tracker.iter_attendance_chunks()), full_scan, None),
+    ]
+    export_path = os.path.join(tempfile.mkdtemp(prefix="attendance_suite_"), "export.xlsx")
+    cases.append(("export_attendance_to_excel", tracker.export_attendance_to_excel, [(export_path,)], None))
+    return cases
+
+
+def compare(results, baseline_path, fail_over):
+    """Prints the median change per case against a previous results file; returns the regressed case names."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressed = []
+    print(f"\n{'case':<50} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, now = baseline[name]["median_ms"], result["median_ms"]
+        ratio = now / before if before else float("inf")
+        flag = ""
+        if fail_over and ratio > fail_over:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<50} {before:>8.3f}ms {now:>8.3f}ms {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="existing dataset from generate_dataset.py")
+    parser.add_argument("--employees", type=int, default=2000, help="size of the generated dataset when --db is not given")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--calls", type=int, default=50, help="calls per case (full-table cases run once)")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file from an earlier run")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if any median is this many times slower than BASELINE")
+    args = parser.parse_args()
+
+    if args.db:
+        tracker.close_connection()
+        tracker.DB_NAME = args.db
+        tracker.init_db(preload_dummy_data=False)
+    else:
+        use_temp_db()
+        generate(args.employees, args.years, seed=args.seed)
+
+    rng = random.Random(args.seed)
+    dataset = describe_dataset()
+    print(f"dataset: {dataset['employees']:,} employees, {dataset['attendance_rows']:,} attendance rows "
+          f"({dataset['first_date']} to {dataset['last_date']})")
+
+    results = {}
+    for name, fn, arguments, setup in build_cases(rng, args.calls, dataset):
+        if args.only and args.only not in name:
+            continue
+        results[name] = summarize(time_calls(fn, arguments, setup))
+        r = results[name]
+        print(f"{name:<50} median {r['median_ms']:>10.3f} ms  p95 {r['p95_ms']:>10.3f} ms  ({r['calls']} calls)")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "dataset": dataset,
+            "results": results,
+        }, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.fail_over):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks never touch the real employee_attendance.db: every run points
+DB_NAME at a throwaway database under the system temp directory.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emp_attendance_trackerr as tracker  # noqa: E402
+
+
+def use_temp_db(name="bench.db"):
+    """Points the tracker at a fresh temporary database and initializes it."""
+    path = os.path.join(tempfile.mkdtemp(prefix="attendance_bench_"), name)
+    tracker.close_connection()
+    tracker.DB_NAME = path
+    tracker.init_db()
+    return path
+
+
+def per_call_us(fn, calls):
+    """Runs fn() `calls` times and returns the mean latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def report(label, value, unit):
+    print(f"{label:<50} {value:>12,.1f} {unit}")
+
+
+def fill_attendance(rows, employees):
+    """Appends `rows` attendance records, one per employee per day going back in time."""
+    start = date(2000, 1, 1)
+    days = rows // employees + 1
+    with tracker.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO employees (name, join_date, salary, password) VALUES (?, '2000-01-01', 50000, 'x')",
+            ((f"Bench Employee {i}",) for i in range(employees)))
+        records = ((emp_id, (start + timedelta(days=d)).isoformat(), "Present" if (emp_id + d) % 7 else "Absent")
+                   for d in range(days) for emp_id in range(11, 11 + employees))
+        cursor.executemany("INSERT OR IGNORE INTO attendance (employee_id, date, status) VALUES (?, ?, ?)",
+                           (r for _, r in zip(range(rows), records)))
+    return days
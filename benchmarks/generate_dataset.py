@@ -0,0 +1,170 @@
+"""Builds a large synthetic attendance database for benchmarking.
+
+Employees get staggered join dates, a few leave before the end of the
+range, and attendance is recorded on weekdays only. Each employee has a
+personal absence rate (a handful are chronically absent), absences come
+in multi-day sick spells that start more often on Mondays and Fridays,
+there are one-to-two-week vacations every year, and a small share of days
+is never marked at all. Rows are written with executemany, batch_size rows
+per transaction, and the same --seed always produces the same database.
+
+    python benchmarks/generate_dataset.py --db /tmp/attendance_50k.db [--employees 50000] [--years 5]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from common import report, tracker
+
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Grace", "Henry", "Ivy", "Jack",
+               "Karen", "Liam", "Mia", "Noah", "Olivia", "Priya", "Quinn", "Ravi", "Sara", "Tom",
+               "Uma", "Victor", "Wei", "Xena", "Yusuf", "Zoe", "Aarav", "Chen", "Fatima", "Mateo"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Prince", "Adams", "White", "Lee", "King", "Chen", "Green",
+              "Garcia", "Patel", "Kim", "Nguyen", "Müller", "Rossi", "Silva", "Khan", "Ivanova", "Okafor",
+              "Tanaka", "Martin", "Lopez", "Walker", "Hall", "Young", "Wright", "Scott", "Torres", "Reddy"]
+
+BATCH_SIZE = 100_000 # Attendance rows per transaction
+UNMARKED_RATE = 0.02 # Share of working days nobody recorded
+
+
+def workdays_between(start, end):
+    """Every Monday-Friday from start to end inclusive, as date objects."""
+    days = []
+    current = start
+    while current <= end:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def make_employees(rng, count, start, end):
+    """Returns (name, join_date, salary, password) tuples and each employee's last working day."""
+    span = (end - start).days
+    employees, leave_dates = [], []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i + 1}"
+        # Most staff predate the range; about a third join during it
+        if rng.random() < 0.35:
+            joined = start + timedelta(days=rng.randrange(span))
+        else:
+            joined = start - timedelta(days=rng.randrange(1, 3650))
+        left = end
+        if rng.random() < 0.08:
+            left = max(joined, start) + timedelta(days=rng.randrange(max(1, (end - max(joined, start)).days)))
+        salary = round(rng.lognormvariate(10.9, 0.3), -2)
+        employees.append((name, joined.isoformat(), salary, f"pw{i + 1}"))
+        leave_dates.append(left)
+    return employees, leave_dates
+
+
+def attendance_rows(rng, emp_id, joined, left, workdays):
+    """Yields (employee_id, date, status) for one employee's working days."""
+    # Typical staff miss a few percent of days; one in twenty is chronically absent
+    absence_rate = rng.betavariate(4, 12) if rng.random() < 0.05 else rng.betavariate(2, 40)
+    spell_start_rate = absence_rate / 2.5 # Sick spells last 2.5 days on average
+    vacation_days = set()
+    for year in {day.year for day in workdays}:
+        for _ in range(rng.randint(1, 2)):
+            first = date(year, 1, 1) + timedelta(days=rng.randrange(350))
+            vacation_days.update(first + timedelta(days=d) for d in range(rng.choice((7, 14))))
+    sick_left = 0
+    for day in workdays:
+        if day < joined or day > left:
+            continue
+        if rng.random() < UNMARKED_RATE:
+            continue
+        if sick_left:
+            sick_left -= 1
+            status = "Absent"
+        elif day in vacation_days:
+            status = "Absent"
+        elif rng.random() < spell_start_rate * (1.4 if day.weekday() in (0, 4) else 1.0):
+            sick_left = rng.choice((0, 0, 1, 1, 2, 3, 4))
+            status = "Absent"
+        else:
+            status = "Present"
+        yield emp_id, day.isoformat(), status
+
+
+def generate(employees=50_000, years=5, end=None, seed=1, batch_size=BATCH_SIZE, progress=None):
+    """Appends a synthetic dataset to DB_NAME and returns the number of attendance rows written."""
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = date(end.year - years, end.month, 1)
+    workdays = workdays_between(start, end)
+
+    tracker.init_db(preload_dummy_data=False)
+    conn = tracker.get_connection()
+    # Bulk load into a throwaway file: durability does not matter, and a large page
+    # cache keeps the four attendance indexes from thrashing
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -524288")
+    employee_rows, leave_dates = make_employees(rng, employees, start, end)
+    with tracker.transaction() as cursor:
+        first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM employees").fetchone()[0]
+        cursor.executemany("INSERT INTO employees (name, join_date, salary, password) VALUES (?, ?, ?, ?)", employee_rows)
+
+    # Maintaining attendance_monthly and data_versions row by row triples the insert
+    # cost, so their triggers are dropped for the load and restored in one pass. The
+    # generated rows are not in the change log, so the first incremental export
+    # sends everything
+    with tracker.transaction() as cursor:
+        tracker._drop_attendance_monthly(cursor)
+        tracker._drop_data_version_triggers(cursor)
+        tracker._drop_change_triggers(cursor)
+
+    def all_rows():
+        for offset, (row, left) in enumerate(zip(employee_rows, leave_dates)):
+            yield from attendance_rows(rng, first_id + offset, date.fromisoformat(row[1]), left, workdays)
+
+    rows = all_rows()
+    written = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        with tracker.transaction() as cursor:
+            cursor.executemany("INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)", batch)
+        written += len(batch)
+        if progress:
+            progress(written)
+    with tracker.transaction() as cursor:
+        tracker._create_attendance_monthly(cursor)
+        tracker._create_data_versions(cursor)
+        tracker._bump_data_versions(cursor)
+        tracker._create_attendance_changes(cursor)
+    conn.execute("PRAGMA synchronous = FULL")
+    tracker.clear_caches()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="database file to create (must not exist)")
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of the range (default: today)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+
+    tracker.DB_NAME = args.db
+    start = time.perf_counter()
+    rows = generate(args.employees, args.years, args.end, args.seed, args.batch_size,
+                    progress=lambda n: print(f"\r{n:,} attendance rows", end="", flush=True))
+    print()
+    elapsed = time.perf_counter() - start
+    report(f"generated {args.employees:,} employees", rows, "rows")
+    report("generation time", elapsed, "s")
+    report("insert rate", rows / elapsed, "rows/s")
+    report("database size", os.path.getsize(args.db) / 2**20, "MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Multi-process stress test: kiosk writers marking attendance while a reporter runs the monthly stats.
+
+Each writer is a separate process (like a separate copy of the app) that
+marks random employees present or absent for days in the report month as
+fast as it can. The reporter process meanwhile runs get_monthly_payroll()
+for that month, the query behind calculate_monthly_stats. Every process
+opens its own connections with the chosen ATTENDANCE_DB_PROFILE; pass
+several profiles to compare them on the same dataset. Exits non-zero if
+any operation failed (e.g. "database is locked").
+
+    python benchmarks/stress_concurrency.py [--writers 4] [--seconds 10] [--profile default rollback]
+"""
+import argparse
+import multiprocessing
+import queue
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date
+
+from common import report, tracker, use_temp_db
+from generate_dataset import generate
+
+
+def run_worker(role, db_path, profile, seconds, seed, year, month, results):
+    """Runs one process's operations and always posts its outcome, even when setting up fails."""
+    latencies, errors = [], []
+    try:
+        tracker.DB_NAME = db_path
+        tracker.DB_PROFILE = profile
+        rng = random.Random(seed)
+        employee_ids = [row[0] for row in tracker.get_employees()]
+        _, _, days_in_month = tracker.month_window(year, month)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if role == "writer":
+                    day = date(year, month, rng.randint(1, days_in_month)).isoformat()
+                    tracker.mark_attendance(rng.choice(employee_ids), day, rng.choice(("Present", "Absent")))
+                else:
+                    tracker.get_monthly_payroll(year, month)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        errors.append(f"{role} failed to run: {e!r}")
+    finally:
+        results.put((role, latencies, errors))
+
+
+def summarize(profile, role, outcomes, seconds):
+    latencies = sorted(ms for lat, _ in outcomes for ms in lat)
+    errors = [error for _, errs in outcomes for error in errs]
+    report(f"[{profile}] {role} operations/s (all processes)", len(latencies) / seconds, "ops/s")
+    if latencies:
+        report(f"[{profile}] {role} latency p50", statistics.median(latencies), "ms")
+        report(f"[{profile}] {role} latency p95", latencies[int(len(latencies) * 0.95)], "ms")
+        report(f"[{profile}] {role} latency max", latencies[-1], "ms")
+    report(f"[{profile}] {role} errors", len(errors), "")
+    for message in sorted(set(errors)):
+        print(f"    {errors.count(message)} x {message}")
+    return len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--profile", nargs="+", default=["default"], choices=list(tracker.CONNECTION_PROFILES))
+    args = parser.parse_args()
+
+    db_path = use_temp_db()
+    generate(args.employees, years=1)
+    tracker.close_connection()
+    today = date.today()
+
+    # Separate interpreters, not forked copies, like separate copies of the app
+    context = multiprocessing.get_context("spawn")
+    failures = 0
+    for profile in args.profile:
+        # The journal mode is stored in the file; switch it once here, as the app's init_db() does
+        tracker.DB_PROFILE = profile
+        tracker.init_db(preload_dummy_data=False)
+        tracker.close_connection()
+        results = context.Queue()
+        roles = ["writer"] * args.writers + ["reporter"]
+        processes = [context.Process(target=run_worker, args=(role, db_path, profile, args.seconds, seed,
+                                                              today.year, today.month, results))
+                     for seed, role in enumerate(roles)]
+        for process in processes:
+            process.start()
+        outcomes = []
+        for _ in processes:
+            try:
+                outcomes.append(results.get(timeout=args.seconds + 60))
+            except queue.Empty:
+                break
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        crashed = [process.exitcode for process in processes if process.exitcode != 0]
+        if crashed or len(outcomes) < len(processes):
+            failures += 1
+            print(f"[{profile}] {len(processes) - len(outcomes)} processes posted no result; exit codes {crashed}")
+        for role in ("writer", "reporter"):
+            failures += summarize(profile, role, [(lat, errs) for r, lat, errs in outcomes if r == role], args.seconds)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
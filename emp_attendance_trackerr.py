@@ -1,13 +1,61 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
 import sqlite3
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import openpyxl
-from collections import defaultdict
-from tkcalendar import DateEntry
+from collections import defaultdict, OrderedDict
 import os
+import io
+import csv
+import json
+import time
+import atexit
+import functools
+import heapq
+import itertools
+import threading
+import queue
+import multiprocessing
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from bisect import bisect_left
+
+# GUI toolkits are imported by load_gui_modules() so the database layer can be
+# used headless (see attendance_cli.py) without Tk. The heavier tkcalendar and
+# matplotlib modules, and openpyxl, are imported on first use: most sessions
+# are employees who never open a chart or an export. NumPy is optional: the
+# reports use it through AttendanceMatrix when it is installed.
+tk = ttk = messagebox = filedialog = None
+Figure = FigureCanvasTkAgg = DateEntry = None
+np = None
+
+def load_gui_modules():
+    """Imports the Tk modules the desktop app needs to show its first window."""
+    global tk, ttk, messagebox, filedialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+
+def load_calendar_module():
+    """Imports tkcalendar's DateEntry the first time a tab with a date picker is built."""
+    global DateEntry
+    if DateEntry is None:
+        from tkcalendar import DateEntry
+
+def load_chart_modules():
+    """Imports matplotlib the first time a chart is drawn."""
+    global Figure, FigureCanvasTkAgg
+    if Figure is None:
+        # pyplot is not needed: ChartPanel owns its one Figure instead of pyplot's figure manager
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+def load_numpy():
+    """Imports NumPy on first use; returns False when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            np = False
+    return np is not False
 
 # --- Configuration and Constants ---
 DB_NAME = 'employee_attendance.db'
@@ -29,256 +77,2780 @@ FONT_LARGE = ("Inter", 18, "bold")
 FONT_MEDIUM = ("Inter", 16)
 FONT_SMALL = ("Inter", 12)
 
+SEARCH_DEBOUNCE_MS = 250 # Pause in typing before the employee search runs
+SEARCH_DISPLAY_LIMIT = 1000 # Matching employees shown in the list at once
+
+# --- Instrumentation ---
+# With ATTENDANCE_PROFILE=1 in the environment, every SQL statement and every
+# EmployeeAttendanceApp action handler records its latency in an in-memory
+# histogram. instrumentation_snapshot() returns them, the admin panel gains a
+# Diagnostics tab, and ATTENDANCE_PROFILE_OUTPUT=path writes them as JSON at
+# exit. Without the variable nothing is wrapped, so there is no overhead.
+PROFILING = os.environ.get("ATTENDANCE_PROFILE", "") not in ("", "0")
+PROFILE_OUTPUT = os.environ.get("ATTENDANCE_PROFILE_OUTPUT")
+
+class LatencyHistogram:
+    """Counts latencies in power-of-two millisecond buckets, from 1µs to about 17s."""
+    BUCKET_BOUNDS_MS = [2 ** i / 1000 for i in range(25)]
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        self.buckets[bisect_left(self.BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket that holds the given fraction of the samples."""
+        seen = 0
+        for bound, count in zip(self.BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= fraction * self.count:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms,
+            'buckets': {f"<={bound:g}ms": count
+                        for bound, count in zip(self.BUCKET_BOUNDS_MS + [float('inf')], self.buckets) if count},
+        }
+
+# Histograms by kind ('sql', 'action', 'task') and then statement or handler name
+_histograms = {'sql': {}, 'action': {}, 'task': {}}
+_histogram_lock = threading.Lock()
+
+def record_latency(kind, name, elapsed_ms):
+    with _histogram_lock:
+        histogram = _histograms[kind].get(name)
+        if histogram is None:
+            histogram = _histograms[kind][name] = LatencyHistogram()
+        histogram.record(elapsed_ms)
+
+def instrumentation_snapshot():
+    """All recorded histograms as plain dicts, the most expensive names first."""
+    with _histogram_lock:
+        snapshot = {'enabled': PROFILING}
+        for kind, histograms in _histograms.items():
+            ordered = sorted(histograms.items(), key=lambda item: item[1].total_ms, reverse=True)
+            snapshot[kind] = {name: histogram.to_dict() for name, histogram in ordered}
+        return snapshot
+
+def reset_instrumentation():
+    with _histogram_lock:
+        for histograms in _histograms.values():
+            histograms.clear()
+
+def dump_instrumentation(file_path):
+    """Writes instrumentation_snapshot() to file_path as JSON."""
+    with open(file_path, 'w') as f:
+        json.dump(instrumentation_snapshot(), f, indent=2)
+
+if PROFILING and PROFILE_OUTPUT:
+    atexit.register(dump_instrumentation, PROFILE_OUTPUT)
+
+def _statement_name(sql):
+    return " ".join(sql.split())
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that records how long each execute() takes under its SQL text.
+
+    SQLite runs a statement up to its first row inside execute(), so this
+    covers all the work of writes, aggregates and sorted queries; rows
+    fetched afterwards are not included.
+    """
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_latency('sql', _statement_name(sql), (time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_latency('sql', _statement_name(sql), (time.perf_counter() - start) * 1000)
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors, and execute() shortcuts, are ProfilingCursors."""
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def timed_action(handler):
+    """Records how long an app handler takes when profiling; otherwise returns it unchanged."""
+    if not PROFILING:
+        return handler
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            record_latency('action', handler.__qualname__, (time.perf_counter() - start) * 1000)
+    return wrapper
+
+# --- Connection Management ---
+# Every thread keeps one long-lived connection to DB_NAME. Reusing it avoids
+# reopening the file and re-parsing the schema on each call, and lets sqlite3's
+# per-connection statement cache keep our queries prepared between calls.
+STATEMENT_CACHE_SIZE = 256
+
+# PRAGMAs applied to every new connection. Several copies of the app (kiosks
+# and the admin desk) share one database file: WAL lets reports read while a
+# kiosk writes, and busy_timeout makes a writer wait for the write lock
+# instead of failing with "database is locked". journal_mode is stored in
+# the database file itself, so init_db() sets it once with set_journal_mode()
+# rather than every connection. Pick a profile with the ATTENDANCE_DB_PROFILE
+# environment variable.
+CONNECTION_PROFILES = {
+    'default': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 10000,
+                'cache_size': -16384, 'mmap_size': 64 * 2**20, 'temp_store': 'MEMORY'},
+    # Attendance kiosks: small memory footprint
+    'kiosk': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 10000,
+              'cache_size': -2048, 'mmap_size': 0, 'temp_store': 'DEFAULT'},
+    # Admin desk and headless report runs: large cache and map for month-wide scans
+    'reporting': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 30000,
+                  'cache_size': -262144, 'mmap_size': 1024 * 2**20, 'temp_store': 'MEMORY'},
+    # Databases on network shares, where WAL's shared memory does not work
+    'rollback': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 10000,
+                 'cache_size': -16384, 'mmap_size': 0, 'temp_store': 'MEMORY'},
+}
+DB_PROFILE = os.environ.get("ATTENDANCE_DB_PROFILE", "default")
+DB_READ_ONLY = False # Set in report worker processes, whose connections then open DB_NAME with mode=ro
+WAL_CHECKPOINT_INTERVAL_S = 300 # How often WalCheckpointer folds the WAL back into the database
+
+def configure_connection(conn, profile=None):
+    """Applies a CONNECTION_PROFILES entry (DB_PROFILE by default) to a new connection."""
+    profile = profile or DB_PROFILE
+    if profile not in CONNECTION_PROFILES:
+        raise ValueError(f"Unknown ATTENDANCE_DB_PROFILE {profile!r}; choose one of {', '.join(CONNECTION_PROFILES)}")
+    settings = CONNECTION_PROFILES[profile]
+    for pragma in ('busy_timeout', 'synchronous', 'cache_size', 'mmap_size', 'temp_store'):
+        conn.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+
+def set_journal_mode(conn, mode):
+    """Switches the database file to journal mode `mode`, unless it already uses it.
+
+    A switch needs every other connection to be idle and fails at once with
+    "database is locked" otherwise, without waiting on busy_timeout, so it
+    is retried until the connection's busy timeout runs out.
+    """
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == mode.lower():
+        return
+    deadline = time.monotonic() + conn.execute("PRAGMA busy_timeout").fetchone()[0] / 1000
+    while True:
+        try:
+            conn.execute(f"PRAGMA journal_mode = {mode}").fetchone()
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+_thread_state = threading.local()
+
+def get_connection():
+    """Returns the calling thread's connection to DB_NAME, opening it on first use."""
+    conn = getattr(_thread_state, 'conn', None)
+    if conn is not None and _thread_state.db_name == DB_NAME:
+        return conn
+    if conn is not None:
+        conn.close()
+    database, uri = DB_NAME, False
+    if DB_READ_ONLY:
+        database, uri = f"file:{urllib.parse.quote(os.path.abspath(DB_NAME))}?mode=ro", True
+    # isolation_level=None: statements autocommit unless run inside transaction()
+    conn = sqlite3.connect(database, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE,
+                           factory=ProfilingConnection if PROFILING else sqlite3.Connection, uri=uri)
+    configure_connection(conn)
+    # Counts the days set in an attendance_bitmap mask
+    conn.create_function("popcount", 1, int.bit_count, deterministic=True)
+    _thread_state.conn = conn
+    _thread_state.db_name = DB_NAME
+    _thread_state.depth = 0
+    _thread_state.data_version = None
+    _thread_state.archives = OrderedDict() # year -> schema of the archives attached, least recently used first
+    return conn
+
+def close_connection():
+    """Closes the calling thread's connection, if it has one."""
+    conn = getattr(_thread_state, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _thread_state.conn = None
+
+def _forget_connection_after_fork():
+    # A connection must never be shared with a forked child; let it open its own.
+    _thread_state.conn = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_connection_after_fork)
+
+@contextmanager
+def transaction():
+    """Runs the enclosed statements as one transaction and yields a cursor.
+
+    Commits on success and rolls back on any exception. Nested calls become
+    savepoints of the outermost transaction. The write lock is taken up
+    front (BEGIN IMMEDIATE), where busy_timeout can wait for it; a deferred
+    transaction that reads before writing fails at once with "database is
+    locked" if another process commits in between.
+    """
+    conn = get_connection()
+    depth = _thread_state.depth
+    savepoint = f"sp_{depth}"
+    conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+    _thread_state.depth = depth + 1
+    try:
+        yield conn.cursor()
+    except BaseException:
+        _thread_state.depth = depth
+        if depth == 0:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        raise
+    _thread_state.depth = depth
+    conn.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+
+def checkpoint_wal(mode='PASSIVE'):
+    """Copies committed WAL pages into the database file; returns (busy, wal_pages, checkpointed_pages).
+
+    PASSIVE never waits for other connections. TRUNCATE also empties the
+    -wal file, waiting (up to busy_timeout) for readers to finish.
+    """
+    return get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+class WalCheckpointer:
+    """Runs checkpoint_wal() every interval seconds on a daemon thread.
+
+    SQLite checkpoints automatically on commit, but a checkpoint cannot
+    reach past a reader that is still open, so with several app copies
+    reading all day the -wal file keeps growing. Checkpointing on a timer
+    lets it catch up between reports.
+    """
+    def __init__(self, interval=WAL_CHECKPOINT_INTERVAL_S):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="attendance-checkpoint", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    checkpoint_wal()
+                except sqlite3.Error as e:
+                    print(f"WAL checkpoint failed: {e}")
+        finally:
+            close_connection()
+
+# --- Query Result Cache ---
+# Employee rows and each employee's monthly status counts, percentages and
+# salaries are memoized in bounded LRU caches; the employee summary and the
+# employee chart read through them. Our own writes invalidate exactly the affected entries; commits by
+# any other connection (another thread or another copy of the app) are
+# detected through PRAGMA data_version and clear everything.
+CACHE_MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache with hit/miss counters."""
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0 # Bumped on every invalidation; see put()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached value or _MISSING, counting the hit or miss."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, generation):
+        """Stores value unless an invalidation happened since `generation` was read."""
+        with self._lock:
+            if generation != self.generation:
+                return # Computed from data that has changed since
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Drops every entry whose key satisfies predicate(key)."""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+_employee_cache = LRUCache()   # emp_id -> employee row
+_percentage_cache = LRUCache() # (emp_id, year, month) -> attendance percentage
+_salary_cache = LRUCache()     # (emp_id, year, month) -> calculated salary
+_status_counts_cache = LRUCache() # (emp_id, year, month) -> {status: days}
+
+def cache_stats():
+    """Returns hit/miss counters and sizes for each result cache, and the chart image cache."""
+    return {'employee': _employee_cache.stats(),
+            'percentage': _percentage_cache.stats(),
+            'salary': _salary_cache.stats(),
+            'status_counts': _status_counts_cache.stats(),
+            'chart': chart_cache.memory.stats()}
+
+def clear_caches():
+    for cache in (_employee_cache, _percentage_cache, _salary_cache, _status_counts_cache):
+        cache.clear()
+
+def _check_external_writes():
+    """Clears every cache if another connection has committed since this thread last checked."""
+    version = get_connection().execute("PRAGMA data_version").fetchone()[0]
+    if version != _thread_state.data_version:
+        if _thread_state.data_version is not None:
+            clear_caches()
+        _thread_state.data_version = version
+
+def _cached(cache, key, compute):
+    _check_external_writes()
+    value = cache.get(key)
+    if value is _MISSING:
+        generation = cache.generation
+        value = compute()
+        if value is not None:
+            cache.put(key, value, generation)
+    return value
+
+def _employee_key(emp_id):
+    try:
+        return int(emp_id)
+    except (TypeError, ValueError):
+        return None
+
+def _invalidate_employee(emp_id, attendance=False):
+    """Drops cached data for an employee; attendance=True also drops their monthly percentages and counts."""
+    _invalidate_employees([emp_id], attendance)
+
+def _invalidate_employees(emp_ids, attendance=False):
+    """_invalidate_employee() for many employees, in one pass over each cache."""
+    emp_ids = {_employee_key(emp_id) for emp_id in emp_ids}
+    for emp_id in emp_ids:
+        _employee_cache.discard(emp_id)
+    _salary_cache.discard_where(lambda key: key[0] in emp_ids)
+    if attendance:
+        _percentage_cache.discard_where(lambda key: key[0] in emp_ids)
+        _status_counts_cache.discard_where(lambda key: key[0] in emp_ids)
+
+def _invalidate_attendance(emp_id, year, month):
+    """Drops the cached status counts, percentage and salary for an employee-month."""
+    key = (_employee_key(emp_id), year, month)
+    _status_counts_cache.discard(key)
+    _percentage_cache.discard(key)
+    _salary_cache.discard(key)
+
 # --- Database Operations ---
-def init_db():
-    """Initializes the SQLite database and preloads dummy data."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Create tables
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            join_date TEXT NOT NULL,
-            salary REAL NOT NULL,
-            password TEXT NOT NULL
-        )
-    ''')
+# Stored in PRAGMA user_version once init_db() has created or migrated the
+# schema. Bump it whenever init_db() gains a table, index, trigger or migration.
+SCHEMA_VERSION = 6
+
+def init_db(preload_dummy_data=True):
+    """Initializes the SQLite database and, if it has no employees, preloads dummy data.
+
+    Dummy data is only considered while the schema is being set up. A
+    database whose user_version is already SCHEMA_VERSION is left as is,
+    so a normal launch costs one header read instead of re-running every
+    CREATE ... IF NOT EXISTS and migration check. The DB_PROFILE journal
+    mode is applied either way.
+    """
+    conn = get_connection()
+    set_journal_mode(conn, CONNECTION_PROFILES[DB_PROFILE]['journal_mode'])
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    with transaction() as cursor:
+        # Create tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS employees (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                join_date TEXT NOT NULL,
+                salary REAL NOT NULL,
+                password TEXT NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER,
+                date TEXT NOT NULL,
+                status TEXT NOT NULL, -- 'Present' or 'Absent'
+                FOREIGN KEY (employee_id) REFERENCES employees(id)
+            )
+        ''')
+
+        _migrate_unique_attendance(cursor)
+        # Covering indexes for monthly reports: per employee, and per day across employees
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_employee_date_status ON attendance (employee_id, date, status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_employee_status ON attendance (date, employee_id, status)")
+        _create_employee_search_index(cursor)
+        _create_attendance_monthly(cursor)
+        _create_attendance_bitmap(cursor)
+        _create_data_versions(cursor)
+        _create_attendance_changes(cursor)
+        _create_attendance_archives(cursor)
+
+        # Preload dummy employees if table is empty
+        cursor.execute("SELECT COUNT(*) FROM employees")
+        if preload_dummy_data and cursor.fetchone()[0] == 0:
+            dummy_employees = [
+                ("Alice Smith", "2023-01-15", 50000, "alice123"),
+                ("Bob Johnson", "2023-02-20", 60000, "bob456"),
+                ("Charlie Brown", "2023-03-10", 45000, "charlie789"),
+                ("Diana Prince", "2023-04-01", 70000, "diana000"),
+                ("Eve Adams", "2023-05-05", 55000, "eve111"),
+                ("Frank White", "2023-06-12", 48000, "frank222"),
+                ("Grace Lee", "2023-07-18", 62000, "grace333"),
+                ("Henry King", "2023-08-25", 53000, "henry444"),
+                ("Ivy Chen", "2023-09-01", 58000, "ivy555"),
+                ("Jack Green", "2023-10-10", 65000, "jack666")
+            ]
+            cursor.executemany("INSERT INTO employees (name, join_date, salary, password) VALUES (?, ?, ?, ?)", dummy_employees)
+
+            # Preload some dummy attendance data for the last 30 days
+            today = datetime.now().date()
+            dummy_attendance = []
+            for i in range(30):
+                current_date = today - timedelta(days=i)
+                date_str = current_date.strftime('%Y-%m-%d')
+                for emp_id in range(1, 11): # For each dummy employee
+                    status = 'Present' if (emp_id + i) % 3 != 0 else 'Absent' # Mostly present, some absent
+                    dummy_attendance.append((emp_id, date_str, status))
+            cursor.executemany("INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)", dummy_attendance)
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def year_month_key(year, month):
+    """The 'YYYY-MM' key used by attendance_monthly."""
+    return f"{year:04d}-{month:02d}"
+
+def month_window(year, month):
+    """Returns (first_day, next_month_first_day, days_in_month) for a month.
+
+    The two dates are '%Y-%m-%d' strings meant for a half-open
+    `date >= ? AND date < ?` range, which SQLite can answer from an index
+    (unlike STRFTIME('%Y-%m', date) = ?).
+    """
+    first_day = datetime(year, month, 1)
+    next_month = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return first_day.strftime('%Y-%m-%d'), next_month.strftime('%Y-%m-%d'), (next_month - first_day).days
+
+def _migrate_unique_attendance(cursor):
+    """Drops duplicate (employee_id, date) rows and adds the unique index that prevents them."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_attendance_employee_date'")
+    if cursor.fetchone():
+        return
+    # Keep the most recently written record for each employee and day
+    cursor.execute("""
+        DELETE FROM attendance
+        WHERE id NOT IN (SELECT MAX(id) FROM attendance GROUP BY employee_id, date)
+    """)
+    cursor.execute("CREATE UNIQUE INDEX idx_attendance_employee_date ON attendance (employee_id, date)")
+
+def _create_employee_search_index(cursor):
+    """Creates the trigram full-text index on employee names and the triggers that keep it in sync.
+
+    Skipped quietly when this SQLite build lacks FTS5 or the trigram
+    tokenizer; search_employees() then falls back to a LIKE scan.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'employees_fts'")
+    if cursor.fetchone():
+        return
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE employees_fts USING fts5(
+                name, content='employees', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_insert AFTER INSERT ON employees BEGIN
+            INSERT INTO employees_fts (rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_delete AFTER DELETE ON employees BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_update AFTER UPDATE OF name ON employees BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO employees_fts (rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    cursor.execute("INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')")
+
+def _create_attendance_monthly(cursor):
+    """Creates the per employee-month attendance summary and the triggers that maintain it.
+
+    attendance_monthly holds Present/Absent day counts for every
+    (employee_id, 'YYYY-MM') that has records, so monthly reports read one
+    row per employee instead of the raw attendance history. The triggers
+    keep it exact for inserts, status flips, moves and deletes; the first
+    creation fills it from the existing records. When only the triggers
+    were dropped, this puts them back without touching the table.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attendance_monthly'")
+    fill = cursor.fetchone() is None
+    _create_attendance_monthly_table(cursor, "main")
+    add_counts = """
+        INSERT INTO attendance_monthly (employee_id, year_month, present, absent)
+        VALUES (new.employee_id, substr(new.date, 1, 7), new.status = 'Present', new.status = 'Absent')
+        ON CONFLICT (employee_id, year_month) DO UPDATE SET
+            present = present + excluded.present, absent = absent + excluded.absent;
+    """
+    remove_counts = """
+        UPDATE attendance_monthly
+        SET present = present - (old.status = 'Present'), absent = absent - (old.status = 'Absent')
+        WHERE employee_id = old.employee_id AND year_month = substr(old.date, 1, 7);
+        DELETE FROM attendance_monthly
+        WHERE employee_id = old.employee_id AND year_month = substr(old.date, 1, 7)
+        AND present = 0 AND absent = 0;
+    """
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS attendance_monthly_insert AFTER INSERT ON attendance BEGIN {add_counts} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS attendance_monthly_delete AFTER DELETE ON attendance BEGIN {remove_counts} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS attendance_monthly_update AFTER UPDATE OF employee_id, date, status ON attendance
+        BEGIN {remove_counts} {add_counts} END
+    """)
+    if fill:
+        _fill_attendance_monthly(cursor)
+
+def _create_attendance_monthly_table(cursor, schema):
+    """The attendance_monthly table and its month index, in the database `schema` (also used for archives)."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.attendance_monthly (
+            employee_id INTEGER NOT NULL,
+            year_month TEXT NOT NULL, -- 'YYYY-MM'
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (employee_id, year_month)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute(f"""
+        CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_monthly_month
+        ON attendance_monthly (year_month, employee_id, present, absent)
+    """)
 
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS attendance (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+def _fill_attendance_monthly(cursor):
+    cursor.execute("DELETE FROM attendance_monthly")
+    cursor.execute("""
+        INSERT INTO attendance_monthly (employee_id, year_month, present, absent)
+        SELECT employee_id, substr(date, 1, 7), SUM(status = 'Present'), SUM(status = 'Absent')
+        FROM attendance
+        GROUP BY employee_id, substr(date, 1, 7)
+    """)
+
+def _drop_attendance_monthly(cursor):
+    """Drops the summary and its triggers, e.g. before a bulk load; _create_attendance_monthly() rebuilds both."""
+    _drop_attendance_monthly_triggers(cursor)
+    cursor.execute("DROP TABLE IF EXISTS attendance_monthly")
+
+def _drop_attendance_monthly_triggers(cursor):
+    """Drops only the summary triggers, for writes that keep the summary right themselves."""
+    for trigger in ("attendance_monthly_insert", "attendance_monthly_delete", "attendance_monthly_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+def rebuild_attendance_monthly():
+    """Recomputes the attendance_monthly summary from the raw attendance records."""
+    with transaction() as cursor:
+        _fill_attendance_monthly(cursor)
+    clear_caches()
+
+# --- Compact Attendance Storage ---
+# Attendance can be kept either as one attendance row per employee per day
+# ('rows', the default) or as one attendance_bitmap row per employee-month
+# ('bitmap'): bit d-1 of `marked` is set when day d has a record and the same
+# bit of `present` says whether it was Present. Monthly counts are popcounts
+# of the masks. The mode is stored in app_settings and switched, moving every
+# record, by migrate_attendance_storage(); the functions below read and write
+# whichever store is active.
+STORAGE_ROWS = 'rows'
+STORAGE_BITMAP = 'bitmap'
+
+def _create_attendance_bitmap(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_bitmap (
+            employee_id INTEGER NOT NULL,
+            year_month TEXT NOT NULL, -- 'YYYY-MM'
+            present INTEGER NOT NULL DEFAULT 0, -- bit d-1: day d was Present
+            marked INTEGER NOT NULL DEFAULT 0,  -- bit d-1: day d has a record
+            PRIMARY KEY (employee_id, year_month)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_bitmap_month ON attendance_bitmap (year_month, employee_id, present, marked)")
+    # Same columns as attendance_monthly, for the monthly reports
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS attendance_bitmap_monthly AS
+        SELECT employee_id, year_month, popcount(present) AS present, popcount(marked & ~present) AS absent
+        FROM attendance_bitmap
+    """)
+    # Same columns as attendance, one row per marked day, for history and exports
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS attendance_bitmap_days AS
+        WITH RECURSIVE days(day) AS (SELECT 1 UNION ALL SELECT day + 1 FROM days WHERE day < 31)
+        SELECT b.employee_id, b.year_month || '-' || printf('%02d', days.day) AS date,
+               CASE WHEN (b.present >> (days.day - 1)) & 1 THEN 'Present' ELSE 'Absent' END AS status
+        FROM attendance_bitmap b JOIN days ON (b.marked >> (days.day - 1)) & 1
+    """)
+
+def attendance_storage():
+    """The active attendance store: STORAGE_ROWS or STORAGE_BITMAP."""
+    row = get_connection().execute("SELECT value FROM app_settings WHERE key = 'attendance_storage'").fetchone()
+    return row[0] if row else STORAGE_ROWS
+
+def _attendance_days_source():
+    """Table or view with (employee_id, date, status) rows for the active store."""
+    return 'attendance_bitmap_days' if attendance_storage() == STORAGE_BITMAP else 'attendance'
+
+def _monthly_counts_source(year=None):
+    """Table or view with (employee_id, year_month, present, absent) rows for the active store.
+
+    Pass the year being read to get the archive's summary when that year is archived.
+    """
+    schema = _archive_schema(year) if year is not None else None
+    if schema is not None:
+        return f"{schema}.attendance_monthly"
+    return 'attendance_bitmap_monthly' if attendance_storage() == STORAGE_BITMAP else 'attendance_monthly'
+
+def parse_attendance_date(date):
+    """Parses a 'YYYY-MM-DD' attendance date into a datetime.
+
+    Raises ValueError for anything else, including dates strptime() would
+    accept without zero padding ('2025-3-5'): stored dates are compared and
+    sliced as text, so they must have exactly this form.
+    """
+    if not isinstance(date, str):
+        raise ValueError(f"Invalid attendance date {date!r}; expected YYYY-MM-DD")
+    parsed = datetime.strptime(date, '%Y-%m-%d')
+    if parsed.strftime('%Y-%m-%d') != date:
+        raise ValueError(f"Invalid attendance date {date!r}; expected YYYY-MM-DD")
+    return parsed
+
+def _bitmap_position(date):
+    """Returns ('YYYY-MM', bit) for a '%Y-%m-%d' date. Raises ValueError for anything else."""
+    parsed = parse_attendance_date(date)
+    return f"{parsed.year:04d}-{parsed.month:02d}", 1 << (parsed.day - 1)
+
+def _bitmap_masks(status, bit):
+    """(present, marked) masks that record status on the day of bit."""
+    if status not in ('Present', 'Absent'):
+        raise ValueError(f"Invalid attendance status: {status!r}")
+    return (bit if status == 'Present' else 0), bit
+
+# Sets the `marked` bits given and their Present/Absent state, leaving other days alone
+UPSERT_BITMAP_SQL = """
+    INSERT INTO attendance_bitmap (employee_id, year_month, present, marked) VALUES (?, ?, ?, ?)
+    ON CONFLICT (employee_id, year_month) DO UPDATE SET
+        present = (present & ~excluded.marked) | excluded.present,
+        marked = marked | excluded.marked
+"""
+
+def migrate_attendance_storage(target):
+    """Moves every attendance record into the `target` store and returns how many were moved.
+
+    Runs as one transaction. Moving to STORAGE_BITMAP empties the attendance
+    table and its summary; moving back re-creates both from the bitmaps.
+    Statuses other than 'Present' are stored as Absent in bitmaps.
+    """
+    if target not in (STORAGE_ROWS, STORAGE_BITMAP):
+        raise ValueError(f"Unknown attendance storage: {target!r}")
+    with transaction() as cursor:
+        if attendance_storage() == target:
+            return 0
+        # No record changes, so neither the data versions nor the change log need the per-row triggers
+        _drop_data_version_triggers(cursor)
+        _drop_change_triggers(cursor)
+        if target == STORAGE_BITMAP:
+            moved = cursor.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+            cursor.execute("""
+                INSERT INTO attendance_bitmap (employee_id, year_month, present, marked)
+                SELECT employee_id, substr(date, 1, 7),
+                       SUM(CASE WHEN status = 'Present' THEN 1 << (CAST(substr(date, 9, 2) AS INTEGER) - 1) ELSE 0 END),
+                       SUM(1 << (CAST(substr(date, 9, 2) AS INTEGER) - 1))
+                FROM attendance
+                GROUP BY employee_id, substr(date, 1, 7)
+            """)
+            # Dropping the summary triggers first spares a trigger run per deleted row
+            _drop_attendance_monthly(cursor)
+            cursor.execute("DELETE FROM attendance")
+            _create_attendance_monthly(cursor)
+        else:
+            moved = cursor.execute("SELECT COALESCE(SUM(popcount(marked)), 0) FROM attendance_bitmap").fetchone()[0]
+            _drop_attendance_monthly(cursor)
+            cursor.execute("""
+                INSERT INTO attendance (employee_id, date, status)
+                SELECT employee_id, date, status FROM attendance_bitmap_days ORDER BY employee_id, date
+            """)
+            _create_attendance_monthly(cursor)
+            cursor.execute("DELETE FROM attendance_bitmap")
+        _create_data_versions(cursor)
+        _bump_data_versions(cursor)
+        _create_attendance_changes(cursor)
+        cursor.execute("""
+            INSERT INTO app_settings (key, value) VALUES ('attendance_storage', ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """, (target,))
+    clear_caches()
+    return moved
+
+# --- Data Versions ---
+# data_versions counts the writes to each part of the data: 'employees' for
+# the employees table and 'attendance:YYYY-MM' for a month of attendance, in
+# either storage. Triggers bump them, so writes from any connection or copy
+# of the app are seen. Derived results such as rendered charts are cached
+# against these versions instead of re-reading the data.
+
+def _create_data_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    def bump(scope):
+        return f"""
+            INSERT INTO data_versions (scope, version) VALUES ({scope}, 1)
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        """
+    employees = "'employees'"
+    new_month, old_month = "'attendance:' || substr(new.date, 1, 7)", "'attendance:' || substr(old.date, 1, 7)"
+    new_bitmap_month, old_bitmap_month = "'attendance:' || new.year_month", "'attendance:' || old.year_month"
+    triggers = {
+        "data_versions_employees_insert": f"AFTER INSERT ON employees BEGIN {bump(employees)} END",
+        "data_versions_employees_delete": f"AFTER DELETE ON employees BEGIN {bump(employees)} END",
+        # Password changes do not show up in any report
+        "data_versions_employees_update": f"""AFTER UPDATE OF name, join_date, salary ON employees
+            WHEN old.name IS NOT new.name OR old.join_date IS NOT new.join_date OR old.salary IS NOT new.salary
+            BEGIN {bump(employees)} END""",
+        "data_versions_attendance_insert": f"AFTER INSERT ON attendance BEGIN {bump(new_month)} END",
+        "data_versions_attendance_delete": f"AFTER DELETE ON attendance BEGIN {bump(old_month)} END",
+        # Re-marking a day with the status it already has is an UPDATE that changes nothing
+        "data_versions_attendance_update": f"""AFTER UPDATE OF employee_id, date, status ON attendance
+            WHEN old.employee_id IS NOT new.employee_id OR old.date IS NOT new.date OR old.status IS NOT new.status
+            BEGIN {bump(old_month)} {bump(new_month)} END""",
+        "data_versions_bitmap_insert": f"AFTER INSERT ON attendance_bitmap BEGIN {bump(new_bitmap_month)} END",
+        "data_versions_bitmap_delete": f"AFTER DELETE ON attendance_bitmap BEGIN {bump(old_bitmap_month)} END",
+        "data_versions_bitmap_update": f"""AFTER UPDATE ON attendance_bitmap
+            WHEN old.present IS NOT new.present OR old.marked IS NOT new.marked
+            BEGIN {bump(new_bitmap_month)} END""",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+def _drop_data_version_triggers(cursor):
+    """Drops the version triggers before a bulk write, which would otherwise pay for one upsert per row.
+
+    Restore them afterwards with _create_data_versions() and
+    _bump_data_versions(), in the same transaction.
+    """
+    names = [row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'data_versions_%'")]
+    for name in names:
+        cursor.execute(f"DROP TRIGGER {name}")
+
+def _bump_data_versions(cursor):
+    """Bumps the employees scope and the scope of every month with attendance, in either storage."""
+    cursor.execute("""
+        INSERT INTO data_versions (scope, version)
+        SELECT 'employees', 1
+        UNION SELECT 'attendance:' || year_month, 1 FROM attendance_monthly
+        UNION SELECT 'attendance:' || year_month, 1 FROM attendance_bitmap
+        WHERE true -- Parsed as a join constraint otherwise
+        ON CONFLICT (scope) DO UPDATE SET version = version + 1
+    """)
+
+def attendance_scope(year, month):
+    """The data_versions scope of a month's attendance."""
+    return f"attendance:{year_month_key(year, month)}"
+
+def get_data_version(*scopes):
+    """Combined version of the given scopes; it changes whenever any of them is written."""
+    # Every version only ever goes up, so their sum does too
+    placeholders = ", ".join("?" * len(scopes))
+    cursor = get_connection().execute(f"SELECT COALESCE(SUM(version), 0) FROM data_versions WHERE scope IN ({placeholders})", scopes)
+    return cursor.fetchone()[0]
+
+# --- Change Tracking ---
+# attendance_changes is an append-only log of every change to an attendance
+# record: one row per (employee_id, date) written, with its status before
+# and after (NULL before: a new record; NULL after: deleted, a tombstone).
+# Triggers on attendance and attendance_bitmap fill it, so mark_attendance,
+# the bulk paths and delete_employee are all covered in either storage. seq
+# only ever increases (AUTOINCREMENT), which makes it the watermark of the
+# incremental export.
+#
+# Pruning: the log only runs once incremental exports are in use. Until the
+# first one there are no triggers and the log is empty, since that export
+# writes every record anyway. It starts the log by storing an empty
+# watermark before it reads anything. Every export that completes deletes
+# the changes up to its watermark, so the log holds only the changes since
+# the last export. In a database that logged changes before its first
+# export, init_db() empties the log and drops its triggers.
+
+def _change_log_started(cursor):
+    """True once the first incremental export has stored a watermark, even an empty one."""
+    cursor.execute("SELECT 1 FROM app_settings WHERE key = ?", (EXPORT_WATERMARK_KEY,))
+    return cursor.fetchone() is not None
+
+def _create_attendance_changes(cursor):
+    """Creates the change log, and its triggers once the log is started (see above)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
             employee_id INTEGER,
             date TEXT NOT NULL,
-            status TEXT NOT NULL, -- 'Present' or 'Absent'
-            FOREIGN KEY (employee_id) REFERENCES employees(id)
+            old_status TEXT, -- NULL: the record was created
+            status TEXT      -- NULL: the record was deleted
+        )
+    """)
+    # Day numbers 1-31 for expanding a bitmap's changed bits; triggers cannot use a recursive CTE
+    cursor.execute("CREATE TABLE IF NOT EXISTS month_days (day INTEGER PRIMARY KEY)")
+    cursor.executemany("INSERT OR IGNORE INTO month_days (day) VALUES (?)", [(day,) for day in range(1, 32)])
+    if not _change_log_started(cursor):
+        _drop_change_triggers(cursor)
+        cursor.execute("DELETE FROM attendance_changes")
+        return
+
+    def bit(row, mask):
+        return f"(({row}.{mask} >> (d.day - 1)) & 1)"
+
+    def day_status(row):
+        if row is None:
+            return "NULL"
+        return f"CASE WHEN {bit(row, 'marked')} = 0 THEN NULL WHEN {bit(row, 'present')} THEN 'Present' ELSE 'Absent' END"
+
+    def log_days(old, new, day_filter):
+        """One change per day of a bitmap row that matches day_filter; old or new is None for inserts and deletes."""
+        row = new or old
+        return f"""
+            INSERT INTO attendance_changes (employee_id, date, old_status, status)
+            SELECT {row}.employee_id, {row}.year_month || '-' || printf('%02d', d.day), {day_status(old)}, {day_status(new)}
+            FROM month_days d WHERE {day_filter};
+        """
+    changed_day = f"{bit('old', 'marked')} != {bit('new', 'marked')} OR {bit('old', 'present')} != {bit('new', 'present')}"
+    log = "INSERT INTO attendance_changes (employee_id, date, old_status, status) VALUES"
+    triggers = {
+        "attendance_changes_insert": f"AFTER INSERT ON attendance BEGIN {log} (new.employee_id, new.date, NULL, new.status); END",
+        "attendance_changes_delete": f"AFTER DELETE ON attendance BEGIN {log} (old.employee_id, old.date, old.status, NULL); END",
+        # A record moved to another employee or date is a delete plus an insert
+        "attendance_changes_update": """AFTER UPDATE OF employee_id, date, status ON attendance
+            WHEN old.employee_id IS NOT new.employee_id OR old.date IS NOT new.date OR old.status IS NOT new.status
+            BEGIN
+                INSERT INTO attendance_changes (employee_id, date, old_status, status)
+                SELECT old.employee_id, old.date, old.status, NULL
+                WHERE old.employee_id IS NOT new.employee_id OR old.date IS NOT new.date;
+                INSERT INTO attendance_changes (employee_id, date, old_status, status)
+                SELECT new.employee_id, new.date,
+                       CASE WHEN old.employee_id IS new.employee_id AND old.date IS new.date THEN old.status END, new.status;
+            END""",
+        "attendance_changes_bitmap_insert": f"""AFTER INSERT ON attendance_bitmap
+            BEGIN {log_days(None, 'new', bit('new', 'marked'))} END""",
+        "attendance_changes_bitmap_delete": f"""AFTER DELETE ON attendance_bitmap
+            BEGIN {log_days('old', None, bit('old', 'marked'))} END""",
+        "attendance_changes_bitmap_update": f"""AFTER UPDATE ON attendance_bitmap
+            WHEN old.present IS NOT new.present OR old.marked IS NOT new.marked
+            BEGIN {log_days('old', 'new', changed_day)} END""",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+def _drop_change_triggers(cursor):
+    """Drops the change log triggers for writes that do not change any record, like a storage migration."""
+    names = [row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'attendance_changes_%'")]
+    for name in names:
+        cursor.execute(f"DROP TRIGGER {name}")
+
+# --- Attendance Archives ---
+# Closed years can be moved out of DB_NAME into one SQLite file per year next
+# to it (employee_attendance-2023.db), so the live tables and their indexes
+# only hold recent attendance. An archive always uses the row format, with an
+# attendance table and its attendance_monthly summary, whatever the active
+# storage. attendance_archives lists them. A connection ATTACHes an archive
+# the first time a query touches its year; the report, history and export
+# functions below then read it next to the live tables. Archived years are
+# read-only until restore_archived_year() moves them back.
+
+def _create_attendance_archives(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_archives (
+            year INTEGER PRIMARY KEY,
+            file TEXT NOT NULL, -- Relative to the directory of DB_NAME
+            records INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
         )
-    ''')
-
-    # Preload dummy employees if table is empty
-    cursor.execute("SELECT COUNT(*) FROM employees")
-    if cursor.fetchone()[0] == 0:
-        dummy_employees = [
-            ("Alice Smith", "2023-01-15", 50000, "alice123"),
-            ("Bob Johnson", "2023-02-20", 60000, "bob456"),
-            ("Charlie Brown", "2023-03-10", 45000, "charlie789"),
-            ("Diana Prince", "2023-04-01", 70000, "diana000"),
-            ("Eve Adams", "2023-05-05", 55000, "eve111"),
-            ("Frank White", "2023-06-12", 48000, "frank222"),
-            ("Grace Lee", "2023-07-18", 62000, "grace333"),
-            ("Henry King", "2023-08-25", 53000, "henry444"),
-            ("Ivy Chen", "2023-09-01", 58000, "ivy555"),
-            ("Jack Green", "2023-10-10", 65000, "jack666")
-        ]
-        cursor.executemany("INSERT INTO employees (name, join_date, salary, password) VALUES (?, ?, ?, ?)", dummy_employees)
-        conn.commit()
-
-        # Preload some dummy attendance data for the last 30 days
-        today = datetime.now().date()
-        for i in range(30):
-            current_date = today - timedelta(days=i)
-            date_str = current_date.strftime('%Y-%m-%d')
-            for emp_id in range(1, 11): # For each dummy employee
-                status = 'Present' if (emp_id + i) % 3 != 0 else 'Absent' # Mostly present, some absent
-                cursor.execute("INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)",
-                               (emp_id, date_str, status))
-        conn.commit()
-
-    conn.close()
+    """)
+
+def archive_file_path(file_name):
+    """Full path of an archive file listed in attendance_archives."""
+    return os.path.join(os.path.dirname(os.path.abspath(DB_NAME)), file_name)
+
+def archived_years():
+    """The archived years, oldest first."""
+    return [row[0] for row in get_connection().execute("SELECT year FROM attendance_archives ORDER BY year")]
+
+def get_attendance_archives():
+    """(year, path, records, archived_at) for every archive, oldest first."""
+    return [(year, archive_file_path(file), records, archived_at) for year, file, records, archived_at in
+            get_connection().execute("SELECT year, file, records, archived_at FROM attendance_archives ORDER BY year")]
+
+def _archive_schema(year):
+    """Schema name of the archive holding `year`, ATTACHed to this thread's connection; None if it is not archived.
+
+    Attached archives stay attached for later queries; when SQLite's limit
+    on attached databases is reached the least recently used one is
+    detached. ATTACH cannot run inside a transaction, so writers attach
+    what they need before starting one.
+    """
+    conn = get_connection()
+    row = conn.execute("SELECT file FROM attendance_archives WHERE year = ?", (year,)).fetchone()
+    if row is None:
+        return None
+    schema = f"archive_{int(year)}"
+    attached = _thread_state.archives
+    if year in attached:
+        attached.move_to_end(year)
+        return schema
+    path = archive_file_path(row[0])
+    _require_archive_file(year, path)
+    while len(attached) >= conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+        oldest, _ = attached.popitem(last=False)
+        conn.execute(f"DETACH DATABASE archive_{oldest}")
+    conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    attached[year] = schema
+    return schema
+
+def _require_archive_file(year, path):
+    if not os.path.exists(path): # ATTACH would quietly create an empty database instead
+        raise FileNotFoundError(f"The attendance archive for {year} is missing: {path}")
+
+def _archive_schema_for_date(date):
+    """_archive_schema() for the year of a '%Y-%m-%d' date."""
+    year = date[:4]
+    return _archive_schema(int(year)) if year.isdigit() else None
+
+def _check_not_archived(date, archived=None):
+    """Raises ValueError if `date` falls in an archived year; pass set(archived_years()) when checking many dates."""
+    year = int(date[:4]) if date[:4].isdigit() else None
+    if year is not None and year in (archived if archived is not None else archived_years()):
+        raise ValueError(f"Attendance for {year} is archived; restore the year before changing it")
+
+def _drop_attendance_triggers(cursor):
+    """Drops every per-row trigger on the attendance stores, for moves that do not change any record."""
+    _drop_attendance_monthly_triggers(cursor)
+    _drop_data_version_triggers(cursor)
+    _drop_change_triggers(cursor)
+
+def _create_attendance_triggers(cursor):
+    """Restores the triggers dropped by _drop_attendance_triggers(), in the same transaction."""
+    _create_attendance_monthly(cursor)
+    _create_data_versions(cursor)
+    _create_attendance_changes(cursor)
+
+def archive_year(year):
+    """Moves every attendance record of a closed year into its own archive file and returns how many moved.
+
+    The archive is written and synced under a temporary name first and only
+    then registered, in the same transaction that deletes the year from the
+    live tables, so a crash leaves the year either live or archived. Data
+    versions and the change log are untouched: no record changed. Raises
+    ValueError for the current or a future year, or one already archived.
+    The freed pages are reused by new records; VACUUM shrinks the file.
+    """
+    year = int(year)
+    if year >= datetime.now().year:
+        raise ValueError(f"Only closed years can be archived, not {year}")
+    if _archive_schema(year) is not None:
+        raise ValueError(f"{year} is already archived")
+    first_day, next_year = f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    conn = get_connection()
+    days_source, counts_source = _attendance_days_source(), _monthly_counts_source()
+    records = conn.execute(f"SELECT COUNT(*) FROM {days_source} WHERE date >= ? AND date < ?",
+                           (first_day, next_year)).fetchone()[0]
+    if records == 0:
+        return 0
+
+    file_name = f"{os.path.splitext(os.path.basename(DB_NAME))[0]}-{year}.db"
+    path = archive_file_path(file_name)
+    building = path + ".tmp"
+    if os.path.exists(building):
+        os.remove(building) # Left over from an archive run that did not finish
+    conn.execute("ATTACH DATABASE ? AS archive_new", (building,))
+    try:
+        conn.execute("PRAGMA archive_new.journal_mode = DELETE") # Written once, then only read
+        with transaction() as cursor:
+            cursor.execute("""
+                CREATE TABLE archive_new.attendance (
+                    id INTEGER PRIMARY KEY,
+                    employee_id INTEGER,
+                    date TEXT NOT NULL,
+                    status TEXT NOT NULL
+                )
+            """)
+            cursor.execute(f"""
+                INSERT INTO archive_new.attendance (employee_id, date, status)
+                SELECT employee_id, date, status FROM {days_source}
+                WHERE date >= ? AND date < ? ORDER BY employee_id, date
+            """, (first_day, next_year))
+            # The same indexes as the live table, for history pages and days across employees
+            cursor.execute("CREATE UNIQUE INDEX archive_new.idx_attendance_employee_date ON attendance (employee_id, date)")
+            cursor.execute("CREATE INDEX archive_new.idx_attendance_employee_date_status ON attendance (employee_id, date, status)")
+            cursor.execute("CREATE INDEX archive_new.idx_attendance_date_employee_status ON attendance (date, employee_id, status)")
+            _create_attendance_monthly_table(cursor, "archive_new")
+            cursor.execute(f"""
+                INSERT INTO archive_new.attendance_monthly (employee_id, year_month, present, absent)
+                SELECT employee_id, year_month, present, absent FROM {counts_source}
+                WHERE year_month >= ? AND year_month < ?
+            """, (first_day[:7], next_year[:7]))
+            cursor.execute("ANALYZE archive_new")
+    finally:
+        conn.execute("DETACH DATABASE archive_new")
+    with open(building, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(building, path)
+
+    with transaction() as cursor:
+        # Another copy of the app may have marked a day of the year in the meantime
+        if cursor.execute(f"SELECT COUNT(*) FROM {days_source} WHERE date >= ? AND date < ?",
+                          (first_day, next_year)).fetchone()[0] != records:
+            os.remove(path)
+            raise ValueError(f"Attendance for {year} changed while it was being archived; try again")
+        _drop_attendance_triggers(cursor)
+        if attendance_storage() == STORAGE_BITMAP:
+            cursor.execute("DELETE FROM attendance_bitmap WHERE year_month >= ? AND year_month < ?", (first_day[:7], next_year[:7]))
+        else:
+            cursor.execute("DELETE FROM attendance WHERE date >= ? AND date < ?", (first_day, next_year))
+            cursor.execute("DELETE FROM attendance_monthly WHERE year_month >= ? AND year_month < ?", (first_day[:7], next_year[:7]))
+        _create_attendance_triggers(cursor)
+        cursor.execute("INSERT INTO attendance_archives (year, file, records, archived_at) VALUES (?, ?, ?, ?)",
+                       (year, file_name, records, datetime.now().isoformat(timespec='seconds')))
+    clear_caches()
+    return records
+
+def restore_archived_year(year):
+    """Moves an archived year back into the live tables, deletes its archive file and returns the records moved."""
+    year = int(year)
+    schema = _archive_schema(year)
+    if schema is None:
+        raise ValueError(f"{year} is not archived")
+    path = archive_file_path(get_connection().execute(
+        "SELECT file FROM attendance_archives WHERE year = ?", (year,)).fetchone()[0])
+    with transaction() as cursor:
+        _drop_attendance_triggers(cursor)
+        if attendance_storage() == STORAGE_BITMAP:
+            cursor.execute(f"""
+                INSERT INTO attendance_bitmap (employee_id, year_month, present, marked)
+                SELECT employee_id, substr(date, 1, 7),
+                       SUM(CASE WHEN status = 'Present' THEN 1 << (CAST(substr(date, 9, 2) AS INTEGER) - 1) ELSE 0 END),
+                       SUM(1 << (CAST(substr(date, 9, 2) AS INTEGER) - 1))
+                FROM {schema}.attendance
+                GROUP BY employee_id, substr(date, 1, 7)
+            """)
+        else:
+            cursor.execute(f"""
+                INSERT INTO attendance (employee_id, date, status)
+                SELECT employee_id, date, status FROM {schema}.attendance ORDER BY employee_id, date
+            """)
+            cursor.execute(f"""
+                INSERT INTO attendance_monthly (employee_id, year_month, present, absent)
+                SELECT employee_id, year_month, present, absent FROM {schema}.attendance_monthly
+            """)
+        restored = cursor.execute(f"SELECT COUNT(*) FROM {schema}.attendance").fetchone()[0]
+        _create_attendance_triggers(cursor)
+        cursor.execute("DELETE FROM attendance_archives WHERE year = ?", (year,))
+    get_connection().execute(f"DETACH DATABASE {schema}")
+    del _thread_state.archives[year]
+    os.remove(path)
+    clear_caches()
+    return restored
+
+def _delete_archived_attendance(emp_ids):
+    """Deletes employees' records from every archive, logging them in the change log like live deletes.
+
+    emp_ids is a JSON array of employee IDs, as passed to json_each().
+    """
+    for year in archived_years():
+        schema = _archive_schema(year)
+        with transaction() as cursor:
+            if _change_log_started(cursor):
+                cursor.execute(f"""
+                    INSERT INTO attendance_changes (employee_id, date, old_status, status)
+                    SELECT employee_id, date, status, NULL FROM {schema}.attendance
+                    WHERE employee_id IN (SELECT value FROM json_each(?))
+                """, (emp_ids,))
+            cursor.execute(f"""
+                INSERT INTO data_versions (scope, version)
+                SELECT DISTINCT 'attendance:' || year_month, 1 FROM {schema}.attendance_monthly
+                WHERE employee_id IN (SELECT value FROM json_each(?))
+                ON CONFLICT (scope) DO UPDATE SET version = version + 1
+            """, (emp_ids,))
+            cursor.execute(f"DELETE FROM {schema}.attendance WHERE employee_id IN (SELECT value FROM json_each(?))", (emp_ids,))
+            cursor.execute(f"DELETE FROM {schema}.attendance_monthly WHERE employee_id IN (SELECT value FROM json_each(?))", (emp_ids,))
+
+# --- Employee Records ---
+# The functions below never show dialogs: they return results and raise
+# ValueError for invalid fields or sqlite3.Error from the database, so they
+# can run headless, in a background task or from attendance_cli.py. The
+# batch variants write all their employees in one transaction: either every
+# one is written or, on an error, none is.
 
 def get_employees(search_query=""):
     """Fetches all employees from the database, optionally filtered by search_query."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
     if search_query:
-        # Search by name or ID
-        cursor.execute("SELECT id, name, join_date, salary FROM employees WHERE name LIKE ? OR CAST(id AS TEXT) LIKE ? ORDER BY name",
-                       (f"%{search_query}%", f"%{search_query}%"))
-    else:
-        cursor.execute("SELECT id, name, join_date, salary FROM employees ORDER BY name")
-    employees = cursor.fetchall()
-    conn.close()
-    return employees
+        return search_employees(search_query)
+    cursor = get_connection().execute("SELECT id, name, join_date, salary FROM employees ORDER BY name")
+    return cursor.fetchall()
+
+def search_employees(query):
+    """Finds employees by exact numeric ID or by a substring of their name.
+
+    A query of digits is looked up directly by primary key. Name queries of
+    three or more characters use the employees_fts trigram index; shorter
+    ones (or databases without the index) scan with LIKE.
+    """
+    query = query.strip()
+    conn = get_connection()
+    if query.isdigit():
+        cursor = conn.execute("SELECT id, name, join_date, salary FROM employees WHERE id = ?", (int(query),))
+        return cursor.fetchall()
+    if len(query) >= 3 and _has_employee_search_index(conn):
+        phrase = '"' + query.replace('"', '""') + '"'
+        cursor = conn.execute("""
+            SELECT e.id, e.name, e.join_date, e.salary
+            FROM employees_fts f
+            JOIN employees e ON e.id = f.rowid
+            WHERE employees_fts MATCH ?
+            ORDER BY e.name
+        """, (phrase,))
+        return cursor.fetchall()
+    cursor = conn.execute("SELECT id, name, join_date, salary FROM employees WHERE name LIKE ? ORDER BY name",
+                          (f"%{query}%",))
+    return cursor.fetchall()
+
+def _has_employee_search_index(conn):
+    cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'employees_fts'")
+    return cursor.fetchone() is not None
+
+class EmployeeSearch:
+    """Incremental employee search for a search-as-you-type box.
+
+    When the new query only extends the previous one, the previous results
+    are filtered in memory instead of querying again.
+    """
+    def __init__(self):
+        self._last_query = None
+        self._last_results = None
+
+    def invalidate(self):
+        """Forgets the cached results, e.g. after employees were added or changed."""
+        self._last_query = None
+        self._last_results = None
+
+    def search(self, query):
+        query = query.strip()
+        previous = self._last_query
+        if (previous is not None and not previous.isdigit() and not query.isdigit()
+                and query.startswith(previous)):
+            needle = query.lower()
+            results = [emp for emp in self._last_results if needle in emp[1].lower()]
+        else:
+            results = get_employees(query)
+        self._last_query = query
+        self._last_results = results
+        return results
 
 def get_employee_by_id(emp_id):
     """Fetches a single employee by ID."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, join_date, salary, password FROM employees WHERE id = ?", (emp_id,))
-    employee = cursor.fetchone()
-    conn.close()
-    return employee
+    key = _employee_key(emp_id)
+    if key is None:
+        return None
+    return _cached(_employee_cache, key, lambda: get_connection().execute(
+        "SELECT id, name, join_date, salary, password FROM employees WHERE id = ?", (key,)).fetchone())
+
+def employee_record(name, join_date, salary, password):
+    """Checks one employee's fields and returns them as (name, 'YYYY-MM-DD', salary, password).
+
+    join_date may be anything normalize_date() accepts and salary a number
+    or numeric text. Raises ValueError naming the first bad field.
+    """
+    name, password = str(name or '').strip(), str(password or '')
+    if not name or not password:
+        raise ValueError("name and password are required")
+    join_date = normalize_date(join_date)
+    salary_text = salary.replace(',', '').strip() if isinstance(salary, str) else salary
+    try:
+        amount = float(salary_text)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid salary {salary!r}")
+    if amount < 0:
+        raise ValueError(f"negative salary {salary!r}")
+    return name, join_date, amount, password
+
+def add_employees(employees):
+    """Adds (name, join_date, salary, password) employees in one transaction and returns their new IDs, in order.
+
+    Every record is checked with employee_record() before anything is written.
+    """
+    records = [employee_record(*employee) for employee in employees]
+    with transaction() as cursor:
+        # AUTOINCREMENT ids only grow, so the new employees are the rows above the current maximum
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM employees")
+        high_water_id = cursor.fetchone()[0]
+        cursor.executemany("INSERT INTO employees (name, join_date, salary, password) VALUES (?, ?, ?, ?)", records)
+        cursor.execute("SELECT id FROM employees WHERE id > ? ORDER BY id", (high_water_id,))
+        return [row[0] for row in cursor.fetchall()]
 
 def add_employee(name, join_date, salary, password):
-    """Adds a new employee to the database."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO employees (name, join_date, salary, password) VALUES (?, ?, ?, ?)",
-                       (name, join_date, salary, password))
-        conn.commit()
-        messagebox.showinfo("Success", f"Employee '{name}' added successfully!")
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"Failed to add employee: {e}")
-    finally:
-        conn.close()
+    """Adds a new employee to the database and returns their ID. Raises ValueError or sqlite3.Error on failure."""
+    return add_employees([(name, join_date, salary, password)])[0]
+
+def update_employees(employees):
+    """Updates (emp_id, name, join_date, salary, password) employees in one transaction.
+
+    Returns the IDs that matched no employee; the others are updated.
+    Every record is checked with employee_record() before anything is written.
+    """
+    employees = list(employees)
+    records = [employee_record(*employee[1:]) + (_employee_key(employee[0]),) for employee in employees]
+    with transaction() as cursor:
+        cursor.execute("SELECT id FROM employees WHERE id IN (SELECT value FROM json_each(?))",
+                       (json.dumps([record[-1] for record in records]),))
+        found = {row[0] for row in cursor.fetchall()}
+        cursor.executemany("UPDATE employees SET name = ?, join_date = ?, salary = ?, password = ? WHERE id = ?", records)
+    _invalidate_employees(found)
+    return [employee[0] for employee, record in zip(employees, records) if record[-1] not in found]
 
 def update_employee(emp_id, name, join_date, salary, password):
-    """Updates an existing employee's details."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("UPDATE employees SET name = ?, join_date = ?, salary = ?, password = ? WHERE id = ?",
-                       (name, join_date, salary, password, emp_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Employee ID {emp_id} updated successfully!")
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"Failed to update employee: {e}")
-    finally:
-        conn.close()
+    """Updates an existing employee's details. Returns False if no employee has that ID."""
+    return not update_employees([(emp_id, name, join_date, salary, password)])
+
+def delete_employees(emp_ids):
+    """Deletes employees and all their attendance records and returns how many employees were deleted.
+
+    Each table loses the employees' rows in one set-based DELETE, all in one
+    transaction. Archived attendance is deleted first, one archive (a
+    separate file) at a time: if that stops halfway, the employees are still
+    there and deleting again finishes the job.
+    """
+    keys = {_employee_key(emp_id) for emp_id in emp_ids} - {None}
+    if not keys:
+        return 0
+    ids = json.dumps(sorted(keys))
+    _delete_archived_attendance(ids)
+    with transaction() as cursor:
+        # Attendance first: it references employees
+        cursor.execute("DELETE FROM attendance WHERE employee_id IN (SELECT value FROM json_each(?))", (ids,))
+        cursor.execute("DELETE FROM attendance_bitmap WHERE employee_id IN (SELECT value FROM json_each(?))", (ids,))
+        cursor.execute("DELETE FROM employees WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+        deleted = cursor.rowcount
+    _invalidate_employees(keys, attendance=True)
+    return deleted
 
 def delete_employee(emp_id):
-    """Deletes an employee and their attendance records."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        # Delete attendance records first due to foreign key constraint
-        cursor.execute("DELETE FROM attendance WHERE employee_id = ?", (emp_id,))
-        cursor.execute("DELETE FROM employees WHERE id = ?", (emp_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Employee ID {emp_id} and their attendance records deleted.")
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"Failed to delete employee: {e}")
-    finally:
-        conn.close()
+    """Deletes an employee and their attendance records, archived years included. Returns False if no employee has that ID."""
+    return delete_employees([emp_id]) > 0
 
-def mark_attendance(employee_id, date, status):
-    """Marks attendance for a given employee on a specific date. Updates if exists, inserts if new."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        # Check if attendance already exists for this employee on this date
-        cursor.execute("SELECT id FROM attendance WHERE employee_id = ? AND date = ?", (employee_id, date))
-        existing_record = cursor.fetchone()
+# Single-statement insert-or-update, backed by idx_attendance_employee_date
+UPSERT_ATTENDANCE_SQL = """
+    INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)
+    ON CONFLICT (employee_id, date) DO UPDATE SET status = excluded.status
+"""
 
-        if existing_record:
-            cursor.execute("UPDATE attendance SET status = ? WHERE id = ?", (status, existing_record[0]))
-            messagebox.showinfo("Info", f"Attendance for Employee ID {employee_id} on {date} updated to '{status}'.")
+def mark_attendance(employee_id, date, status):
+    """Marks attendance for a given employee on a specific date. Updates if exists, inserts if new.
+
+    Raises sqlite3.Error on failure, and ValueError for a date that is not
+    'YYYY-MM-DD' or falls in an archived year, or a status that bitmap
+    storage cannot hold.
+    """
+    day = parse_attendance_date(date) # Checked before anything is written
+    with transaction() as cursor:
+        _check_not_archived(date)
+        if attendance_storage() == STORAGE_BITMAP:
+            year_month, bit = _bitmap_position(date)
+            cursor.execute(UPSERT_BITMAP_SQL, (employee_id, year_month) + _bitmap_masks(status, bit))
         else:
-            cursor.execute("INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)",
-                           (employee_id, date, status))
-            messagebox.showinfo("Success", f"Attendance for Employee ID {employee_id} on {date} marked as '{status}'.")
-        conn.commit()
-    except sqlite3.Error as e:
-        messagebox.showerror("Database Error", f"Failed to mark attendance: {e}")
-    finally:
-        conn.close()
+            cursor.execute(UPSERT_ATTENDANCE_SQL, (employee_id, date, status))
+    _invalidate_attendance(employee_id, day.year, day.month)
+
+def mark_attendance_bulk(records):
+    """Marks attendance for many (employee_id, date, status) records in one transaction.
+
+    records may be any iterable, including a generator. Existing records for
+    the same employee and date are overwritten. Returns a summary dict with
+    'inserted' and 'updated' counts; database errors propagate to the caller.
+    A date that is not 'YYYY-MM-DD' or falls in an archived year raises
+    ValueError before the transaction starts, and nothing is written.
+    """
+    records = list(records)
+    archived = set(archived_years())
+    months = {} # 'YYYY-MM-DD' -> (year, month); a batch usually repeats a few dates
+    touched = set()
+    for employee_id, date, _ in records:
+        month = months.get(date)
+        if month is None:
+            day = parse_attendance_date(date)
+            _check_not_archived(date, archived)
+            month = months[date] = (day.year, day.month)
+        touched.add((employee_id,) + month)
+
+    with transaction() as cursor:
+        if attendance_storage() == STORAGE_BITMAP:
+            inserted, written = _mark_bitmap_bulk(cursor, records)
+        else:
+            # AUTOINCREMENT ids only grow, so rows above the current maximum are new
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM attendance")
+            high_water_id = cursor.fetchone()[0]
+            cursor.executemany(UPSERT_ATTENDANCE_SQL, records)
+            written = cursor.rowcount
+            cursor.execute("SELECT COUNT(*) FROM attendance WHERE id > ?", (high_water_id,))
+            inserted = cursor.fetchone()[0]
+    for employee_id, year, month in touched:
+        _invalidate_attendance(employee_id, year, month)
+    return {'inserted': inserted, 'updated': written - inserted}
+
+def _mark_bitmap_bulk(cursor, records):
+    """Folds records into one mask pair per employee-month and writes each once. Returns (inserted, written)."""
+    masks = {} # (employee_id, year_month) -> [present, marked]
+    inserted = written = 0
+    positions = [] # Every date and status is checked before the first query
+    for employee_id, date, status in records:
+        year_month, bit = _bitmap_position(date)
+        positions.append(((_employee_key(employee_id), year_month), bit, _bitmap_masks(status, bit)[0]))
+    for key, bit, present_bit in positions:
+        entry = masks.get(key)
+        if entry is None:
+            cursor.execute("SELECT present, marked FROM attendance_bitmap WHERE employee_id = ? AND year_month = ?", key)
+            entry = masks[key] = list(cursor.fetchone() or (0, 0))
+        if not entry[1] & bit:
+            inserted += 1
+        entry[0] = (entry[0] & ~bit) | present_bit
+        entry[1] |= bit
+        written += 1
+    cursor.executemany("""
+        INSERT INTO attendance_bitmap (employee_id, year_month, present, marked) VALUES (?, ?, ?, ?)
+        ON CONFLICT (employee_id, year_month) DO UPDATE SET present = excluded.present, marked = excluded.marked
+    """, [key + tuple(entry) for key, entry in masks.items()])
+    return inserted, written
 
 def get_attendance_by_employee(employee_id):
-    """Fetches all attendance records for a specific employee."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT date, status FROM attendance WHERE employee_id = ? ORDER BY date DESC", (employee_id,))
-    attendance = cursor.fetchall()
-    conn.close()
-    return attendance
+    """Fetches all attendance records for a specific employee, newest first, archived years included."""
+    if attendance_storage() == STORAGE_BITMAP:
+        records = _bitmap_history(employee_id)
+    else:
+        records = _history_page("attendance", employee_id)
+    years = archived_years()
+    for year in years:
+        records.extend(_history_page(f"{_archive_schema(year)}.attendance", employee_id))
+    if years:
+        records.sort(reverse=True)
+    return records
+
+ATTENDANCE_PAGE_SIZE = 100 # History rows fetched per page in the employee view
+
+def get_attendance_page(employee_id, before_date=None, limit=ATTENDANCE_PAGE_SIZE):
+    """Fetches up to `limit` (date, status) records for an employee, newest first.
+
+    Keyset pagination: pass the last date of the previous page as before_date
+    to get the next page. Each page is a bounded range read of the
+    (employee_id, date) index, so its cost does not grow with history.
+    """
+    if attendance_storage() == STORAGE_BITMAP:
+        records = _bitmap_history(employee_id, before_date, limit)
+    else:
+        records = _history_page("attendance", employee_id, before_date, limit)
+    # Archived years only add a page of their own when the page so far does not already end after them
+    years = [year for year in archived_years() if before_date is None or f"{year:04d}" <= before_date[:4]]
+    for year in reversed(years):
+        if len(records) >= limit and records[limit - 1][0] >= f"{year + 1:04d}":
+            break
+        records.extend(_history_page(f"{_archive_schema(year)}.attendance", employee_id, before_date, limit))
+        records.sort(reverse=True)
+        del records[limit:]
+    return records
+
+def _history_page(table, employee_id, before_date=None, limit=-1):
+    """(date, status) rows of a row-format attendance table (live or archived), newest first."""
+    conn = get_connection()
+    if before_date is None:
+        cursor = conn.execute(f"""
+            SELECT date, status FROM {table}
+            WHERE employee_id = ?
+            ORDER BY date DESC LIMIT ?
+        """, (employee_id, limit))
+    else:
+        cursor = conn.execute(f"""
+            SELECT date, status FROM {table}
+            WHERE employee_id = ? AND date < ?
+            ORDER BY date DESC LIMIT ?
+        """, (employee_id, before_date, limit))
+    return cursor.fetchall()
+
+def _bitmap_history(employee_id, before_date=None, limit=None):
+    """(date, status) records from an employee's bitmaps, newest first, reading only the months needed."""
+    cursor = get_connection().execute("""
+        SELECT year_month, present, marked FROM attendance_bitmap
+        WHERE employee_id = ? AND year_month <= ?
+        ORDER BY year_month DESC
+    """, (employee_id, before_date[:7] if before_date else '9999-12'))
+    records = []
+    for year_month, present, marked in cursor:
+        for day in range(marked.bit_length(), 0, -1):
+            bit = 1 << (day - 1)
+            date = f"{year_month}-{day:02d}"
+            if marked & bit and (before_date is None or date < before_date):
+                records.append((date, 'Present' if present & bit else 'Absent'))
+                if len(records) == limit:
+                    return records
+    return records
 
 def get_attendance_by_date(date):
     """Fetches attendance records for all employees on a specific date."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("""
+    schema = _archive_schema_for_date(date)
+    if schema is None and attendance_storage() == STORAGE_BITMAP:
+        year_month, bit = _bitmap_position(date)
+        shift = bit.bit_length() - 1
+        cursor = get_connection().execute("""
+            SELECT e.id, e.name,
+                   CASE WHEN (b.marked >> ?) & 1 THEN
+                       CASE WHEN (b.present >> ?) & 1 THEN 'Present' ELSE 'Absent' END
+                   END
+            FROM employees e
+            LEFT JOIN attendance_bitmap b ON b.employee_id = e.id AND b.year_month = ?
+            ORDER BY e.name
+        """, (shift, shift, year_month))
+        return cursor.fetchall()
+    cursor = get_connection().execute(f"""
         SELECT e.id, e.name, a.status
         FROM employees e
-        LEFT JOIN attendance a ON e.id = a.employee_id AND a.date = ?
+        LEFT JOIN {f"{schema}.attendance" if schema else "attendance"} a ON e.id = a.employee_id AND a.date = ?
         ORDER BY e.name
     """, (date,))
-    attendance = cursor.fetchall()
-    conn.close()
-    return attendance
+    return cursor.fetchall()
 
 def get_monthly_attendance_percentage(employee_id, year, month):
     """Calculates monthly attendance percentage for an employee."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Get total days in the month
-    if month == 12:
-        next_month_date = datetime(year + 1, 1, 1)
-    else:
-        next_month_date = datetime(year, month + 1, 1)
-    first_day_of_month = datetime(year, month, 1)
-    days_in_month = (next_month_date - first_day_of_month).days
-
-    # Count present days
-    cursor.execute("""
-        SELECT COUNT(*) FROM attendance
-        WHERE employee_id = ?
-        AND STRFTIME('%Y-%m', date) = ?
-        AND status = 'Present'
-    """, (employee_id, f"{year:04d}-{month:02d}"))
-    present_days = cursor.fetchone()[0]
-
-    conn.close()
-
+    def compute():
+        _, _, days_in_month = month_window(year, month)
+        present_days = get_monthly_status_counts(employee_id, year, month).get('Present', 0)
+        return attendance_percentage_for(present_days, days_in_month)
+    return _cached(_percentage_cache, (_employee_key(employee_id), year, month), compute)
+
+def get_monthly_status_counts(employee_id, year, month):
+    """Returns {status: days} for an employee's marked days in a month."""
+    def compute():
+        cursor = get_connection().execute(f"""
+            SELECT present, absent FROM {_monthly_counts_source(year)}
+            WHERE employee_id = ? AND year_month = ?
+        """, (employee_id, year_month_key(year, month)))
+        row = cursor.fetchone()
+        if not row:
+            return {}
+        return {status: days for status, days in zip(('Present', 'Absent'), row) if days}
+    # A copy, so a caller changing the dict cannot change the cached one
+    return dict(_cached(_status_counts_cache, (_employee_key(employee_id), year, month), compute))
+
+def attendance_percentage_for(present_days, days_in_month):
+    """Share of the month's days that were marked Present, as a percentage."""
     if days_in_month == 0: # Should not happen for valid month/year
         return 0
     return (present_days / days_in_month) * 100
 
+def salary_for_percentage(base_salary, attendance_percentage):
+    """Pro-rates a base salary by the month's attendance percentage."""
+    return (base_salary / 100) * attendance_percentage
+
 def calculate_salary(employee_id, year, month):
     """Calculates salary based on monthly attendance percentage."""
-    employee = get_employee_by_id(employee_id)
-    if not employee:
-        return 0
+    def compute():
+        employee = get_employee_by_id(employee_id)
+        if not employee:
+            return None # Not cached, so the employee can still be added later
+
+        base_salary = employee[3]
+        attendance_percentage = get_monthly_attendance_percentage(employee_id, year, month)
+        return salary_for_percentage(base_salary, attendance_percentage)
+    salary = _cached(_salary_cache, (_employee_key(employee_id), year, month), compute)
+    return 0 if salary is None else salary
+
+def get_monthly_payroll(year, month, employee_ids=None, id_range=None):
+    """Returns (id, name, present_days, percentage, salary) for every employee in a month.
+
+    All figures come from one query over the monthly counts (attendance_monthly,
+    or attendance_bitmap_monthly in bitmap storage) instead of
+    several queries per employee. Pass employee_ids to restrict the result to those employees,
+    and/or id_range=(first_id, last_id) to an inclusive range of IDs.
+    Rows are ordered by name (then ID), like get_employees().
+    """
+    _, _, days_in_month = month_window(year, month)
+    params = [year_month_key(year, month)]
+    conditions = []
+    if employee_ids is not None:
+        conditions.append("e.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(emp_id) for emp_id in employee_ids]))
+    if id_range is not None:
+        conditions.append("e.id BETWEEN ? AND ?")
+        params.extend(id_range)
+    employee_filter = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cursor = get_connection().execute(f"""
+        SELECT e.id, e.name, e.salary, COALESCE(m.present, 0) AS present_days
+        FROM employees e
+        LEFT JOIN {_monthly_counts_source(year)} m ON m.employee_id = e.id AND m.year_month = ?
+        {employee_filter}
+        ORDER BY e.name, e.id
+    """, params)
 
-    base_salary = employee[3]
-    attendance_percentage = get_monthly_attendance_percentage(employee_id, year, month)
-    return (base_salary / 100) * attendance_percentage
+    payroll = []
+    for emp_id, name, base_salary, present_days in cursor:
+        percentage = attendance_percentage_for(present_days, days_in_month)
+        payroll.append((emp_id, name, present_days, percentage, salary_for_percentage(base_salary, percentage)))
+    return payroll
 
 def get_employees_low_attendance(year, month, threshold=50):
     """Lists employees with attendance percentage below a given threshold."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Get total days in the month
-    if month == 12:
-        next_month_date = datetime(year + 1, 1, 1)
-    else:
-        next_month_date = datetime(year, month + 1, 1)
-    first_day_of_month = datetime(year, month, 1)
-    days_in_month = (next_month_date - first_day_of_month).days
+    _, _, days_in_month = month_window(year, month)
 
     if days_in_month == 0:
         return []
 
-    cursor.execute(f"""
-        SELECT e.id, e.name,
-               SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as present_days
-        FROM employees e
-        LEFT JOIN attendance a ON e.id = a.employee_id
-        WHERE STRFTIME('%Y-%m', a.date) = ?
-        GROUP BY e.id, e.name
-        HAVING (CAST(SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) AS REAL) / {days_in_month}) * 100 < ?
+    # Only employees with records in the month have a summary row
+    cursor = get_connection().execute(f"""
+        SELECT e.id, e.name, m.present as present_days
+        FROM {_monthly_counts_source(year)} m
+        JOIN employees e ON e.id = m.employee_id
+        WHERE m.year_month = ?
+        AND (CAST(m.present AS REAL) / {days_in_month}) * 100 < ?
         ORDER BY e.name
-    """, (f"{year:04d}-{month:02d}", threshold))
-    low_attendance_employees = cursor.fetchall()
-    conn.close()
-    return low_attendance_employees
+    """, (year_month_key(year, month), threshold))
+    return cursor.fetchall()
+
+# --- Attendance Matrix ---
+# Vectorized analytics over a whole period. Every employee's month masks are
+# read in one query (aggregated from attendance rows, or straight from
+# attendance_bitmap) and unpacked into an employees x days array, so counts,
+# percentages, salaries and streaks are computed for everyone at once instead
+# of per employee. Needs NumPy; see load_numpy().
+
+class AttendanceMatrix:
+    """A period's attendance as an employees x days array of status codes.
+
+    Rows are employees ordered by name, like get_employees(); columns are the
+    calendar days of the period, and each cell is UNMARKED, PRESENT or ABSENT.
+    Percentages and salaries use the same formulas as calculate_salary(),
+    taken over every day of the period.
+    """
+    UNMARKED, PRESENT, ABSENT = 0, 1, 2
+
+    def __init__(self, year, month, month_starts, employee_ids, names, base_salaries, codes):
+        self.year = year
+        self.month = month
+        self.month_starts = month_starts # Column of each month's first day, then the column count
+        self.employee_ids = employee_ids
+        self.names = names
+        self.base_salaries = base_salaries
+        self.codes = codes
+
+    @property
+    def days(self):
+        return self.codes.shape[1]
+
+    def present_days(self):
+        return np.count_nonzero(self.codes == self.PRESENT, axis=1)
+
+    def absent_days(self):
+        return np.count_nonzero(self.codes == self.ABSENT, axis=1)
+
+    def marked_days(self):
+        return np.count_nonzero(self.codes, axis=1)
+
+    def percentages(self):
+        return attendance_percentage_for(self.present_days(), self.days)
+
+    def salaries(self):
+        return salary_for_percentage(self.base_salaries, self.percentages())
+
+    def below_threshold(self, threshold):
+        """Mask of employees with some marked day and attendance below threshold percent."""
+        return (self.marked_days() > 0) & (self.percentages() < threshold)
+
+    def _runs(self, status):
+        """Length of the `status` streak standing at each day.
+
+        Unmarked days (weekends, holidays) neither extend nor break a streak;
+        only a day marked with another status does.
+        """
+        count = np.cumsum(self.codes == status, axis=1, dtype=np.int32)
+        breaks = (self.codes != status) & (self.codes != self.UNMARKED)
+        return count - np.maximum.accumulate(np.where(breaks, count, 0), axis=1)
+
+    def longest_streaks(self, status=PRESENT):
+        """Longest run of `status` days per employee."""
+        if not self.days:
+            return np.zeros(len(self.employee_ids), dtype=np.int32)
+        return self._runs(status).max(axis=1)
+
+    def current_streaks(self, status=PRESENT):
+        """Run of `status` days each employee is on at the end of the period."""
+        if not self.days:
+            return np.zeros(len(self.employee_ids), dtype=np.int32)
+        return self._runs(status)[:, -1]
+
+    def payroll(self):
+        """The period's rows in get_monthly_payroll() format."""
+        return list(zip(self.employee_ids.tolist(), self.names, self.present_days().tolist(),
+                        self.percentages().tolist(), self.salaries().tolist()))
+
+    def low_attendance(self, threshold=50):
+        """The period's rows in get_employees_low_attendance() format."""
+        selected = np.flatnonzero(self.below_threshold(threshold))
+        present_days = self.present_days()
+        return [(int(self.employee_ids[i]), self.names[i], int(present_days[i])) for i in selected]
+
+def _matrix_rows(ids, order, emp_ids):
+    """Matrix rows of emp_ids (ids sorted by `order`), and which of them are in the matrix at all."""
+    rows = order[np.minimum(np.searchsorted(ids, emp_ids, sorter=order), len(ids) - 1)]
+    return rows, ids[rows] == emp_ids
+
+def load_attendance_matrix(year, month, months=1, employee_ids=None):
+    """Loads `months` months starting at year/month into an AttendanceMatrix.
+
+    Pass employee_ids to restrict the rows to those employees. In row
+    storage each day's records come back as one group_concat row, read in
+    date order off idx_attendance_date_employee_status; in bitmap storage
+    the month masks are unpacked directly. Archived years are read like row
+    storage. Raises RuntimeError when NumPy is not installed.
+    """
+    if not load_numpy():
+        raise RuntimeError("NumPy is required for the attendance matrix")
+    first_number = year * 12 + month - 1 # Months since year 0, counted from zero
+    end_year, end_month = divmod(first_number + months, 12)
+    first_day, _, _ = month_window(year, month)
+    end_day, _, _ = month_window(end_year, end_month + 1)
+    month_lengths = [month_window(number // 12, number % 12 + 1)[2] for number in range(first_number, first_number + months)]
+    month_starts = np.concatenate(([0], np.cumsum(month_lengths, dtype=np.int64)))
+
+    params = []
+    employee_filter = ""
+    if employee_ids is not None:
+        employee_filter = "WHERE id IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps([int(emp_id) for emp_id in employee_ids]))
+    conn = get_connection()
+    employees = conn.execute(f"SELECT id, name, salary FROM employees {employee_filter} ORDER BY name", params).fetchall()
+    ids = np.array([row[0] for row in employees], dtype=np.int64)
+    base_salaries = np.array([row[2] for row in employees], dtype=np.float64)
+    codes = np.zeros((len(employees), int(month_starts[-1])), dtype=np.int8)
+    order = np.argsort(ids)
+
+    def fill_from_rows(table):
+        # One result row per day keeps the per-record work inside SQLite and NumPy
+        cursor = conn.execute(f"""
+            SELECT CAST(julianday(date) - julianday(?) AS INTEGER),
+                   group_concat(employee_id), group_concat(status = 'Present', '')
+            FROM {table}
+            WHERE date >= ? AND date < ? AND employee_id IS NOT NULL
+            GROUP BY date
+        """, (first_day, first_day, end_day))
+        for column, day_ids, flags in cursor:
+            rows, known = _matrix_rows(ids, order, np.array(day_ids.split(","), dtype=np.int64))
+            present = np.frombuffer(flags.encode(), dtype=np.uint8) == ord("1")
+            codes[rows[known], column] = np.where(present[known], AttendanceMatrix.PRESENT, AttendanceMatrix.ABSENT)
+
+    if len(ids) and attendance_storage() == STORAGE_BITMAP:
+        masks = np.array(conn.execute("""
+            SELECT employee_id,
+                   CAST(substr(year_month, 1, 4) AS INTEGER) * 12 + CAST(substr(year_month, 6, 2) AS INTEGER) - 1 - ?,
+                   present, marked
+            FROM attendance_bitmap
+            WHERE year_month >= ? AND year_month < ?
+        """, (first_number, first_day[:7], end_day[:7])).fetchall(), dtype=np.int64).reshape(-1, 4)
+        rows, known = _matrix_rows(ids, order, masks[:, 0])
+        rows, month_index, present, marked = rows[known], masks[known, 1], masks[known, 2], masks[known, 3]
+        entry, day = np.nonzero((marked[:, None] >> np.arange(31, dtype=np.int64)) & 1)
+        codes[rows[entry], month_starts[month_index[entry]] + day] = np.where(
+            (present[entry] >> day) & 1, AttendanceMatrix.PRESENT, AttendanceMatrix.ABSENT)
+    elif len(ids):
+        fill_from_rows("attendance")
+    for archived_year in range(year, end_year + 1):
+        schema = _archive_schema(archived_year)
+        if schema is not None and len(ids):
+            fill_from_rows(f"{schema}.attendance")
+    return AttendanceMatrix(year, month, month_starts, ids, [row[1] for row in employees], base_salaries, codes)
+
+def get_monthly_payroll_with_streaks(year, month):
+    """get_monthly_payroll() rows with each employee's longest absence streak appended.
+
+    Computed from the attendance matrix when NumPy is installed; without it
+    the rows come from get_monthly_payroll() and the streak is None.
+    """
+    if not load_numpy():
+        return [row + (None,) for row in get_monthly_payroll(year, month)]
+    matrix = load_attendance_matrix(year, month)
+    return [row + (streak,) for row, streak in zip(matrix.payroll(), matrix.longest_streaks(matrix.ABSENT).tolist())]
+
+def get_low_attendance_with_streaks(year, month, threshold=50):
+    """get_employees_low_attendance() rows with each employee's longest absence streak appended (None without NumPy)."""
+    if not load_numpy():
+        return [row + (None,) for row in get_employees_low_attendance(year, month, threshold)]
+    matrix = load_attendance_matrix(year, month)
+    streaks = matrix.longest_streaks(matrix.ABSENT)[matrix.below_threshold(threshold)]
+    return [row + (streak,) for row, streak in zip(matrix.low_attendance(threshold), streaks.tolist())]
+
+EXPORT_CHUNK_SIZE = 5000 # Rows fetched from the cursor per fetchmany() during exports
+EXPORT_COLUMNS = ["Employee ID", "Employee Name", "Date", "Status"]
+EXCEL_MAX_ROWS = 1_048_576 # Worksheet row limit, header included; Excel refuses to open a longer sheet
+
+def count_attendance_records():
+    """Number of attendance records that belong to an existing employee, archived years included."""
+    conn = get_connection()
+    if attendance_storage() == STORAGE_BITMAP:
+        count = conn.execute("""
+            SELECT COALESCE(SUM(popcount(b.marked)), 0) FROM employees e JOIN attendance_bitmap b ON e.id = b.employee_id
+        """).fetchone()[0]
+    else:
+        count = conn.execute("""
+            SELECT COUNT(*) FROM employees e JOIN attendance a ON e.id = a.employee_id
+        """).fetchone()[0]
+    for year in archived_years():
+        count += conn.execute(f"""
+            SELECT COUNT(*) FROM employees e JOIN {_archive_schema(year)}.attendance a ON e.id = a.employee_id
+        """).fetchone()[0]
+    return count
+
+def iter_attendance_chunks(chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields lists of (employee_id, name, date, status) rows, ordered by name and date.
+
+    The cursor is read chunk_size rows at a time, so callers can stream the
+    whole history without holding it in memory. Each archived year is read
+    through a connection of its own that attaches just that archive, and
+    merged in; so any number of archives can be exported at once.
+    """
+    cursor = _export_rows(get_connection(), _attendance_days_source())
+    archives = get_attendance_archives()
+    if not archives:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    archive_conns = []
+    try:
+        sources = [cursor]
+        for year, path, _, _ in archives:
+            _require_archive_file(year, path)
+            archive_conn = sqlite3.connect(DB_NAME, isolation_level=None)
+            archive_conns.append(archive_conn)
+            archive_conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            sources.append(_export_rows(archive_conn, "archive.attendance"))
+        rows = heapq.merge(*sources, key=lambda row: (row[1], row[2]))
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        for archive_conn in archive_conns:
+            archive_conn.close()
 
-def update_employee_password(emp_id, new_password):
-    """Updates an employee's password in the database."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+def _export_rows(conn, source):
+    return conn.execute(f"""
+        SELECT e.id, e.name, a.date, a.status
+        FROM employees e
+        JOIN {source} a ON e.id = a.employee_id
+        ORDER BY e.name, a.date
+    """)
+
+def _write_export(file_path, columns, chunks, total_rows, progress_callback=None, file_format="xlsx", sheet_names=None):
+    """Writes a header and then every chunk of rows to file_path as "xlsx" or "csv"; returns the number of rows.
+
+    Excel output goes through a write-only workbook, so memory use does not
+    grow with the number of rows. With sheet_names, each chunk gets its own
+    worksheet (and header) under the matching name. A worksheet that reaches
+    EXCEL_MAX_ROWS continues on a new one with the same header, named
+    "Attendance Data 2", "Attendance Data 3" and so on. progress_callback(rows_written, total_rows)
+    is called after each chunk.
+    """
+    rows_written = 0
+    if file_format == "csv":
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                rows_written += len(rows)
+                if progress_callback:
+                    progress_callback(rows_written, total_rows)
+        return rows_written
+
+    import openpyxl # Loaded on first export; see the note at the top of the module
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = title = None
+    sheet_rows = part = 0
+
+    def start_sheet(name):
+        nonlocal sheet, sheet_rows
+        sheet = workbook.create_sheet(name)
+        sheet.append(columns)
+        sheet_rows = 1
+
+    if sheet_names is None:
+        title, part = "Attendance Data", 1
+        start_sheet(title)
+    for index, rows in enumerate(chunks):
+        if sheet_names is not None:
+            title, part = sheet_names[index], 1
+            start_sheet(title)
+        written = 0
+        while written < len(rows):
+            if sheet_rows >= EXCEL_MAX_ROWS:
+                part += 1
+                start_sheet(f"{title} {part}")
+            batch = rows[written:written + EXCEL_MAX_ROWS - sheet_rows]
+            for record in batch:
+                sheet.append(record)
+            sheet_rows += len(batch)
+            written += len(batch)
+        rows_written += len(rows)
+        if progress_callback:
+            progress_callback(rows_written, total_rows)
+    workbook.save(file_path)
+    return rows_written
+
+def export_attendance_to_excel(file_path, progress_callback=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams every attendance record into an .xlsx file and returns the number of rows written.
+
+    Rows are read from the cursor chunk_size at a time and written through a
+    write-only workbook, so memory use does not grow with the size of the
+    history. progress_callback(rows_written, total_rows) is called after
+    each chunk. Nothing is written when there are no attendance records.
+    """
+    total_rows = count_attendance_records()
+    if total_rows == 0:
+        return 0
+    return _write_export(file_path, EXPORT_COLUMNS, iter_attendance_chunks(chunk_size), total_rows, progress_callback)
+
+# --- Incremental Export ---
+CHANGE_EXPORT_COLUMNS = EXPORT_COLUMNS + ["Change"] # Change is 'new', 'updated' or 'deleted'
+EXPORT_WATERMARK_KEY = 'export_watermark' # app_settings key: last attendance_changes seq exported, '' until the first export completes
+
+def get_export_watermark():
+    """The attendance_changes seq the last incremental export went up to, or None before the first one completes."""
+    row = get_connection().execute("SELECT value FROM app_settings WHERE key = ?", (EXPORT_WATERMARK_KEY,)).fetchone()
+    return int(row[0]) if row and row[0] else None
+
+def iter_attendance_changes(since, until, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields lists of (employee_id, name, date, status, change) for records changed at seq since < seq <= until.
+
+    Several changes to the same record collapse into one row: its status
+    now, and whether it is new, updated or deleted compared to before
+    `since`. A record that ends where it started (including one created and
+    deleted again) is left out. Deleted rows have an empty status, and an
+    empty name when the employee was deleted too.
+    """
+    cursor = get_connection().execute("""
+        WITH changed AS (
+            SELECT employee_id, date, MIN(seq) AS first_seq, MAX(seq) AS last_seq
+            FROM attendance_changes
+            WHERE seq > ? AND seq <= ?
+            GROUP BY employee_id, date
+        )
+        SELECT c.employee_id, COALESCE(e.name, ''), c.date, COALESCE(last.status, ''),
+               CASE WHEN first.old_status IS NULL THEN 'new' WHEN last.status IS NULL THEN 'deleted' ELSE 'updated' END
+        FROM changed c
+        JOIN attendance_changes first ON first.seq = c.first_seq
+        JOIN attendance_changes last ON last.seq = c.last_seq
+        LEFT JOIN employees e ON e.id = c.employee_id
+        WHERE first.old_status IS NOT last.status
+        ORDER BY e.name, c.date
+    """, (since, until))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+@contextmanager
+def pending_attendance_changes(chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields (row_estimate, chunks) of the changes since the last incremental export, for one export run.
+
+    Chunks are iter_attendance_changes() rows; the first run, with no
+    watermark yet, starts the change log and yields every record as 'new'.
+    When the with-block finishes without an error the watermark moves past
+    these changes and they are pruned from attendance_changes; after an
+    error the next run yields them again. Changes committed while the block
+    runs are left for the next run.
+    """
+    conn = get_connection()
+    since = get_export_watermark()
+    if since is None:
+        with transaction() as cursor:
+            # An empty watermark starts the log without marking anything as exported
+            cursor.execute("INSERT OR IGNORE INTO app_settings (key, value) VALUES (?, '')", (EXPORT_WATERMARK_KEY,))
+            _create_attendance_changes(cursor)
+    # sqlite_sequence keeps the highest seq ever issued, even once the log is pruned empty
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'attendance_changes'").fetchone()
+    until = row[0] if row else 0
+    if since is None:
+        total_rows = count_attendance_records()
+        chunks = ([record + ('new',) for record in rows] for rows in iter_attendance_chunks(chunk_size))
+    else:
+        total_rows = conn.execute("SELECT COUNT(*) FROM attendance_changes WHERE seq > ? AND seq <= ?", (since, until)).fetchone()[0]
+        chunks = iter_attendance_changes(since, until, chunk_size)
+    yield total_rows, chunks
+    with transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO app_settings (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """, (EXPORT_WATERMARK_KEY, str(until)))
+        cursor.execute("DELETE FROM attendance_changes WHERE seq <= ?", (until,))
+
+def export_attendance_changes(file_path, progress_callback=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Writes the records changed since the last incremental export and returns the number of rows written.
+
+    Writes CSV when file_path ends in .csv and .xlsx otherwise, with
+    CHANGE_EXPORT_COLUMNS; see pending_attendance_changes(). A file with
+    only the header is written when nothing changed, so a daily feed
+    always has its file.
+    """
+    file_format = "csv" if file_path.lower().endswith(".csv") else "xlsx"
+    with pending_attendance_changes(chunk_size) as (total_rows, chunks):
+        return _write_export(file_path, CHANGE_EXPORT_COLUMNS, chunks, total_rows, progress_callback, file_format)
+
+# --- Bulk Import ---
+IMPORT_CHUNK_SIZE = 20000 # Records per transaction: ~30% faster than 5000, and still holds the write lock well under a second
+IMPORT_DATE_CACHE_SIZE = 4096 # Distinct date cells remembered per import; a daily file repeats one
+# Accepted header spellings per field, compared lowercase with '_' read as a space, so
+# files written by the exports import back unchanged
+ATTENDANCE_IMPORT_COLUMNS = {
+    'employee_id': ('employee id', 'emp id', 'badge id', 'id'),
+    'name': ('employee name', 'name'),
+    'date': ('date', 'punch date', 'punch time', 'timestamp'),
+    'status': ('status',),
+}
+EMPLOYEE_IMPORT_COLUMNS = {
+    'employee_id': ('employee id', 'emp id', 'id'),
+    'name': ('employee name', 'name'),
+    'join_date': ('join date',),
+    'salary': ('salary',),
+    'password': ('password',),
+}
+IMPORT_STATUSES = {'present': 'Present', 'p': 'Present', 'absent': 'Absent', 'a': 'Absent'}
+# Tried in order after ISO 8601 (which also covers '2026-10-12 08:55:03' punch times);
+# day-first, since month-first dates are ambiguous with it and the app never writes them
+IMPORT_DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d.%m.%Y', '%d-%m-%Y', '%Y/%m/%d')
+
+def normalize_date(value):
+    """Returns a date, datetime or date string as 'YYYY-MM-DD'. Raises ValueError if it is not a date."""
+    if hasattr(value, 'strftime'): # Excel cells arrive as datetime objects
+        return value.strftime('%Y-%m-%d')
+    text = str(value if value is not None else '').strip()
     try:
-        cursor.execute("UPDATE employees SET password = ? WHERE id = ?", (new_password, emp_id))
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
-        print(f"Database error updating password: {e}")
-        return False
+        return datetime.fromisoformat(text).strftime('%Y-%m-%d')
+    except ValueError:
+        pass
+    for date_format in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date {text!r}")
+
+class _ImportReader:
+    """Streams the rows of a .csv or .xlsx file as lists of cells, header first.
+
+    CSV goes through the csv module and Excel through a read-only openpyxl
+    workbook, so neither is loaded into memory. progress() gives
+    (done, total) in bytes for CSV and in rows for Excel.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.is_excel = file_path.lower().endswith(('.xlsx', '.xlsm'))
+        self._position = 0
+        self._size = os.path.getsize(file_path)
+
+    def __iter__(self):
+        if self.is_excel:
+            import openpyxl # Loaded on first import; see the note at the top of the module
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+            try:
+                sheet = workbook.worksheets[0]
+                self._size = sheet.max_row or 0 # From the sheet's dimension record, if it has one
+                for self._position, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                    yield list(row)
+            finally:
+                workbook.close()
+        else:
+            with open(self.file_path, 'rb') as raw:
+                text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+                for row in csv.reader(text):
+                    self._position = raw.tell() # Read-ahead position: good enough for a progress bar
+                    yield row
+
+    def progress(self):
+        return self._position, max(self._position, self._size)
+
+def _map_import_columns(header, columns):
+    """Maps each field of columns to its index in the header row; fields the file lacks are left out."""
+    names = [str(cell).strip().lower().replace('_', ' ') if cell is not None else '' for cell in header]
+    found = {}
+    for field, aliases in columns.items():
+        for alias in aliases:
+            if alias in names:
+                found[field] = names.index(alias)
+                break
+    return found
+
+def _cell(row, index):
+    """The stripped text of row[index], or '' for a missing or empty cell."""
+    if index is None or index >= len(row) or row[index] is None:
+        return ''
+    value = row[index]
+    if isinstance(value, float) and value.is_integer(): # Excel stores whole numbers as floats
+        value = int(value)
+    return str(value).strip()
+
+class _RejectWriter:
+    """Writes rejected rows to a CSV next to the source, created on the first reject.
+
+    Each line is the source row number, the row as read and the reason, so
+    the file can be fixed up and imported again.
+    """
+    def __init__(self, reject_path, header):
+        self.reject_path = reject_path
+        self.header = header
+        self.count = 0
+        self._file = self._writer = None
+
+    def reject(self, row_number, row, reason):
+        if self._writer is None:
+            self._file = open(self.reject_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["Row"] + [cell if cell is not None else '' for cell in self.header] + ["Reason"])
+        self._writer.writerow([row_number] + [cell if cell is not None else '' for cell in row] + [reason])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+def _default_reject_path(file_path):
+    return os.path.splitext(file_path)[0] + '.rejects.csv'
+
+def _employee_lookup():
+    """Returns (set of employee IDs, {lowercase name: ID}); names shared by several employees map to None."""
+    ids, by_name = set(), {}
+    for emp_id, name in get_connection().execute("SELECT id, name FROM employees"):
+        ids.add(emp_id)
+        key = name.strip().lower()
+        by_name[key] = None if key in by_name else emp_id
+    return ids, by_name
+
+def import_attendance(file_path, reject_path=None, default_status='Present', chunk_size=IMPORT_CHUNK_SIZE,
+                      progress_callback=None):
+    """Upserts attendance from a .csv or .xlsx file and returns a summary dict.
+
+    The first row is the header. Each row needs a date and either an
+    employee ID or a unique employee name; without a status column every
+    row counts as default_status, so a badge reader's punch list marks
+    everyone in it present. Dates may be ISO 8601 (times are dropped),
+    Excel dates or one of IMPORT_DATE_FORMATS. Dates in archived years are
+    rejected.
+
+    Records are written chunk_size at a time through mark_attendance_bulk(),
+    one transaction per chunk, and the last row for an employee and date
+    wins. Rows that cannot be imported go to reject_path (default: the
+    source name with .rejects.csv) instead of stopping the import. Raises
+    ValueError when the header lacks a needed column. The summary has
+    'rows', 'inserted', 'updated', 'rejected' and 'reject_path' (None when
+    nothing was rejected). progress_callback(done, total, message) is
+    called after each chunk; chunks already written stay written if it
+    raises, and running the import again is harmless.
+    """
+    reader = _ImportReader(file_path)
+    rows = iter(reader)
+    header = next(rows, [])
+    columns = _map_import_columns(header, ATTENDANCE_IMPORT_COLUMNS)
+    if 'date' not in columns or not ('employee_id' in columns or 'name' in columns):
+        raise ValueError(f"{file_path} needs a Date column and an Employee ID or Employee Name column")
+    if 'status' not in columns and default_status not in ('Present', 'Absent'):
+        raise ValueError(f"{file_path} has no Status column and no valid default status")
+
+    employee_ids, employees_by_name = _employee_lookup()
+    archived = set(archived_years())
+    id_index, name_index = columns.get('employee_id'), columns.get('name')
+    date_index, status_index = columns['date'], columns.get('status')
+    rejects = _RejectWriter(reject_path or _default_reject_path(file_path), header)
+    dates = {} # Raw date cell -> 'YYYY-MM-DD'
+    chunk = {} # (employee_id, date) -> status
+    totals = {'rows': 0, 'inserted': 0, 'updated': 0}
+
+    def flush():
+        # Sorted, the upserts walk the attendance indexes in order
+        summary = mark_attendance_bulk([key + (status,) for key, status in sorted(chunk.items())])
+        totals['inserted'] += summary['inserted']
+        totals['updated'] += summary['updated']
+        chunk.clear()
+        if progress_callback:
+            done, total = reader.progress()
+            progress_callback(done, total, f"Importing attendance... {totals['rows']:,} rows read")
+
+    try:
+        for row_number, row in enumerate(rows, start=2):
+            if not any(cell not in (None, '') for cell in row):
+                continue # Blank line
+            totals['rows'] += 1
+            try:
+                emp_text = _cell(row, id_index)
+                if emp_text:
+                    emp_id = _employee_key(emp_text)
+                    if emp_id not in employee_ids:
+                        raise ValueError(f"unknown employee ID {emp_text!r}")
+                else:
+                    name = _cell(row, name_index)
+                    if not name:
+                        raise ValueError("no employee ID or name")
+                    emp_id = employees_by_name.get(name.lower(), -1)
+                    if emp_id == -1:
+                        raise ValueError(f"unknown employee {name!r}")
+                    if emp_id is None:
+                        raise ValueError(f"several employees are named {name!r}; use the employee ID")
+
+                raw_date = row[date_index] if date_index < len(row) else None
+                if isinstance(raw_date, str) and len(raw_date) > 10 and raw_date[10] in ' T':
+                    raw_date = raw_date[:10] # A punch time: only the day is kept, and the cache then hits
+                date = dates.get(raw_date)
+                if date is None:
+                    date = normalize_date(raw_date)
+                    _check_not_archived(date, archived)
+                    if len(dates) >= IMPORT_DATE_CACHE_SIZE:
+                        dates.clear()
+                    dates[raw_date] = date
+
+                if status_index is None:
+                    status = default_status
+                else:
+                    status = IMPORT_STATUSES.get(_cell(row, status_index).lower())
+                    if status is None:
+                        raise ValueError(f"invalid status {_cell(row, status_index)!r}")
+            except ValueError as e:
+                rejects.reject(row_number, row, str(e))
+                continue
+            chunk[(emp_id, date)] = status
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
     finally:
-        conn.close()
+        rejects.close()
+    return dict(totals, rejected=rejects.count, reject_path=rejects.reject_path if rejects.count else None)
+
+UPSERT_EMPLOYEE_SQL = """
+    INSERT INTO employees (id, name, join_date, salary, password) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        name = excluded.name, join_date = excluded.join_date, salary = excluded.salary, password = excluded.password
+"""
+
+def import_employees(file_path, reject_path=None, chunk_size=IMPORT_CHUNK_SIZE, progress_callback=None):
+    """Adds or updates employees from a .csv or .xlsx file and returns a summary dict.
+
+    Needs Employee Name, Join Date, Salary and Password columns. A row with
+    the Employee ID of an existing employee updates them; any other row adds
+    an employee (with that ID, if one is given). Rejects, chunking, the
+    summary and progress_callback work as in import_attendance().
+    """
+    reader = _ImportReader(file_path)
+    rows = iter(reader)
+    header = next(rows, [])
+    columns = _map_import_columns(header, EMPLOYEE_IMPORT_COLUMNS)
+    missing = [field for field in ('name', 'join_date', 'salary', 'password') if field not in columns]
+    if missing:
+        raise ValueError(f"{file_path} is missing columns: {', '.join(EMPLOYEE_IMPORT_COLUMNS[f][0].title() for f in missing)}")
+
+    employee_ids, _ = _employee_lookup()
+    rejects = _RejectWriter(reject_path or _default_reject_path(file_path), header)
+    chunk = []
+    totals = {'rows': 0, 'inserted': 0, 'updated': 0}
+
+    def flush():
+        with transaction() as cursor:
+            cursor.executemany(UPSERT_EMPLOYEE_SQL, chunk)
+        _invalidate_employees(record[0] for record in chunk if record[0] is not None)
+        chunk.clear()
+        if progress_callback:
+            done, total = reader.progress()
+            progress_callback(done, total, f"Importing employees... {totals['rows']:,} rows read")
+
+    try:
+        for row_number, row in enumerate(rows, start=2):
+            if not any(cell not in (None, '') for cell in row):
+                continue
+            totals['rows'] += 1
+            try:
+                emp_text = _cell(row, columns.get('employee_id'))
+                emp_id = _employee_key(emp_text) if emp_text else None
+                if emp_text and (emp_id is None or emp_id < 1):
+                    raise ValueError(f"invalid employee ID {emp_text!r}")
+                record = employee_record(_cell(row, columns['name']),
+                                         row[columns['join_date']] if columns['join_date'] < len(row) else None,
+                                         _cell(row, columns['salary']), _cell(row, columns['password']))
+            except ValueError as e:
+                rejects.reject(row_number, row, str(e))
+                continue
+            if emp_id in employee_ids:
+                totals['updated'] += 1
+            else:
+                totals['inserted'] += 1
+                if emp_id is not None:
+                    employee_ids.add(emp_id)
+            chunk.append((emp_id,) + record)
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    finally:
+        rejects.close()
+    return dict(totals, rejected=rejects.count, reject_path=rejects.reject_path if rejects.count else None)
+
+# --- Payroll Reports ---
+PAYROLL_REPORT_COLUMNS = ["Month", "Employee ID", "Employee Name", "Present Days", "Attendance %", "Salary"]
+SHARD_BY_MONTH = 'month'
+SHARD_BY_EMPLOYEES = 'employees'
+
+def _init_report_worker(db_name, profile):
+    """Runs once in each report worker process: it reads the parent's database through read-only connections."""
+    global DB_NAME, DB_PROFILE, DB_READ_ONLY
+    DB_NAME, DB_PROFILE, DB_READ_ONLY = db_name, profile, True
+
+def _payroll_shard(months, employee_ids=None, id_range=None):
+    """Returns {(year, month): report rows} for some months and employees; the unit of work of a report worker."""
+    return {(year, month): [(year_month_key(year, month), emp_id, name, present_days, round(percentage, 2), round(salary, 2))
+                            for emp_id, name, present_days, percentage, salary
+                            in get_monthly_payroll(year, month, employee_ids, id_range)]
+            for year, month in months}
+
+def _employee_id_ranges(shards, employee_ids=None):
+    """Splits the employees into up to `shards` inclusive (first_id, last_id) ranges of about equal head count."""
+    params = [shards]
+    employee_filter = ""
+    if employee_ids is not None:
+        employee_filter = "WHERE id IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps([int(emp_id) for emp_id in employee_ids]))
+    return get_connection().execute(f"""
+        SELECT MIN(id), MAX(id)
+        FROM (SELECT id, NTILE(?) OVER (ORDER BY id) AS shard FROM employees {employee_filter})
+        GROUP BY shard ORDER BY 1
+    """, params).fetchall()
+
+def iter_payroll_report(months, employee_ids=None, workers=1, shard=None, progress_callback=None):
+    """Yields one list of payroll rows per (year, month) in months, in that order, each ordered by name.
+
+    Rows are (year_month, employee_id, name, present_days, percentage,
+    salary), rounded to cents, from get_monthly_payroll(), so they use the
+    same formula as calculate_salary(). With workers > 1 the work runs in a
+    ProcessPoolExecutor whose workers each read through their own read-only
+    connection: shard=SHARD_BY_MONTH hands each worker whole months, and
+    SHARD_BY_EMPLOYEES hands each worker an employee ID range across every
+    month, which keeps all cores busy on a short range of months. By default
+    months are sharded when there are at least as many as workers.
+    progress_callback(shards_done, shards) is called as shards finish.
+    """
+    months = list(months)
+    if workers <= 1 or not months:
+        for done, (year, month) in enumerate(months, start=1):
+            yield _payroll_shard([(year, month)], employee_ids)[(year, month)]
+            if progress_callback:
+                progress_callback(done, len(months))
+        return
+
+    shard = shard or (SHARD_BY_MONTH if len(months) >= workers else SHARD_BY_EMPLOYEES)
+    if shard == SHARD_BY_MONTH:
+        jobs = [([year_month], employee_ids, None) for year_month in months]
+    elif shard == SHARD_BY_EMPLOYEES:
+        jobs = [(months, employee_ids, id_range) for id_range in _employee_id_ranges(workers, employee_ids)]
+    else:
+        raise ValueError(f"Unknown shard {shard!r}; choose {SHARD_BY_MONTH!r} or {SHARD_BY_EMPLOYEES!r}")
+    if not jobs: # No employees
+        yield from ([] for _ in months)
+        return
+
+    # Spawned rather than forked: the desktop app runs this on a worker thread next to Tk
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_report_worker, initargs=(os.path.abspath(DB_NAME), DB_PROFILE))
+    try:
+        futures = [executor.submit(_payroll_shard, *job) for job in jobs]
+        if shard == SHARD_BY_MONTH:
+            for done, (year_month, future) in enumerate(zip(months, futures), start=1):
+                rows = future.result()[year_month]
+                if progress_callback:
+                    progress_callback(done, len(futures))
+                yield rows
+        else:
+            results = []
+            for future in futures:
+                results.append(future.result())
+                if progress_callback:
+                    progress_callback(len(results), len(futures))
+            for year_month in months:
+                # Each shard is already ordered by name and ID, so the sort only merges their runs
+                yield sorted((row for result in results for row in result[year_month]), key=lambda row: (row[2], row[1]))
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def export_payroll_report(file_path, months, employee_ids=None, workers=None, shard=None, progress_callback=None):
+    """Writes the payroll of every month in months to one file and returns the number of rows written.
+
+    Computes the rows with iter_payroll_report() on `workers` processes
+    (default: one per CPU) and writes CSV when file_path ends in .csv, or
+    an .xlsx workbook with one sheet per month. progress_callback(rows_written,
+    total_rows) is called after each month.
+    """
+    months = list(months)
+    if employee_ids is None:
+        employees = get_connection().execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+    else:
+        employees = len(set(employee_ids))
+    chunks = iter_payroll_report(months, employee_ids, workers or os.cpu_count() or 1, shard)
+    file_format = "csv" if file_path.lower().endswith(".csv") else "xlsx"
+    return _write_export(file_path, PAYROLL_REPORT_COLUMNS, chunks, employees * len(months), progress_callback,
+                         file_format, sheet_names=[year_month_key(year, month) for year, month in months])
+
+def update_employee_password(emp_id, new_password):
+    """Updates an employee's password. Returns False if no employee has that ID; raises sqlite3.Error on failure."""
+    with transaction() as cursor:
+        cursor.execute("UPDATE employees SET password = ? WHERE id = ?", (new_password, emp_id))
+        updated = cursor.rowcount > 0
+    _invalidate_employee(emp_id)
+    return updated
+
+# --- Background Tasks ---
+class TaskCancelled(Exception):
+    """Raised inside a background job once its task has been cancelled."""
+
+class BackgroundTask:
+    """Handle shared by a background job and the UI that started it.
+
+    The job calls report_progress() and check_cancelled(); the UI calls cancel().
+    """
+    def __init__(self, description, events):
+        self.description = description
+        self._events = events
+        self._cancel_event = threading.Event()
+        self._connection = None
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Asks the job to stop and interrupts any query it is running."""
+        self._cancel_event.set()
+        connection = self._connection
+        if connection is not None:
+            connection.interrupt()
+
+    def check_cancelled(self):
+        """Raises TaskCancelled if the task has been cancelled."""
+        if self.cancelled:
+            raise TaskCancelled(self.description)
+
+    def report_progress(self, done, total, message=None):
+        """Queues a progress update for the UI. Also a cancellation point."""
+        self.check_cancelled()
+        self._events.put(('progress', self, (done, total, message)))
+
+    def _run(self, job):
+        # Runs on a worker thread; get_connection() gives the worker its own connection
+        self._connection = get_connection()
+        start = time.perf_counter()
+        try:
+            self.check_cancelled()
+            return job(self)
+        except sqlite3.OperationalError:
+            if self.cancelled: # The query was stopped by cancel()
+                raise TaskCancelled(self.description)
+            raise
+        finally:
+            self._connection = None
+            if PROFILING: # Jobs are lambdas, so their qualname names the handler that submitted them
+                record_latency('task', job.__qualname__.split('.<locals>')[0], (time.perf_counter() - start) * 1000)
+
+class TaskRunner:
+    """Runs jobs on a small worker thread pool so they never block the Tk mainloop.
+
+    Workers never touch widgets. Progress, results and errors are queued and
+    handed to the callbacks on the Tk thread by a root.after() poll.
+    """
+    POLL_INTERVAL_MS = 50
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.on_progress = None # callable(task, done, total, message)
+        self.on_activity = None # callable(running_tasks), whenever tasks start or finish
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="attendance-worker")
+        self._events = queue.Queue()
+        self._callbacks = {} # task -> (on_success, on_error)
+        self._polling = False
+
+    @property
+    def running_tasks(self):
+        return list(self._callbacks)
+
+    def submit(self, job, on_success=None, on_error=None, description="Working..."):
+        """Runs job(task) on a worker thread and returns its BackgroundTask.
+
+        on_success(result) or on_error(exception) is later called on the Tk
+        thread. Errors without an on_error handler are shown in a dialog;
+        cancelled tasks call neither.
+        """
+        task = BackgroundTask(description, self._events)
+        self._callbacks[task] = (on_success, on_error)
+        future = self._executor.submit(task._run, job)
+        future.add_done_callback(lambda finished: self._events.put(('done', task, finished)))
+        self._notify_activity()
+        self._schedule_poll()
+        return task
+
+    def cancel_all(self):
+        """Cancels every running task and drops their callbacks."""
+        for task in self._callbacks:
+            task.cancel()
+        self._callbacks.clear()
+        self._notify_activity()
+
+    def shutdown(self):
+        """Cancels outstanding work and stops the worker threads."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        try:
+            while True:
+                try:
+                    kind, task, payload = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'progress':
+                    if task in self._callbacks and self.on_progress:
+                        self.on_progress(task, *payload)
+                elif task in self._callbacks:
+                    on_success, on_error = self._callbacks.pop(task)
+                    self._notify_activity()
+                    self._deliver(task, payload, on_success, on_error)
+        finally:
+            if self._callbacks:
+                self._schedule_poll()
+
+    def _deliver(self, task, future, on_success, on_error):
+        try:
+            result = future.result()
+        except TaskCancelled:
+            return
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            else:
+                messagebox.showerror("Error", f"{task.description} failed: {e}")
+            return
+        if on_success:
+            on_success(result)
+
+    def _notify_activity(self):
+        if self.on_activity:
+            self.on_activity(self.running_tasks)
+
+# --- Charts ---
+CHART_BAR_LIMIT = 300 # Above this many employees the monthly chart is a histogram instead of one bar each
+CHART_BAR_LABEL_LIMIT = 40 # Bars get a percentage label only up to this many employees
+HISTOGRAM_BIN_WIDTH = 10 # Percentage points per histogram bar
+
+CHART_CACHE_MAX_ENTRIES = 64 # Rendered charts kept in memory (roughly 50 KB each)
+CHART_DISK_CACHE = os.environ.get("ATTENDANCE_CHART_CACHE", "") not in ("", "0") # Also keep them in DB_NAME + "-charts"
+
+class ChartCache:
+    """Rendered chart PNGs keyed by (chart, employee_id, year, month, data version).
+
+    The data version in the key (see chart_cache_key()) changes whenever the
+    chart's data does, so a stale image is never returned; it just stops
+    being asked for and ages out of the LRU memory tier. With disk=True,
+    images are also written to a directory next to DB_NAME so they survive
+    restarts; writing a chart deletes the files of its older versions.
+    The disk tier is best effort: I/O errors only mean a cache miss.
+    """
+    def __init__(self, max_entries=CHART_CACHE_MAX_ENTRIES, disk=CHART_DISK_CACHE):
+        self.memory = LRUCache(max_entries)
+        self.disk = disk
+
+    @staticmethod
+    def directory():
+        return f"{DB_NAME}-charts"
+
+    def _file_prefix(self, key):
+        chart, emp_id, year, month, _ = key
+        return os.path.join(self.directory(), f"{chart}-{emp_id}-{year}-{month:02d}-")
+
+    def get(self, key):
+        """Returns the cached PNG bytes for key, or None."""
+        png = self.memory.get(key)
+        if png is _MISSING and self.disk:
+            generation = self.memory.generation
+            try:
+                with open(f"{self._file_prefix(key)}{key[-1]}.png", "rb") as f:
+                    png = f.read()
+            except OSError:
+                return None
+            self.memory.put(key, png, generation)
+        return None if png is _MISSING else png
+
+    def put(self, key, png):
+        self.memory.put(key, png, self.memory.generation)
+        if not self.disk:
+            return
+        prefix = self._file_prefix(key)
+        path = f"{prefix}{key[-1]}.png"
+        try:
+            os.makedirs(self.directory(), exist_ok=True)
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(png)
+            os.replace(f"{path}.tmp", path) # Readers never see a half-written file
+            directory, name_prefix = os.path.split(prefix)
+            for name in os.listdir(directory):
+                if name.startswith(name_prefix) and name.endswith(".png") and os.path.join(directory, name) != path:
+                    os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+    def clear(self):
+        self.memory.clear()
+
+chart_cache = ChartCache()
+
+def chart_cache_key(chart, emp_id, year, month):
+    """Cache key of a chart drawn from the employees and one month of attendance.
+
+    Read it before the chart's data: data read afterwards is at least as new
+    as the key, so a concurrent write can only cause a miss, never a stale hit.
+    """
+    return (chart, emp_id, year, month, get_data_version('employees', attendance_scope(year, month)))
+
+class ChartPanel:
+    """One matplotlib Figure and canvas that every chart in the Reports & Charts tab draws on.
+
+    The panel has a view (pie, bars or histogram). Showing a chart in the
+    current view updates the existing artists in place; only a change of
+    view clears the axes. Redraws go through draw_idle(), and since no
+    canvas is ever destroyed and rebuilt, Tk photo images do not pile up.
+    """
+    def __init__(self, master):
+        load_chart_modules()
+        self.master = master
+        self.figure = Figure(figsize=(10, 6))
+        self.ax = self.figure.add_subplot()
+        self.canvas = self._create_canvas(master)
+        self.view = None
+        self.bars = [] # Rectangles of the bars and histogram views, reused across updates
+        self.labels = [] # Value labels above those bars
+        self.image_label = None # Shows cached renderings in place of the canvas
+        self.image = None
+
+    def _create_canvas(self, master):
+        canvas = FigureCanvasTkAgg(self.figure, master=master)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        return canvas
+
+    def show_image(self, png):
+        """Shows a cached rendering (see ChartCache) instead of the live figure."""
+        self.image = tk.PhotoImage(data=png) # Replacing the old image frees it in Tk
+        if self.image_label is None:
+            self.image_label = tk.Label(self.master, background="white")
+        self.image_label.configure(image=self.image)
+        if not self.image_label.winfo_manager():
+            self.canvas.get_tk_widget().pack_forget()
+            self.image_label.pack(fill="both", expand=True)
+
+    def _show_live(self):
+        if self.image_label is not None and self.image_label.winfo_manager():
+            self.image_label.pack_forget()
+            self.image = None
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def render_png(self):
+        """The canvas's last drawn frame as PNG bytes."""
+        from PIL import Image # Pillow is a matplotlib dependency
+        frame = self.canvas.buffer_rgba()
+        height, width = frame.shape[:2]
+        out = io.BytesIO()
+        Image.frombuffer("RGBA", (width, height), frame, "raw", "RGBA", 0, 1).save(out, format="png")
+        return out.getvalue()
+
+    def snapshot(self, callback):
+        """Calls callback(png) once the pending draw_idle() redraw has happened."""
+        # Tk runs idle callbacks in order, so this one follows the canvas's idle draw
+        self.canvas.get_tk_widget().after_idle(lambda: callback(self.render_png()))
+
+    def _set_view(self, view):
+        self._show_live()
+        if view == self.view:
+            return
+        self.ax.clear()
+        # clear() keeps the pie's equal aspect and hidden frame
+        self.ax.set_aspect('auto')
+        self.ax.set_frame_on(True)
+        self.ax.set_visible(view is not None)
+        self.bars, self.labels = [], []
+        self.view = view
+        # Rotated employee names need room below the axes; the other views do not
+        self.figure.subplots_adjust(bottom=0.3 if view == "bars" else 0.1)
+
+    def clear(self):
+        """Blanks the panel, e.g. when a chart has no data."""
+        self._set_view(None)
+        self.canvas.draw_idle()
+
+    def _sync_bars(self, heights):
+        """Sets the bars at x = 0, 1, ... to `heights`, reusing the existing rectangles."""
+        for bar, height in zip(self.bars, heights):
+            bar.set_height(height)
+        if len(heights) > len(self.bars):
+            start = len(self.bars)
+            self.bars.extend(self.ax.bar(range(start, len(heights)), heights[start:], color=COLOR_PRIMARY))
+        for bar in self.bars[len(heights):]:
+            bar.remove()
+        del self.bars[len(heights):]
+
+    def _sync_labels(self, texts):
+        """Puts texts[i] above bar i, reusing the existing text artists."""
+        for i, text in enumerate(texts):
+            bar = self.bars[i]
+            position = (bar.get_x() + bar.get_width() / 2, bar.get_height())
+            if i < len(self.labels):
+                self.labels[i].set_text(text)
+                self.labels[i].xy = position
+            else:
+                self.labels.append(self.ax.annotate(text, position, xytext=(0, 3), textcoords="offset points",
+                                                    ha='center', va='bottom', fontsize=8))
+        for label in self.labels[len(texts):]:
+            label.remove()
+        del self.labels[len(texts):]
+
+    def show_pie(self, title, labels, sizes, colors, explode):
+        """Draws a pie chart; with at most a few wedges it is simply redrawn on the same axes."""
+        self._set_view("pie")
+        self.ax.clear()
+        self.ax.pie(sizes, explode=explode, labels=labels, colors=colors, autopct='%1.1f%%',
+                    shadow=True, startangle=90)
+        self.ax.axis('equal') # Equal aspect ratio ensures that pie is drawn as a circle.
+        self.ax.set_title(title)
+        self.canvas.draw_idle()
+
+    def show_bars(self, title, names, percentages):
+        """One bar per employee; use show_percentages() to pick bars or a histogram by headcount."""
+        self._set_view("bars")
+        self._sync_bars(percentages)
+        self.ax.set_xticks(range(len(names)), names, rotation=45, ha='right') # Rotate labels for better readability
+        self.ax.set_xlim(-0.5, len(names) - 0.5)
+        self.ax.set_ylim(0, 100)
+        self.ax.set_ylabel('Attendance Percentage (%)')
+        self.ax.set_title(title)
+        self._sync_labels([f'{p:.1f}%' for p in percentages] if len(names) <= CHART_BAR_LABEL_LIMIT else [])
+        self.canvas.draw_idle()
+
+    def show_histogram(self, title, percentages):
+        """Number of employees per attendance band; its size does not depend on headcount."""
+        bins = 100 // HISTOGRAM_BIN_WIDTH
+        counts = [0] * bins
+        for percentage in percentages:
+            counts[min(int(percentage // HISTOGRAM_BIN_WIDTH), bins - 1)] += 1
+        self._set_view("histogram")
+        self._sync_bars(counts)
+        self.ax.set_xticks(range(bins), [f"{i * HISTOGRAM_BIN_WIDTH}-{(i + 1) * HISTOGRAM_BIN_WIDTH}%" for i in range(bins)])
+        self.ax.set_xlim(-0.5, bins - 0.5)
+        self.ax.set_ylim(0, max(counts) * 1.15 or 1)
+        self.ax.set_xlabel('Attendance Percentage')
+        self.ax.set_ylabel('Employees')
+        self.ax.set_title(title)
+        self._sync_labels([f'{count:,}' for count in counts])
+        self.canvas.draw_idle()
+
+    def show_percentages(self, title, names, percentages):
+        """Bars per employee up to CHART_BAR_LIMIT employees, a histogram of the percentages above it."""
+        if len(names) > CHART_BAR_LIMIT:
+            self.show_histogram(f"{title} - distribution of {len(names):,} employees", percentages)
+        else:
+            self.show_bars(title, names, percentages)
 
 # --- Main Application Class ---
 class EmployeeAttendanceApp:
@@ -308,13 +2880,20 @@ class EmployeeAttendanceApp:
         # Define a specific style for the chart display frame to give it a background
         self.style.configure('ChartFrame.TFrame', background="#E0F2F7") # Light Blue for visibility
 
-        self.current_user = None
-        self.mark_status_var = tk.StringVar(value="Present")
-        print("DEBUG: mark_status_var initialized in __init__.") # Stores 'admin' or employee_id
+        self.current_user = None # Stores 'admin' or employee_id
 
         # Initialize the StringVar here so it's always available
         self.mark_status_var = tk.StringVar(value="Present")
 
+        # Long-running DB, report and export work runs here instead of on the Tk thread
+        self.tasks = TaskRunner(self.root)
+        self.tasks.on_progress = self.show_task_progress
+        self.tasks.on_activity = self.show_task_activity
+        self.task_status_bar = None
+
+        # Notebook tabs whose widgets have not been built yet, keyed by frame path
+        self.lazy_tabs = {}
+
         self.login_frame()
 
     def clear_frame(self):
@@ -350,6 +2929,7 @@ class EmployeeAttendanceApp:
         login_frame.grid_columnconfigure(0, weight=1)
         login_frame.grid_columnconfigure(1, weight=1)
 
+    @timed_action
     def admin_login(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
@@ -361,6 +2941,7 @@ class EmployeeAttendanceApp:
         else:
             messagebox.showerror("Login Failed", "Invalid Admin Credentials")
 
+    @timed_action
     def employee_login(self):
         emp_id_str = self.username_entry.get()
         password = self.password_entry.get()
@@ -394,32 +2975,94 @@ class EmployeeAttendanceApp:
         ttk.Label(header_frame, text="Admin Dashboard", font=FONT_LARGE).pack(side="left", padx=10)
         ttk.Button(header_frame, text="Logout", command=self.logout).pack(side="right", padx=10)
 
-        # Notebook for different sections
-        self.admin_notebook = ttk.Notebook(admin_frame)
-        self.admin_notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        # Status bar for background tasks, packed before the notebook so it keeps its space
+        self.task_status_bar = ttk.Frame(admin_frame, style='TFrame')
+        self.task_status_bar.pack(side="bottom", fill="x", padx=10)
+        self.task_status_var = tk.StringVar(value="")
+        ttk.Label(self.task_status_bar, textvariable=self.task_status_var, font=FONT_SMALL).pack(side="left")
+        self.task_cancel_button = ttk.Button(self.task_status_bar, text="Cancel", command=self.tasks.cancel_all, state="disabled")
+        self.task_cancel_button.pack(side="right", padx=5)
+        self.task_progress = ttk.Progressbar(self.task_status_bar, mode="indeterminate", length=200)
+        self.task_progress.pack(side="right", padx=5)
+
+        # Notebook for different sections; each tab is built the first time it is selected
+        self.admin_notebook = self.create_lazy_notebook(admin_frame)
 
         # Employee Management Tab
-        self.employee_tab = ttk.Frame(self.admin_notebook, style='TFrame')
-        self.admin_notebook.add(self.employee_tab, text="Employee Management")
-        self.setup_employee_management_tab(self.employee_tab)
+        self.employee_tab = self.add_lazy_tab(self.admin_notebook, "Employee Management", self.setup_employee_management_tab)
 
         # Attendance Management Tab
-        self.attendance_tab = ttk.Frame(self.admin_notebook, style='TFrame')
-        self.admin_notebook.add(self.attendance_tab, text="Attendance Management")
-        self.setup_attendance_management_tab(self.attendance_tab)
+        self.attendance_tab = self.add_lazy_tab(self.admin_notebook, "Attendance Management", self.setup_attendance_management_tab)
 
-        # Reports & Charts Tab (THIS IS THE KEY PART)
-        self.reports_tab = ttk.Frame(self.admin_notebook, style='TFrame')
-        self.admin_notebook.add(self.reports_tab, text="Reports & Charts") # Ensure this line is present
-        self.setup_reports_charts_tab(self.reports_tab) # Ensure this function call is present
+        # Reports & Charts Tab
+        self.reports_tab = self.add_lazy_tab(self.admin_notebook, "Reports & Charts", self.setup_reports_charts_tab)
 
+        # Diagnostics Tab, only shown when ATTENDANCE_PROFILE is set
+        if PROFILING:
+            self.diagnostics_tab = self.add_lazy_tab(self.admin_notebook, "Diagnostics", self.setup_diagnostics_tab)
+        self.build_selected_tab(self.admin_notebook)
+
+    @timed_action
     def logout(self):
+        self.tasks.cancel_all()
+        self.task_status_bar = None
+        self.lazy_tabs.clear()
         self.current_user = None
         messagebox.showinfo("Logged Out", "You have been logged out.")
         self.login_frame()
 
+    # --- Lazily Built Tabs ---
+    def create_lazy_notebook(self, parent_frame):
+        """Packs a notebook whose tabs added with add_lazy_tab() are built on first selection."""
+        notebook = ttk.Notebook(parent_frame)
+        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        notebook.bind("<<NotebookTabChanged>>", lambda event: self.build_selected_tab(event.widget))
+        return notebook
+
+    def add_lazy_tab(self, notebook, text, setup):
+        """Adds an empty tab; setup(frame) fills it in the first time the tab is selected."""
+        frame = ttk.Frame(notebook, style='TFrame')
+        notebook.add(frame, text=text)
+        self.lazy_tabs[str(frame)] = (frame, setup)
+        return frame
+
+    @timed_action
+    def build_selected_tab(self, notebook):
+        pending = self.lazy_tabs.pop(str(notebook.select()), None)
+        if pending:
+            frame, setup = pending
+            setup(frame)
+
+    def is_tab_built(self, frame):
+        return str(frame) not in self.lazy_tabs
+
+    # --- Background Task Status ---
+    def show_task_activity(self, running_tasks):
+        """Updates the admin status bar when background tasks start or finish."""
+        if self.task_status_bar is None or not self.task_status_bar.winfo_exists():
+            return
+        self.task_progress.stop()
+        if running_tasks:
+            self.task_status_var.set(running_tasks[-1].description)
+            self.task_progress.configure(mode="indeterminate", value=0)
+            self.task_progress.start(10)
+            self.task_cancel_button.configure(state="normal")
+        else:
+            self.task_status_var.set("")
+            self.task_progress.configure(mode="determinate", value=0)
+            self.task_cancel_button.configure(state="disabled")
+
+    def show_task_progress(self, task, done, total, message):
+        """Shows determinate progress reported by a background task."""
+        if self.task_status_bar is None or not self.task_status_bar.winfo_exists():
+            return
+        self.task_progress.stop()
+        self.task_progress.configure(mode="determinate", maximum=max(total, 1), value=done)
+        self.task_status_var.set(message or f"{task.description} {done:,} of {total:,}")
+
     # --- Employee Management Tab ---
     def setup_employee_management_tab(self, parent_frame):
+        load_calendar_module()
         # Left side: Form for Add/Update
         form_frame = ttk.LabelFrame(parent_frame, text="Employee Details", padding="15", style='TFrame')
         form_frame.pack(side="left", fill="y", padx=10, pady=10)
@@ -458,10 +3101,14 @@ class EmployeeAttendanceApp:
         self.search_entry = ttk.Entry(search_frame, width=30)
         self.search_entry.pack(side="left", fill="x", expand=True, padx=5)
         self.search_entry.bind("<KeyRelease>", self.filter_employees)
+        self.employee_search = EmployeeSearch()
+        self.search_after_id = None
         ttk.Button(search_frame, text="Clear Search", command=self.clear_search).pack(side="left", padx=5)
 
 
-        self.employee_tree = ttk.Treeview(list_frame, columns=("ID", "Name", "Join Date", "Salary"), show="headings")
+        # Several employees can be selected (Ctrl/Shift-click) and deleted together
+        self.employee_tree = ttk.Treeview(list_frame, columns=("ID", "Name", "Join Date", "Salary"), show="headings",
+                                          selectmode="extended")
         self.employee_tree.heading("ID", text="ID")
         self.employee_tree.heading("Name", text="Name")
         self.employee_tree.heading("Join Date", text="Join Date")
@@ -485,28 +3132,44 @@ class EmployeeAttendanceApp:
         ttk.Button(tree_button_frame, text="View Details", command=self.view_employee_details).pack(side="left", padx=5)
         ttk.Button(tree_button_frame, text="Delete Employee", command=self.delete_employee_action).pack(side="left", padx=5)
         ttk.Button(tree_button_frame, text="Refresh List", command=self.load_employees_to_tree).pack(side="left", padx=5)
+        ttk.Button(tree_button_frame, text="Import from File...", command=lambda: self.import_file_action("employees")).pack(side="left", padx=5)
 
         self.employee_tree.bind("<<TreeviewSelect>>", self.on_employee_select)
         self.load_employees_to_tree()
 
-    def load_employees_to_tree(self, search_query=""):
-        """Loads all employees into the Treeview, optionally filtered by search_query."""
-        for i in self.employee_tree.get_children():
-            self.employee_tree.delete(i)
-        employees = get_employees(search_query)
-        for emp in employees:
+    def load_employees_to_tree(self, search_query="", refine=False):
+        """Loads all employees into the Treeview, optionally filtered by search_query.
+
+        With refine=True the previous search results may be narrowed in memory;
+        otherwise the employee list is re-read from the database.
+        """
+        if not refine:
+            self.employee_search.invalidate()
+        employees = self.employee_search.search(search_query)
+        self.employee_tree.delete(*self.employee_tree.get_children())
+        for emp in employees[:SEARCH_DISPLAY_LIMIT]:
             self.employee_tree.insert("", "end", values=emp)
 
+    @timed_action
     def filter_employees(self, event=None):
-        """Filters the employee list based on the search entry."""
-        search_query = self.search_entry.get()
-        self.load_employees_to_tree(search_query)
-
+        """Filters the employee list once typing in the search entry pauses."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.run_employee_search)
+
+    @timed_action
+    def run_employee_search(self):
+        self.search_after_id = None
+        if self.search_entry.winfo_exists():
+            self.load_employees_to_tree(self.search_entry.get(), refine=True)
+
+    @timed_action
     def clear_search(self):
         """Clears the search bar and reloads all employees."""
         self.search_entry.delete(0, tk.END)
         self.load_employees_to_tree()
 
+    @timed_action
     def clear_employee_form(self):
         """Clears all entry fields in the employee form."""
         for key, entry in self.emp_entries.items():
@@ -515,6 +3178,7 @@ class EmployeeAttendanceApp:
             else:
                 entry.delete(0, tk.END)
 
+    @timed_action
     def add_employee_action(self):
         name = self.emp_entries["Name"].get()
         join_date = self.emp_entries["Join Date"].get_date().strftime('%Y-%m-%d') # Get date from DateEntry
@@ -526,15 +3190,18 @@ class EmployeeAttendanceApp:
             return
 
         try:
-            salary = float(salary_str)
-        except ValueError:
-            messagebox.showerror("Input Error", "Salary must be a number.")
+            add_employee(name, join_date, salary_str, password)
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid employee details: {e}")
             return
-
-        add_employee(name, join_date, salary, password)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to add employee: {e}")
+            return
+        messagebox.showinfo("Success", f"Employee '{name}' added successfully!")
         self.load_employees_to_tree()
         self.clear_employee_form()
 
+    @timed_action
     def update_employee_action(self):
         emp_id_str = self.emp_entries["ID (for update)"].get()
         name = self.emp_entries["Name"].get()
@@ -551,32 +3218,59 @@ class EmployeeAttendanceApp:
 
         try:
             emp_id = int(emp_id_str)
-            salary = float(salary_str)
         except ValueError:
-            messagebox.showerror("Input Error", "ID and Salary must be numbers.")
+            messagebox.showerror("Input Error", "Employee ID must be a number.")
             return
 
-        update_employee(emp_id, name, join_date, salary, password)
+        try:
+            updated = update_employee(emp_id, name, join_date, salary_str, password)
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid employee details: {e}")
+            return
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to update employee: {e}")
+            return
+        if not updated:
+            messagebox.showerror("Error", f"Employee with ID {emp_id} not found.")
+            return
+        messagebox.showinfo("Success", f"Employee ID {emp_id} updated successfully!")
         self.load_employees_to_tree()
         self.clear_employee_form()
 
+    @timed_action
     def delete_employee_action(self):
-        selected_item = self.employee_tree.selection()
-        if not selected_item:
+        """Deletes every selected employee, with their attendance, in one background transaction."""
+        selected_items = self.employee_tree.selection()
+        if not selected_items:
             messagebox.showwarning("Selection Error", "Please select an employee to delete.")
             return
 
-        emp_id = self.employee_tree.item(selected_item, 'values')[0]
-        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete Employee ID {emp_id}? This will also delete all their attendance records."):
-            delete_employee(emp_id)
+        emp_ids = [self.employee_tree.item(item, 'values')[0] for item in selected_items]
+        if len(emp_ids) == 1:
+            question = f"Are you sure you want to delete Employee ID {emp_ids[0]}? This will also delete all their attendance records."
+        else:
+            question = f"Are you sure you want to delete these {len(emp_ids)} employees? This will also delete all their attendance records."
+        if not messagebox.askyesno("Confirm Delete", question):
+            return
+
+        def deleted(count):
+            if len(emp_ids) == 1:
+                messagebox.showinfo("Success", f"Employee ID {emp_ids[0]} and their attendance records deleted.")
+            else:
+                messagebox.showinfo("Success", f"{count} employees and their attendance records deleted.")
             self.load_employees_to_tree()
             self.clear_employee_form()
 
+        self.tasks.submit(lambda task: delete_employees(emp_ids), on_success=deleted,
+                          on_error=lambda e: messagebox.showerror("Database Error", f"Failed to delete employee: {e}"),
+                          description=f"Deleting {len(emp_ids)} employee(s)...")
+
+    @timed_action
     def on_employee_select(self, event):
         """Populates the form when an employee is selected in the Treeview."""
         selected_item = self.employee_tree.selection()
         if selected_item:
-            values = self.employee_tree.item(selected_item, 'values')
+            values = self.employee_tree.item(selected_item[0], 'values')
             emp_id = values[0]
             employee_details = get_employee_by_id(emp_id) # Fetch full details including password
 
@@ -593,13 +3287,14 @@ class EmployeeAttendanceApp:
                 self.emp_entries["Salary"].insert(0, employee_details[3])
                 self.emp_entries["Password"].insert(0, employee_details[4]) # Populate password field
 
+    @timed_action
     def view_employee_details(self):
         selected_item = self.employee_tree.selection()
         if not selected_item:
             messagebox.showwarning("Selection Error", "Please select an employee to view details.")
             return
 
-        emp_id = self.employee_tree.item(selected_item, 'values')[0]
+        emp_id = self.employee_tree.item(selected_item[0], 'values')[0]
         employee = get_employee_by_id(emp_id)
         if employee:
             details_window = tk.Toplevel(self.root)
@@ -614,7 +3309,7 @@ class EmployeeAttendanceApp:
             ttk.Label(details_window, text=f"Salary: {employee[3]:,.2f}", font=FONT_MEDIUM).pack(pady=5)
 
             ttk.Label(details_window, text="\nAttendance History:", font=FONT_MEDIUM).pack(pady=5)
-            attendance_history = get_attendance_by_employee(emp_id)
+            attendance_history = get_attendance_page(emp_id, limit=11)
             if attendance_history:
                 history_text = "\n".join([f"{date}: {status}" for date, status in attendance_history[:10]]) # Show last 10
                 if len(attendance_history) > 10:
@@ -627,6 +3322,7 @@ class EmployeeAttendanceApp:
 
     # --- Attendance Management Tab (Admin) ---
     def setup_attendance_management_tab(self, parent_frame):
+        load_calendar_module()
         # Top: Mark/Edit Attendance Section
         mark_edit_frame = ttk.LabelFrame(parent_frame, text="Mark/Edit Daily Attendance", padding="15", style='TFrame')
         mark_edit_frame.pack(fill="x", padx=10, pady=10)
@@ -649,6 +3345,29 @@ class EmployeeAttendanceApp:
 
         ttk.Button(mark_edit_frame, text="Mark/Update Attendance", command=self.mark_attendance_action_admin).grid(row=0, column=7, padx=10, sticky="ew")
 
+        # Mark every employee at once, with a list of exceptions getting the other status
+        mark_all_frame = ttk.LabelFrame(parent_frame, text="Mark All Employees for Date", padding="15", style='TFrame')
+        mark_all_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(mark_all_frame, text="Date:").grid(row=0, column=0, sticky="w", pady=5)
+        self.mark_all_date_entry = DateEntry(mark_all_frame, width=12, background=COLOR_PRIMARY,
+                                             foreground='white', borderwidth=2, year=datetime.now().year,
+                                             month=datetime.now().month, day=datetime.now().day,
+                                             date_pattern='yyyy-mm-dd')
+        self.mark_all_date_entry.grid(row=0, column=1, pady=5, padx=5)
+
+        ttk.Label(mark_all_frame, text="Everyone:").grid(row=0, column=2, sticky="w", pady=5)
+        self.mark_all_status_var = tk.StringVar(value="Present")
+        ttk.Radiobutton(mark_all_frame, text="Present", variable=self.mark_all_status_var, value="Present").grid(row=0, column=3, padx=5)
+        ttk.Radiobutton(mark_all_frame, text="Absent", variable=self.mark_all_status_var, value="Absent").grid(row=0, column=4, padx=5)
+
+        ttk.Label(mark_all_frame, text="Except IDs (comma-separated):").grid(row=1, column=0, columnspan=2, sticky="w", pady=5)
+        self.mark_all_exceptions_entry = ttk.Entry(mark_all_frame, width=40)
+        self.mark_all_exceptions_entry.grid(row=1, column=2, columnspan=3, pady=5, padx=5, sticky="ew")
+
+        ttk.Button(mark_all_frame, text="Mark All Employees", command=self.mark_all_attendance_action).grid(row=0, column=5, rowspan=2, padx=10, sticky="ew")
+        ttk.Button(mark_all_frame, text="Import from File...", command=lambda: self.import_file_action("attendance")).grid(row=0, column=6, rowspan=2, padx=10, sticky="ew")
+
         # Middle: View Attendance by Date
         view_by_date_frame = ttk.LabelFrame(parent_frame, text="View Attendance by Date", padding="15", style='TFrame')
         view_by_date_frame.pack(fill="x", padx=10, pady=10)
@@ -691,28 +3410,32 @@ class EmployeeAttendanceApp:
 
         ttk.Button(monthly_frame, text="Calculate Monthly Stats", command=self.calculate_monthly_stats).grid(row=0, column=4, padx=10, sticky="ew")
         ttk.Button(monthly_frame, text="Low Attendance (<50%)", command=self.show_low_attendance).grid(row=0, column=5, padx=10, sticky="ew")
+        ttk.Button(monthly_frame, text="Export Year Payroll...", command=self.export_year_payroll_action).grid(row=0, column=6, padx=10, sticky="ew")
 
-        self.monthly_stats_tree = ttk.Treeview(monthly_frame, columns=("ID", "Name", "Present Days", "Percentage", "Calculated Salary"), show="headings")
+        self.monthly_stats_tree = ttk.Treeview(monthly_frame, columns=("ID", "Name", "Present Days", "Percentage", "Calculated Salary", "Longest Absence"), show="headings")
         self.monthly_stats_tree.heading("ID", text="ID")
         self.monthly_stats_tree.heading("Name", text="Name")
         self.monthly_stats_tree.heading("Present Days", text="Present Days")
         self.monthly_stats_tree.heading("Percentage", text="Percentage (%)")
         self.monthly_stats_tree.heading("Calculated Salary", text="Calculated Salary")
+        self.monthly_stats_tree.heading("Longest Absence", text="Longest Absence (days)")
 
         self.monthly_stats_tree.column("ID", width=50, anchor="center")
         self.monthly_stats_tree.column("Name", width=150)
         self.monthly_stats_tree.column("Present Days", width=100, anchor="center")
         self.monthly_stats_tree.column("Percentage", width=100, anchor="e")
         self.monthly_stats_tree.column("Calculated Salary", width=120, anchor="e")
+        self.monthly_stats_tree.column("Longest Absence", width=140, anchor="center")
 
         # FIX: Changed from .pack() to .grid() to resolve layout manager conflict
-        self.monthly_stats_tree.grid(row=1, column=0, columnspan=6, sticky="nsew", pady=10) # Spanning all 6 columns
+        self.monthly_stats_tree.grid(row=1, column=0, columnspan=7, sticky="nsew", pady=10) # Spanning all 7 columns
 
         # Configure grid weights for expandability
         monthly_frame.grid_rowconfigure(1, weight=1)
-        for i in range(6): # For columns 0 to 5
+        for i in range(7): # For columns 0 to 6
             monthly_frame.grid_columnconfigure(i, weight=1)
 
+    @timed_action
     def mark_attendance_action_admin(self):
         """Action specifically for admin to mark/edit attendance."""
         emp_id_str = self.mark_emp_id_entry.get()
@@ -725,13 +3448,87 @@ class EmployeeAttendanceApp:
 
         try:
             emp_id = int(emp_id_str)
-            mark_attendance(emp_id, date, status)
         except ValueError:
             messagebox.showerror("Input Error", "Employee ID must be a number.")
+            return
+
+        try:
+            mark_attendance(emp_id, date, status)
+            messagebox.showinfo("Success", f"Attendance for Employee ID {emp_id} on {date} recorded as '{status}'.")
+        except ValueError as e: # An archived year, or a date or status the store cannot hold
+            messagebox.showerror("Cannot Mark Attendance", str(e))
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to mark attendance: {e}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
 
 
+    @timed_action
+    def mark_all_attendance_action(self):
+        """Marks every employee for one date; listed exceptions get the opposite status."""
+        date = self.mark_all_date_entry.get_date().strftime('%Y-%m-%d')
+        default_status = self.mark_all_status_var.get()
+        exception_status = "Absent" if default_status == "Present" else "Present"
+
+        try:
+            exception_ids = {int(part) for part in self.mark_all_exceptions_entry.get().split(",") if part.strip()}
+        except ValueError:
+            messagebox.showerror("Input Error", "Exception IDs must be numbers separated by commas.")
+            return
+
+        employee_ids = [emp[0] for emp in get_employees()]
+        unknown_ids = exception_ids.difference(employee_ids)
+        if unknown_ids:
+            messagebox.showerror("Input Error", f"Unknown employee IDs: {', '.join(map(str, sorted(unknown_ids)))}")
+            return
+
+        if not messagebox.askyesno("Confirm", f"Mark {len(employee_ids)} employees as '{default_status}' on {date}"
+                                              f" ({len(exception_ids)} exceptions as '{exception_status}')?"):
+            return
+
+        records = [(emp_id, date, exception_status if emp_id in exception_ids else default_status)
+                   for emp_id in employee_ids]
+
+        def show_summary(summary):
+            summary_text = (f"Attendance for {date}: {summary['inserted']} marked, {summary['updated']} updated.\n"
+                            f"Default status: {default_status}")
+            if exception_ids:
+                summary_text += f"\n{exception_status}: {', '.join(map(str, sorted(exception_ids)))}"
+            messagebox.showinfo("Success", summary_text)
+
+        def show_error(e):
+            if isinstance(e, ValueError): # e.g. the date is in an archived year
+                messagebox.showerror("Cannot Mark Attendance", str(e))
+            else:
+                messagebox.showerror("Database Error", f"Failed to mark attendance: {e}")
+
+        self.tasks.submit(lambda task: mark_attendance_bulk(records), on_success=show_summary, on_error=show_error,
+                          description=f"Marking attendance for {date}...")
+
+    @timed_action
+    def import_file_action(self, kind):
+        """Imports attendance or employees from a CSV or Excel file in the background; bad rows go to a reject file."""
+        file_path = filedialog.askopenfilename(title=f"Import {kind.title()}",
+                                               filetypes=[("CSV or Excel files", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not file_path:
+            return
+        importer = import_employees if kind == "employees" else import_attendance
+
+        def finished(summary):
+            summary_text = (f"{summary['rows']:,} rows read: {summary['inserted']:,} added, "
+                            f"{summary['updated']:,} updated.")
+            if summary['rejected']:
+                summary_text += f"\n{summary['rejected']:,} rows could not be imported; they were saved to:\n{summary['reject_path']}"
+            messagebox.showinfo("Import Finished", summary_text)
+            if kind == "employees":
+                self.load_employees_to_tree()
+
+        self.tasks.submit(lambda task: importer(file_path, progress_callback=task.report_progress),
+                          on_success=finished,
+                          on_error=lambda e: messagebox.showerror("Import Error", f"Failed to import {file_path}:\n{e}"),
+                          description=f"Importing {kind}...")
+
+    @timed_action
     def show_attendance_by_date(self):
         date = self.view_date_entry.get_date().strftime('%Y-%m-%d') # Get date from DateEntry
         if not date:
@@ -741,17 +3538,46 @@ class EmployeeAttendanceApp:
         for i in self.attendance_by_date_tree.get_children():
             self.attendance_by_date_tree.delete(i)
 
-        attendance_records = get_attendance_by_date(date)
-        if not attendance_records:
-            messagebox.showinfo("No Records", f"No attendance records found for {date}.")
+        def show_records(attendance_records):
+            if not attendance_records:
+                messagebox.showinfo("No Records", f"No attendance records found for {date}.")
+                return
+
+            for record in attendance_records:
+                emp_id, emp_name, status = record
+                # If status is None (no record for that date), assume Absent or 'N/A'
+                display_status = status if status else "Absent (No Record)"
+                self.attendance_by_date_tree.insert("", "end", values=(emp_id, emp_name, display_status))
+
+        self.tasks.submit(lambda task: get_attendance_by_date(date), on_success=show_records,
+                          description=f"Loading attendance for {date}...")
+
+    @timed_action
+    def export_year_payroll_action(self):
+        """Exports every month of the entered year (up to this month for the current year) as one payroll report."""
+        try:
+            year = int(self.monthly_year_entry.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Year must be a number.")
+            return
+        today = datetime.now()
+        last_month = today.month if year == today.year else 12
+        if year > today.year:
+            messagebox.showerror("Input Error", f"{year} has not started yet.")
             return
 
-        for record in attendance_records:
-            emp_id, emp_name, status = record
-            # If status is None (no record for that date), assume Absent or 'N/A'
-            display_status = status if status else "Absent (No Record)"
-            self.attendance_by_date_tree.insert("", "end", values=(emp_id, emp_name, display_status))
+        file_path = self.ask_export_path(f"Save Payroll Report {year}", [("Excel files", "*.xlsx"), ("CSV files", "*.csv")])
+        if not file_path:
+            return
+
+        months = [(year, month) for month in range(1, last_month + 1)]
+        self.tasks.submit(lambda task: export_payroll_report(file_path, months, progress_callback=task.report_progress),
+                          on_success=lambda rows_written: messagebox.showinfo(
+                              "Export Success", f"Payroll for {len(months)} months of {year} exported to:\n{file_path}"),
+                          on_error=lambda error: self.export_failed(file_path, error),
+                          description=f"Exporting payroll for {year}...")
 
+    @timed_action
     def calculate_monthly_stats(self):
         year_str = self.monthly_year_entry.get()
         month_str = self.monthly_month_entry.get()
@@ -772,25 +3598,15 @@ class EmployeeAttendanceApp:
         for i in self.monthly_stats_tree.get_children():
             self.monthly_stats_tree.delete(i)
 
-        employees = get_employees()
-        for emp_id, name, _, _ in employees:
-            attendance_percentage = get_monthly_attendance_percentage(emp_id, year, month)
-            calculated_salary = calculate_salary(emp_id, year, month)
+        def show_stats(payroll):
+            for emp_id, name, present_days, attendance_percentage, calculated_salary, absence_streak in payroll:
+                self.monthly_stats_tree.insert("", "end", values=(emp_id, name, present_days, f"{attendance_percentage:.2f}", f"{calculated_salary:,.2f}",
+                                                                  "-" if absence_streak is None else absence_streak))
 
-            # Get present days for display
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT COUNT(*) FROM attendance
-                WHERE employee_id = ?
-                AND STRFTIME('%Y-%m', date) = ?
-                AND status = 'Present'
-            """, (emp_id, f"{year:04d}-{month:02d}"))
-            present_days = cursor.fetchone()[0]
-            conn.close()
-
-            self.monthly_stats_tree.insert("", "end", values=(emp_id, name, present_days, f"{attendance_percentage:.2f}", f"{calculated_salary:,.2f}"))
+        self.tasks.submit(lambda task: get_monthly_payroll_with_streaks(year, month), on_success=show_stats,
+                          description=f"Calculating monthly stats for {month}/{year}...")
 
+    @timed_action
     def show_low_attendance(self):
         year_str = self.monthly_year_entry.get()
         month_str = self.monthly_month_entry.get()
@@ -808,25 +3624,25 @@ class EmployeeAttendanceApp:
             messagebox.showerror("Input Error", f"Invalid year or month: {e}")
             return
 
-        low_attendance_employees = get_employees_low_attendance(year, month, threshold=50)
+        def show_alert(low_attendance_employees):
+            if not low_attendance_employees:
+                messagebox.showinfo("No Low Attendance", f"No employees found with less than 50% attendance for {month}/{year}.")
+                return
 
-        if not low_attendance_employees:
-            messagebox.showinfo("No Low Attendance", f"No employees found with less than 50% attendance for {month}/{year}.")
-            return
+            low_attendance_text = f"Employees with <50% attendance for {month}/{year}:\n\n"
+            for emp_id, name, present_days, absence_streak in low_attendance_employees:
+                # Recalculate percentage for display as get_low_attendance_with_streaks returns present_days
+                _, _, days_in_month = month_window(year, month)
+                percentage = (present_days / days_in_month) * 100 if days_in_month > 0 else 0
+                low_attendance_text += f"ID: {emp_id}, Name: {name}, Present Days: {present_days}, Percentage: {percentage:.2f}%"
+                if absence_streak is not None:
+                    low_attendance_text += f", Longest Absence: {absence_streak} days"
+                low_attendance_text += "\n"
 
-        low_attendance_text = f"Employees with <50% attendance for {month}/{year}:\n\n"
-        for emp_id, name, present_days in low_attendance_employees:
-            # Recalculate percentage for display as get_employees_low_attendance returns present_days
-            if month == 12:
-                next_month_date = datetime(year + 1, 1, 1)
-            else:
-                next_month_date = datetime(year, month + 1, 1)
-            first_day_of_month = datetime(year, month, 1)
-            days_in_month = (next_month_date - first_day_of_month).days
-            percentage = (present_days / days_in_month) * 100 if days_in_month > 0 else 0
-            low_attendance_text += f"ID: {emp_id}, Name: {name}, Present Days: {present_days}, Percentage: {percentage:.2f}%\n"
+            messagebox.showwarning("Low Attendance Alert", low_attendance_text)
 
-        messagebox.showwarning("Low Attendance Alert", low_attendance_text)
+        self.tasks.submit(lambda task: get_low_attendance_with_streaks(year, month, threshold=50), on_success=show_alert,
+                          description=f"Checking low attendance for {month}/{year}...")
 
     # --- Reports & Charts Tab ---
     def setup_reports_charts_tab(self, parent_frame):
@@ -851,11 +3667,19 @@ class EmployeeAttendanceApp:
         ttk.Button(control_frame, text="Generate Employee Chart", command=self.generate_employee_chart).grid(row=1, column=0, columnspan=2, pady=10, padx=5, sticky="ew")
         ttk.Button(control_frame, text="Generate Monthly Bar Chart (All)", command=self.generate_all_employees_bar_chart).grid(row=1, column=2, columnspan=3, pady=10, padx=5, sticky="ew")
         ttk.Button(control_frame, text="Export All Attendance to Excel", command=self.export_all_attendance_to_excel).grid(row=1, column=5, columnspan=2, pady=10, padx=5, sticky="ew")
+        ttk.Button(control_frame, text="Export Changes Since Last Export", command=self.export_attendance_changes_action).grid(row=2, column=5, columnspan=2, pady=(0, 10), padx=5, sticky="ew")
 
         # Frame for charts - Using the custom style 'ChartFrame.TFrame' for background
         self.chart_display_frame = ttk.Frame(parent_frame, style='ChartFrame.TFrame', relief="solid", borderwidth=2)
         self.chart_display_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.chart_panel = None # Created on the first chart, then reused for every chart after it
+
+    def get_chart_panel(self):
+        if self.chart_panel is None:
+            self.chart_panel = ChartPanel(self.chart_display_frame)
+        return self.chart_panel
 
+    @timed_action
     def generate_employee_chart(self):
         emp_id_str = self.chart_emp_id_entry.get()
         year_str = self.chart_year_entry.get()
@@ -875,44 +3699,32 @@ class EmployeeAttendanceApp:
             messagebox.showerror("Input Error", f"Invalid input: {e}")
             return
 
-        employee = get_employee_by_id(emp_id)
+        def load_chart(task):
+            cache_key = chart_cache_key('employee', emp_id, year, month)
+            png = chart_cache.get(cache_key)
+            if png is not None:
+                return cache_key, png, None, None
+            return cache_key, None, get_employee_by_id(emp_id), get_monthly_status_counts(emp_id, year, month)
+
+        self.tasks.submit(load_chart, on_success=lambda data: self.show_employee_chart(emp_id, year, month, *data),
+                          description=f"Loading attendance chart for Employee ID {emp_id}...")
+
+    @timed_action
+    def show_employee_chart(self, emp_id, year, month, cache_key, png, employee, attendance_counts):
+        """Draws the pie chart for one employee's month once its data has loaded, or shows the cached image."""
+        if png is not None:
+            self.get_chart_panel().show_image(png)
+            return
         if not employee:
             messagebox.showerror("Error", f"Employee with ID {emp_id} not found.")
             return
 
-        # Get total days in the month
-        if month == 12:
-            next_month_date = datetime(year + 1, 1, 1)
-        else:
-            next_month_date = datetime(year, month + 1, 1)
-        first_day_of_month = datetime(year, month, 1)
-        days_in_month = (next_month_date - first_day_of_month).days
-
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT status, COUNT(*) FROM attendance
-            WHERE employee_id = ?
-            AND STRFTIME('%Y-%m', date) = ?
-            GROUP BY status
-        """, (emp_id, f"{year:04d}-{month:02d}"))
-        attendance_counts = dict(cursor.fetchall())
-        conn.close()
-
+        _, _, days_in_month = month_window(year, month)
         present_days = attendance_counts.get('Present', 0)
         absent_days = attendance_counts.get('Absent', 0)
         unmarked_days = days_in_month - (present_days + absent_days)
         if unmarked_days < 0: unmarked_days = 0 # Handle cases where data might be inconsistent (e.g., future dates)
 
-        # --- DEBUGGING PRINTS ---
-        print(f"--- Chart Data for Employee ID {emp_id} ({month}/{year}) ---")
-        print(f"Days in month: {days_in_month}")
-        print(f"Attendance counts from DB: {attendance_counts}")
-        print(f"Present days: {present_days}")
-        print(f"Absent days: {absent_days}")
-        print(f"Unmarked days: {unmarked_days}")
-        # --- END DEBUGGING PRINTS ---
-
         labels = ['Present', 'Absent', 'Unmarked']
         sizes = [present_days, absent_days, unmarked_days]
         colors = [COLOR_PRIMARY, COLOR_ERROR, COLOR_WARNING]
@@ -924,34 +3736,16 @@ class EmployeeAttendanceApp:
         if not filtered_data:
             messagebox.showinfo("No Data", f"No attendance data found for Employee ID {emp_id} in {month}/{year} to generate a chart.")
             # Clear any previous chart if no data is found
-            for widget in self.chart_display_frame.winfo_children():
-                widget.destroy()
+            if self.chart_panel:
+                self.chart_panel.clear()
             return
 
         labels, sizes, colors, explode = zip(*filtered_data)
+        panel = self.get_chart_panel()
+        panel.show_pie(f"Attendance for {employee[1]} ({month}/{year})", labels, sizes, colors, explode)
+        panel.snapshot(lambda png: chart_cache.put(cache_key, png))
 
-
-        # Clear previous chart
-        for widget in self.chart_display_frame.winfo_children():
-            widget.destroy()
-
-        # Create the figure and axes
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.pie(sizes, explode=explode, labels=labels, colors=colors, autopct='%1.1f%%',
-               shadow=True, startangle=90)
-        ax.axis('equal') # Equal aspect ratio ensures that pie is drawn as a circle.
-        ax.set_title(f"Attendance for {employee[1]} ({month}/{year})")
-
-        # Embed the matplotlib figure into Tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_display_frame)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.pack(fill="both", expand=True) # Ensure it expands to fill the frame
-        canvas.draw() # Explicitly draw the canvas
-
-        # Close the matplotlib figure to free memory (important in loops/repeated calls)
-        plt.close(fig)
-
-
+    @timed_action
     def generate_all_employees_bar_chart(self):
         year_str = self.chart_year_entry.get()
         month_str = self.chart_month_entry.get()
@@ -969,116 +3763,155 @@ class EmployeeAttendanceApp:
             messagebox.showerror("Input Error", f"Invalid input: {e}")
             return
 
-        employees = get_employees()
-        employee_names = [emp[1] for emp in employees]
-        attendance_percentages = []
-
-        for emp_id, _, _, _ in employees:
-            percentage = get_monthly_attendance_percentage(emp_id, year, month)
-            attendance_percentages.append(percentage)
-
-        # --- DEBUGGING PRINTS ---
-        print(f"--- Bar Chart Data for All Employees ({month}/{year}) ---")
-        print(f"Employee Names: {employee_names}")
-        print(f"Attendance Percentages: {attendance_percentages}")
-        # --- END DEBUGGING PRINTS ---
-
-        # Clear previous chart
-        for widget in self.chart_display_frame.winfo_children():
-            widget.destroy()
+        def load_chart(task):
+            cache_key = chart_cache_key('monthly', None, year, month)
+            png = chart_cache.get(cache_key)
+            if png is not None:
+                return cache_key, png, None
+            return cache_key, None, get_monthly_payroll_with_streaks(year, month)
+
+        self.tasks.submit(load_chart, on_success=lambda data: self.show_all_employees_bar_chart(year, month, *data),
+                          description=f"Loading attendance for {month}/{year}...")
+
+    @timed_action
+    def show_all_employees_bar_chart(self, year, month, cache_key, png, payroll):
+        """Draws the all-employees bar chart once the month's payroll has loaded, or shows the cached image."""
+        if png is not None:
+            self.get_chart_panel().show_image(png)
+            return
+        employee_names = [row[1] for row in payroll]
+        attendance_percentages = [row[3] for row in payroll]
 
         # Check if there's any data to plot
         if not employee_names or all(p == 0 for p in attendance_percentages):
             messagebox.showinfo("No Data", f"No attendance data found for any employee in {month}/{year} to generate a bar chart.")
+            if self.chart_panel:
+                self.chart_panel.clear()
             return
 
+        # Large headcounts are shown as a histogram, so the redraw cost stays bounded
+        panel = self.get_chart_panel()
+        panel.show_percentages(f'Monthly Attendance Percentage for All Employees ({month}/{year})',
+                               employee_names, attendance_percentages)
+        panel.snapshot(lambda png: chart_cache.put(cache_key, png))
 
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(employee_names, attendance_percentages, color=COLOR_PRIMARY)
-        ax.set_ylabel('Attendance Percentage (%)')
-        ax.set_title(f'Monthly Attendance Percentage for All Employees ({month}/{year})')
-        ax.set_ylim(0, 100)
-        plt.xticks(rotation=45, ha='right') # Rotate labels for better readability
-        plt.tight_layout()
-
-        # Add percentage labels on top of bars
-        for bar in bars:
-            yval = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2, yval + 1, f'{yval:.1f}%', ha='center', va='bottom', fontsize=8)
-
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_display_frame)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.pack(fill="both", expand=True)
-        canvas.draw()
-        plt.close(fig) # Close the figure
-
-    def export_all_attendance_to_excel(self):
+    def ask_export_path(self, title, filetypes):
+        """Asks where to save an export and checks the directory is writable; returns None after showing why not."""
         try:
-            file_path = filedialog.asksaveasfilename(defaultextension=".xlsx",
-                                                      filetypes=[("Excel files", "*.xlsx")],
-                                                      title="Save Attendance Data")
-
-            print(f"--- DEBUG: File dialog returned path: '{file_path}' ---")
+            file_path = filedialog.asksaveasfilename(defaultextension=filetypes[0][1][1:],
+                                                      filetypes=filetypes,
+                                                      title=title)
 
             if not file_path:
-                print("--- DEBUG: File save dialog was cancelled or no path selected. ---")
                 messagebox.showinfo("Export Cancelled", "File export was cancelled.")
-                return
+                return None
 
             # Add more robust path validation
             directory = os.path.dirname(file_path)
             if not os.path.exists(directory):
                 print(f"--- ERROR: Directory does not exist: {directory} ---")
                 messagebox.showerror("Export Error", f"The selected directory does not exist:\n{directory}")
-                return
+                return None
 
             if not os.access(directory, os.W_OK):
                 print(f"--- ERROR: No write permissions for directory: {directory} ---")
                 messagebox.showerror("Permission Denied", f"No write permissions for the selected directory:\n'{directory}'.\nPlease choose a different location or run the application as administrator.")
-                return
+                return None
+        except Exception as e:
+            print(f"--- CRITICAL ERROR: Unexpected error during export: {e} ---")
+            messagebox.showerror("Export Error", f"An unexpected error occurred during export:\n{e}\nPlease check the terminal for more details.")
+            return None
+        return file_path
 
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = "Attendance Data"
+    @timed_action
+    def export_all_attendance_to_excel(self):
+        file_path = self.ask_export_path("Save Attendance Data", [("Excel files", "*.xlsx")])
+        if not file_path:
+            return
 
-            # Header row
-            sheet.append(["Employee ID", "Employee Name", "Date", "Status"])
+        self.tasks.submit(lambda task: export_attendance_to_excel(file_path, progress_callback=task.report_progress),
+                          on_success=lambda rows_written: self.export_finished(file_path, rows_written),
+                          on_error=lambda error: self.export_failed(file_path, error),
+                          description="Exporting attendance...")
 
-            conn = sqlite3.connect(DB_NAME)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT e.id, e.name, a.date, a.status
-                FROM employees e
-                JOIN attendance a ON e.id = a.employee_id
-                ORDER BY e.name, a.date
-            """)
-            all_attendance = cursor.fetchall()
-            conn.close()
-
-            print(f"--- DEBUG: Fetched {len(all_attendance)} attendance records from DB. ---")
+    @timed_action
+    def export_attendance_changes_action(self):
+        file_path = self.ask_export_path("Save Attendance Changes", [("Excel files", "*.xlsx"), ("CSV files", "*.csv")])
+        if not file_path:
+            return
 
-            if not all_attendance:
-                messagebox.showinfo("No Data to Export", "No attendance records found in the database to export.")
-                print("--- DEBUG: No attendance data found for export. ---")
+        def finished(rows_written):
+            if not rows_written:
+                messagebox.showinfo("No Changes", f"No attendance changed since the last export. An empty file was saved to:\n{file_path}")
                 return
+            messagebox.showinfo("Export Success", f"{rows_written} changed attendance records exported to:\n{file_path}")
 
-            for record in all_attendance:
-                sheet.append(record)
+        self.tasks.submit(lambda task: export_attendance_changes(file_path, progress_callback=task.report_progress),
+                          on_success=finished,
+                          on_error=lambda error: self.export_failed(file_path, error),
+                          description="Exporting attendance changes...")
 
-            workbook.save(file_path)
-            print(f"--- DEBUG: Workbook successfully saved to '{file_path}' ---")
+    def export_finished(self, file_path, rows_written):
+        if not rows_written:
+            messagebox.showinfo("No Data to Export", "No attendance records found in the database to export.")
+            return
 
-            messagebox.showinfo("Export Success", f"Attendance data exported to:\n{file_path}")
+        messagebox.showinfo("Export Success", f"Attendance data exported to:\n{file_path}")
 
-        except PermissionError as pe:
-            print(f"--- ERROR: Permission denied during save: {pe} ---")
+    def export_failed(self, file_path, error):
+        from openpyxl.utils.exceptions import InvalidFileException # Already loaded by the export
+        if isinstance(error, PermissionError):
+            print(f"--- ERROR: Permission denied during save: {error} ---")
             messagebox.showerror("Permission Denied", f"Permission denied when saving file:\n'{file_path}'.\nPlease choose a different location or run the application as administrator.")
-        except openpyxl.utils.exceptions.InvalidFileException as ife: # Catch specific openpyxl errors
-            print(f"--- ERROR: openpyxl Invalid File Exception: {ife} ---")
-            messagebox.showerror("Export Error", f"Invalid file error during export. Is the file already open or corrupted?\nError: {ife}")
-        except Exception as e:
-            print(f"--- CRITICAL ERROR: Unexpected error during export: {e} ---")
-            messagebox.showerror("Export Error", f"An unexpected error occurred during export:\n{e}\nPlease check the terminal for more details.")
+        elif isinstance(error, InvalidFileException): # Catch specific openpyxl errors
+            print(f"--- ERROR: openpyxl Invalid File Exception: {error} ---")
+            messagebox.showerror("Export Error", f"Invalid file error during export. Is the file already open or corrupted?\nError: {error}")
+        else:
+            print(f"--- CRITICAL ERROR: Unexpected error during export: {error} ---")
+            messagebox.showerror("Export Error", f"An unexpected error occurred during export:\n{error}\nPlease check the terminal for more details.")
+
+    # --- Diagnostics Tab ---
+    def setup_diagnostics_tab(self, parent_frame):
+        button_frame = ttk.Frame(parent_frame, style='TFrame')
+        button_frame.pack(fill="x", padx=10, pady=10)
+        ttk.Button(button_frame, text="Refresh", command=self.refresh_diagnostics).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset_diagnostics).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Save as JSON", command=self.save_diagnostics).pack(side="left", padx=5)
+
+        columns = ("Kind", "Name", "Count", "Mean (ms)", "p95 (ms)", "Max (ms)", "Total (ms)")
+        self.diagnostics_tree = ttk.Treeview(parent_frame, columns=columns, show="headings")
+        for column in columns:
+            self.diagnostics_tree.heading(column, text=column)
+            self.diagnostics_tree.column(column, width=90, anchor="e")
+        self.diagnostics_tree.column("Kind", width=60, anchor="center")
+        self.diagnostics_tree.column("Name", width=420, anchor="w")
+        self.diagnostics_tree.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        """Shows the current latency histograms, the most expensive entries of each kind first."""
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        snapshot = instrumentation_snapshot()
+        for kind in ('action', 'task', 'sql'):
+            for name, stats in snapshot[kind].items():
+                self.diagnostics_tree.insert("", "end", values=(
+                    kind, name, stats['count'], f"{stats['mean_ms']:.3f}", f"{stats['p95_ms']:.3f}",
+                    f"{stats['max_ms']:.3f}", f"{stats['total_ms']:.1f}"))
+
+    def reset_diagnostics(self):
+        reset_instrumentation()
+        self.refresh_diagnostics()
+
+    def save_diagnostics(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")],
+                                                 title="Save Diagnostics")
+        if not file_path:
+            return
+        try:
+            dump_instrumentation(file_path)
+            messagebox.showinfo("Diagnostics Saved", f"Latency histograms saved to:\n{file_path}")
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Could not save diagnostics:\n{e}")
 
 
     # --- Employee Panel ---
@@ -1095,29 +3928,21 @@ class EmployeeAttendanceApp:
         ttk.Label(header_frame, text="Employee Dashboard", font=FONT_LARGE).pack(side="left", padx=10)
         ttk.Button(header_frame, text="Logout", command=self.logout).pack(side="right", padx=10)
 
-        # Notebook for employee sections
-        self.employee_notebook = ttk.Notebook(employee_frame)
-        self.employee_notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        # Notebook for employee sections; each tab is built the first time it is selected
+        self.employee_notebook = self.create_lazy_notebook(employee_frame)
 
         # Details Tab
-        self.emp_details_tab = ttk.Frame(self.employee_notebook, style='TFrame')
-        self.employee_notebook.add(self.emp_details_tab, text="Your Details")
-        self.setup_employee_details_tab(self.emp_details_tab)
+        self.emp_details_tab = self.add_lazy_tab(self.employee_notebook, "Your Details", self.setup_employee_details_tab)
 
         # Attendance Tab
-        self.emp_attendance_tab = ttk.Frame(self.employee_notebook, style='TFrame')
-        self.employee_notebook.add(self.emp_attendance_tab, text="Your Attendance")
-        self.setup_employee_attendance_tab(self.emp_attendance_tab)
+        self.emp_attendance_tab = self.add_lazy_tab(self.employee_notebook, "Your Attendance", self.setup_employee_attendance_tab)
 
-        # NEW: Mark Your Attendance Tab for employees
-        self.emp_mark_attendance_tab = ttk.Frame(self.employee_notebook, style='TFrame')
-        self.employee_notebook.add(self.emp_mark_attendance_tab, text="Mark Your Attendance")
-        self.setup_employee_mark_attendance_tab(self.emp_mark_attendance_tab)
+        # Mark Your Attendance Tab for employees
+        self.emp_mark_attendance_tab = self.add_lazy_tab(self.employee_notebook, "Mark Your Attendance", self.setup_employee_mark_attendance_tab)
 
         # Password Change Tab
-        self.emp_password_tab = ttk.Frame(self.employee_notebook, style='TFrame')
-        self.employee_notebook.add(self.emp_password_tab, text="Change Password")
-        self.setup_employee_password_tab(self.emp_password_tab)
+        self.emp_password_tab = self.add_lazy_tab(self.employee_notebook, "Change Password", self.setup_employee_password_tab)
+        self.build_selected_tab(self.employee_notebook)
 
 
     def setup_employee_details_tab(self, parent_frame):
@@ -1145,10 +3970,10 @@ class EmployeeAttendanceApp:
         self.employee_attendance_tree.column("Status", width=100, anchor="center")
         self.employee_attendance_tree.pack(fill="both", expand=True)
 
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(attendance_history_frame, orient="vertical", command=self.employee_attendance_tree.yview)
-        self.employee_attendance_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        # Scrollbar; scrolling near the end of the loaded rows fetches the next page
+        self.history_scrollbar = ttk.Scrollbar(attendance_history_frame, orient="vertical", command=self.employee_attendance_tree.yview)
+        self.employee_attendance_tree.configure(yscrollcommand=self.on_history_scroll)
+        self.history_scrollbar.pack(side="right", fill="y")
 
         self.load_employee_attendance_history()
 
@@ -1173,7 +3998,7 @@ class EmployeeAttendanceApp:
 
     # NEW: Employee's own attendance marking tab
     def setup_employee_mark_attendance_tab(self, parent_frame):
-        print(f"DEBUG: Setting up employee mark attendance tab. self.mark_status_var exists: {hasattr(self, 'mark_status_var')}")
+        load_calendar_module()
         mark_frame = ttk.LabelFrame(parent_frame, text="Mark Your Daily Attendance", padding="20", style='TFrame')
         mark_frame.pack(fill="x", padx=10, pady=10)
 
@@ -1210,8 +4035,8 @@ class EmployeeAttendanceApp:
                   font=FONT_SMALL, wraplength=450, foreground=COLOR_TEXT).grid(row=4, column=0, columnspan=3, pady=5, sticky="w")
 
 
+    @timed_action
     def mark_attendance_action_employee(self):
-        print(f"DEBUG: mark_attendance_action_employee called. self.mark_status_var exists: {hasattr(self, 'mark_status_var')}")
         """Action specifically for employees to mark their own attendance."""
         emp_id = self.current_user # Directly use the logged-in employee's ID
         date = self.emp_self_mark_date_entry.get_date().strftime('%Y-%m-%d')
@@ -1223,7 +4048,13 @@ class EmployeeAttendanceApp:
 
         try:
             mark_attendance(emp_id, date, status)
-            self.load_employee_attendance_history() # Refresh history in 'Your Attendance' tab
+            messagebox.showinfo("Success", f"Attendance for Employee ID {emp_id} on {date} recorded as '{status}'.")
+            if self.is_tab_built(self.emp_attendance_tab):
+                self.load_employee_attendance_history() # Refresh history in 'Your Attendance' tab
+        except ValueError as e: # e.g. the date is in an archived year
+            messagebox.showerror("Cannot Mark Attendance", str(e))
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to mark attendance: {e}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred while marking attendance: {e}")
 
@@ -1242,6 +4073,7 @@ class EmployeeAttendanceApp:
 
         ttk.Button(password_frame, text="Change Password", command=self.change_employee_password).grid(row=2, column=0, columnspan=2, pady=10, sticky="ew")
 
+    @timed_action
     def change_employee_password(self):
         new_pass = self.new_password_entry.get()
         confirm_pass = self.confirm_new_password_entry.get()
@@ -1254,7 +4086,12 @@ class EmployeeAttendanceApp:
             messagebox.showerror("Password Mismatch", "New password and confirmation do not match.")
             return
 
-        if update_employee_password(self.current_user, new_pass):
+        try:
+            changed = update_employee_password(self.current_user, new_pass)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to change password: {e}")
+            return
+        if changed:
             messagebox.showinfo("Success", "Your password has been changed successfully!")
             self.new_password_entry.delete(0, tk.END)
             self.confirm_new_password_entry.delete(0, tk.END)
@@ -1262,13 +4099,33 @@ class EmployeeAttendanceApp:
             messagebox.showerror("Error", "Failed to change password. Please try again.")
 
     def load_employee_attendance_history(self):
-        """Loads the current employee's attendance into the Treeview."""
+        """Loads the first page of the current employee's attendance into the Treeview."""
         for i in self.employee_attendance_tree.get_children():
             self.employee_attendance_tree.delete(i)
-        attendance_records = get_attendance_by_employee(self.current_user)
+        self.history_last_date = None
+        self.history_exhausted = False
+        self.load_next_history_page()
+
+    @timed_action
+    def load_next_history_page(self):
+        """Appends the next page of older attendance records to the history Treeview."""
+        if self.history_exhausted:
+            return
+        attendance_records = get_attendance_page(self.current_user, before_date=self.history_last_date)
         for record in attendance_records:
             self.employee_attendance_tree.insert("", "end", values=record)
-
+        if len(attendance_records) < ATTENDANCE_PAGE_SIZE:
+            self.history_exhausted = True
+        if attendance_records:
+            self.history_last_date = attendance_records[-1][0]
+
+    def on_history_scroll(self, first, last):
+        """Keeps the scrollbar in sync and loads more rows once the view nears the bottom."""
+        self.history_scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.history_exhausted:
+            self.load_next_history_page()
+
+    @timed_action
     def show_employee_monthly_summary(self):
         year_str = self.emp_summary_year_entry.get()
         month_str = self.emp_summary_month_entry.get()
@@ -1298,6 +4155,10 @@ class EmployeeAttendanceApp:
 # --- Main execution ---
 if __name__ == "__main__":
     init_db() # Initialize database and preload data
+    checkpointer = WalCheckpointer().start()
+    load_gui_modules()
     root = tk.Tk()
     app = EmployeeAttendanceApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.tasks.shutdown()
+    checkpointer.stop()
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Shared fixtures: every test runs against its own temporary database."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emp_attendance_trackerr as tracker  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Points the tracker at an empty, initialized database under tmp_path and returns its path."""
+    saved = tracker.DB_NAME
+    tracker.close_connection()
+    tracker.DB_NAME = str(tmp_path / "attendance.db")
+    tracker.init_db(preload_dummy_data=False)
+    tracker.clear_caches()
+    yield tracker.DB_NAME
+    tracker.close_connection()
+    tracker.clear_caches()
+    tracker.DB_NAME = saved
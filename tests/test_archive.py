@@ -0,0 +1,108 @@
+"""Per-year attendance archives: reads through ATTACH, refused writes and restoring."""
+import os
+from datetime import datetime
+
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+ARCHIVED, LIVE = 2023, 2024
+
+
+@pytest.fixture(params=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+def staff(request, db):
+    """Two employees with attendance in a closed year and the year after, in the given storage."""
+    if request.param == tracker.STORAGE_BITMAP:
+        tracker.migrate_attendance_storage(request.param)
+    ids = tracker.add_employees([("Alice", "2022-01-01", 31000, "pw"), ("Bob", "2022-01-01", 31000, "pw")])
+    tracker.mark_attendance_bulk([(emp_id, f"{year}-{month:02d}-{day:02d}", "Present" if (emp_id + day) % 3 else "Absent")
+                                  for emp_id in ids for year in (ARCHIVED, LIVE) for month in (3, 12) for day in (1, 2, 3)])
+    return ids
+
+
+def reads(ids):
+    """Everything the reports, history and export show for the archived year and the live one."""
+    alice = ids[0]
+    return {
+        "history": tracker.get_attendance_by_employee(alice),
+        "page": tracker.get_attendance_page(alice, f"{LIVE}-03-02", limit=4),
+        "by_date": tracker.get_attendance_by_date(f"{ARCHIVED}-12-02"),
+        "counts": tracker.get_monthly_status_counts(alice, ARCHIVED, 3),
+        "payroll": tracker.get_monthly_payroll(ARCHIVED, 12),
+        "low": tracker.get_employees_low_attendance(ARCHIVED, 3, 100),
+        "live_payroll": tracker.get_monthly_payroll(LIVE, 3),
+        "records": tracker.count_attendance_records(),
+        "export": [row for rows in tracker.iter_attendance_chunks(chunk_size=5) for row in rows],
+    }
+
+
+def test_archived_year_reads_exactly_like_the_live_one(staff):
+    before = reads(staff)
+    assert tracker.archive_year(ARCHIVED) == 12
+    assert tracker.archived_years() == [ARCHIVED]
+    (year, path, records, _), = tracker.get_attendance_archives()
+    assert (year, records) == (ARCHIVED, 12) and os.path.exists(path)
+    assert tracker.get_connection().execute(
+        f"SELECT COUNT(*) FROM {tracker._attendance_days_source()} WHERE date < '{LIVE}-01-01'").fetchone()[0] == 0
+    tracker.clear_caches()
+    assert reads(staff) == before
+
+    # A new connection attaches the archive the first time a query needs it
+    tracker.close_connection()
+    tracker.get_attendance_by_date(f"{LIVE}-03-01")
+    assert tracker._thread_state.archives == {} # A live-year query attaches nothing
+    assert reads(staff) == before
+    assert list(tracker._thread_state.archives) == [ARCHIVED]
+
+
+def test_writes_to_an_archived_year_are_refused(staff, tmp_path):
+    alice, bob = staff
+    tracker.archive_year(ARCHIVED)
+    history = tracker.get_attendance_by_employee(alice)
+    with pytest.raises(ValueError, match=f"Attendance for {ARCHIVED} is archived"):
+        tracker.mark_attendance(alice, f"{ARCHIVED}-03-01", "Absent")
+    with pytest.raises(ValueError, match="archived"):
+        tracker.mark_attendance_bulk([(alice, f"{LIVE}-03-10", "Present"), (bob, f"{ARCHIVED}-06-01", "Present")])
+    assert tracker.get_attendance_by_employee(alice) == history # The bulk write was refused as a whole
+
+    punches = tmp_path / "punches.csv"
+    punches.write_text(f"Employee ID,Date\n{alice},{ARCHIVED}-05-05\n{alice},{LIVE}-05-05\n", encoding="utf-8")
+    summary = tracker.import_attendance(str(punches))
+    assert (summary["inserted"], summary["rejected"]) == (1, 1)
+
+
+def test_archive_year_refuses_open_and_already_archived_years(staff):
+    with pytest.raises(ValueError, match="Only closed years"):
+        tracker.archive_year(datetime.now().year)
+    tracker.archive_year(ARCHIVED)
+    with pytest.raises(ValueError, match="already archived"):
+        tracker.archive_year(ARCHIVED)
+    assert tracker.archive_year(2010) == 0 # Nothing to move
+
+
+def test_a_missing_archive_file_is_an_error_not_an_empty_year(staff):
+    tracker.archive_year(ARCHIVED)
+    (_, path, _, _), = tracker.get_attendance_archives()
+    tracker.close_connection()
+    os.remove(path)
+    with pytest.raises(FileNotFoundError, match=f"archive for {ARCHIVED} is missing"):
+        tracker.get_monthly_payroll(ARCHIVED, 3)
+    assert not os.path.exists(path)
+
+
+def test_restore_and_delete_reach_into_the_archive(staff):
+    alice, bob = staff
+    before = reads(staff)
+    tracker.archive_year(ARCHIVED)
+    (_, path, _, _), = tracker.get_attendance_archives()
+    assert tracker.restore_archived_year(ARCHIVED) == 12
+    assert tracker.archived_years() == [] and not os.path.exists(path)
+    tracker.clear_caches()
+    assert reads(staff) == before
+
+    tracker.archive_year(ARCHIVED)
+    assert tracker.delete_employee(bob)
+    assert tracker.get_attendance_by_date(f"{ARCHIVED}-12-02") == [
+        row for row in before["by_date"] if row[0] == alice]
+    tracker.restore_archived_year(ARCHIVED)
+    assert {row[0] for rows in tracker.iter_attendance_chunks() for row in rows} == {alice}
@@ -0,0 +1,50 @@
+"""The memoized employee, status count, percentage and salary lookups."""
+import sqlite3
+
+import emp_attendance_trackerr as tracker
+
+
+def test_status_counts_are_cached_and_invalidated_by_marking(db):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 31000, "pw")
+    tracker.mark_attendance(emp_id, "2025-03-03", "Present")
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Present": 1}
+    hits = tracker.cache_stats()["status_counts"]["hits"]
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Present": 1}
+    assert tracker.cache_stats()["status_counts"]["hits"] == hits + 1
+
+    tracker.mark_attendance(emp_id, "2025-03-04", "Absent")
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Present": 1, "Absent": 1}
+    tracker.mark_attendance_bulk([(emp_id, "2025-03-04", "Present")])
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Present": 2}
+
+
+def test_cached_counts_cannot_be_changed_by_a_caller(db):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 31000, "pw")
+    tracker.mark_attendance(emp_id, "2025-03-03", "Present")
+    tracker.get_monthly_status_counts(emp_id, 2025, 3)["Present"] = 99
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Present": 1}
+
+
+def test_percentage_and_salary_follow_marks_and_salary_changes(db):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 31000, "pw")
+    tracker.mark_attendance_bulk([(emp_id, f"2025-03-{day:02d}", "Present") for day in range(1, 11)])
+    assert tracker.get_monthly_attendance_percentage(emp_id, 2025, 3) == 10 / 31 * 100
+    assert tracker.calculate_salary(emp_id, 2025, 3) == 10000
+
+    tracker.mark_attendance(emp_id, "2025-03-11", "Present")
+    assert tracker.calculate_salary(emp_id, 2025, 3) == 11000
+    tracker.update_employee(emp_id, "Alice Smith", "2024-01-01", 62000, "pw")
+    assert tracker.calculate_salary(emp_id, 2025, 3) == 22000
+    # The summary figures match the grouped payroll query
+    _, _, _, percentage, salary = tracker.get_monthly_payroll(2025, 3, employee_ids=[emp_id])[0]
+    assert (percentage, salary) == (tracker.get_monthly_attendance_percentage(emp_id, 2025, 3), 22000)
+
+
+def test_writes_from_another_connection_clear_the_caches(db):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 31000, "pw")
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {}
+    other = sqlite3.connect(db)
+    with other:
+        other.execute("INSERT INTO attendance (employee_id, date, status) VALUES (?, '2025-03-03', 'Absent')", (emp_id,))
+    other.close()
+    assert tracker.get_monthly_status_counts(emp_id, 2025, 3) == {"Absent": 1}
@@ -0,0 +1,90 @@
+"""The headless attendance_cli commands, run in-process against a temporary database."""
+import csv
+import io
+import json
+
+import pytest
+
+import attendance_cli
+import emp_attendance_trackerr as tracker
+
+
+@pytest.fixture
+def cli(db, monkeypatch, capsys):
+    """Runs attendance_cli.main() on the test database; returns (exit code, stdout, stderr)."""
+    monkeypatch.setattr(tracker, "DB_PROFILE", tracker.DB_PROFILE) # main() sets it from --profile
+    ids = tracker.add_employees([("Alice", "2024-01-01", 31000, "pw"), ("Bob", "2024-01-01", 62000, "pw")])
+    tracker.mark_attendance_bulk([(ids[0], f"2025-03-{day:02d}", "Present") for day in range(1, 11)]
+                                 + [(ids[1], "2025-03-01", "Absent"), (ids[1], "2025-04-01", "Present")])
+
+    def run(*argv):
+        code = attendance_cli.main(["--db", db] + list(argv))
+        out, err = capsys.readouterr()
+        return code, out, err
+    run.ids = ids
+    return run
+
+
+def rows(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_payroll_over_a_month_range(cli):
+    alice, bob = cli.ids
+    code, out, _ = cli("payroll", "2025-03:2025-04")
+    assert code == 0
+    assert rows(out) == [
+        ["year_month", "employee_id", "name", "present_days", "percentage", "salary"],
+        ["2025-03", str(alice), "Alice", "10", "32.26", "10000.0"],
+        ["2025-03", str(bob), "Bob", "0", "0.0", "0.0"],
+        ["2025-04", str(alice), "Alice", "0", "0.0", "0.0"],
+        ["2025-04", str(bob), "Bob", "1", "3.33", "2066.67"],
+    ]
+    _, out, _ = cli("payroll", "2025-03", "--employee", str(bob))
+    assert [row[1] for row in rows(out)[1:]] == [str(bob)]
+
+
+def test_low_attendance_as_json_lines(cli):
+    code, out, _ = cli("--format", "json", "low-attendance", "2025-03", "--threshold", "50")
+    assert code == 0
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {"year_month": "2025-03", "employee_id": cli.ids[0], "name": "Alice", "present_days": 10, "percentage": 32.26},
+        {"year_month": "2025-03", "employee_id": cli.ids[1], "name": "Bob", "present_days": 0, "percentage": 0.0},
+    ]
+
+
+def test_export_and_incremental_export(cli, tmp_path):
+    bob = cli.ids[1]
+    _, out, _ = cli("export")
+    assert len(rows(out)) == 1 + 12
+    changes = tmp_path / "changes.csv"
+    assert cli("export", "--changes", "--output", str(changes))[0] == 0
+    assert len(rows(changes.read_text(encoding="utf-8"))) == 1 + 12
+    tracker.mark_attendance(bob, "2025-03-01", "Present")
+    _, out, _ = cli("export", "--changes")
+    assert rows(out) == [["employee_id", "name", "date", "status", "change"],
+                         [str(bob), "Bob", "2025-03-01", "Present", "updated"]]
+
+
+def test_import_delete_and_maintenance(cli, tmp_path):
+    bob = cli.ids[1]
+    punches = tmp_path / "punches.csv"
+    punches.write_text(f"Employee ID,Date\n{bob},2025-03-02\n9999,2025-03-02\n", encoding="utf-8")
+    code, out, err = cli("import", str(punches))
+    assert code == 0
+    assert rows(out) == [["rows", "inserted", "updated", "rejected"], ["2", "1", "0", "1"]]
+    assert "1 rows rejected" in err
+
+    code, out, err = cli("delete-employees", str(bob), "9999")
+    assert rows(out) == [["deleted"], ["1"]]
+    assert "1 of the IDs matched no employee" in err
+    for action in ("rebuild-summary", "analyze", "integrity-check"):
+        code, out, _ = cli("maintenance", action)
+        assert code == 0 and rows(out)[1] == [action, "ok"]
+
+
+def test_errors_are_reported_with_a_non_zero_exit(cli, tmp_path):
+    code, _, err = cli("import", str(tmp_path / "missing.csv"))
+    assert code == 1 and err.startswith("Error:")
+    with pytest.raises(SystemExit):
+        cli("payroll", "2025-13")
@@ -0,0 +1,30 @@
+"""Connection profiles and the journal mode stored in the database file."""
+import emp_attendance_trackerr as tracker
+
+
+def journal_mode_writes(conn, mode):
+    """Calls set_journal_mode() and returns the journal_mode assignments it ran."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        tracker.set_journal_mode(conn, mode)
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.replace(" ", "").lower().startswith("pragmajournal_mode=")]
+
+
+def test_set_journal_mode_switches_only_when_the_mode_differs(db):
+    conn = tracker.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert journal_mode_writes(conn, "WAL") == []
+    assert journal_mode_writes(conn, "DELETE") != []
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+
+def test_new_connections_leave_the_journal_mode_alone(db, monkeypatch):
+    tracker.set_journal_mode(tracker.get_connection(), "DELETE")
+    tracker.close_connection()
+    monkeypatch.setattr(tracker, "DB_PROFILE", "default")
+    assert tracker.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    tracker.init_db()
+    assert tracker.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,60 @@
+"""The batch employee API: add_employees, update_employees and delete_employees."""
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+NEW_HIRES = [("Alice Smith", "2024-01-15", 50000, "alice123"),
+             ("Bob Johnson", "15/02/2024", "60,000", "bob456"),
+             ("Charlie Brown", "2024-03-10", 45000.5, "charlie789")]
+
+
+def employees():
+    return tracker.get_connection().execute("SELECT id, name, join_date, salary, password FROM employees ORDER BY id").fetchall()
+
+
+def test_add_employees_returns_new_ids_in_order_and_normalizes_fields(db):
+    ids = tracker.add_employees(NEW_HIRES)
+    assert len(ids) == 3 and ids == sorted(ids)
+    assert employees() == [(ids[0], "Alice Smith", "2024-01-15", 50000.0, "alice123"),
+                           (ids[1], "Bob Johnson", "2024-02-15", 60000.0, "bob456"),
+                           (ids[2], "Charlie Brown", "2024-03-10", 45000.5, "charlie789")]
+    assert tracker.add_employee("Dana White", "2024-04-01", 1, "pw") == ids[-1] + 1
+
+
+@pytest.mark.parametrize("bad, message", [
+    (("", "2024-01-01", 1, "pw"), "name and password are required"),
+    (("Eve", "not a date", 1, "pw"), "unrecognized date"),
+    (("Eve", "2024-01-01", "lots", "pw"), "invalid salary 'lots'"),
+    (("Eve", "2024-01-01", -5, "pw"), "negative salary -5"),
+])
+def test_an_invalid_record_rejects_the_whole_batch(db, bad, message):
+    with pytest.raises(ValueError, match=message):
+        tracker.add_employees(NEW_HIRES + [bad])
+    assert employees() == []
+
+
+def test_update_employees_reports_missing_ids_and_refreshes_cached_rows(db):
+    ids = tracker.add_employees(NEW_HIRES)
+    assert tracker.get_employee_by_id(ids[0])[1] == "Alice Smith"
+    missing = tracker.update_employees([(ids[0], "Alice Jones", "2024-01-15", 55000, "new"), (9999, "Nobody", "2024-01-01", 1, "x")])
+    assert missing == [9999]
+    assert tracker.get_employee_by_id(ids[0]) == (ids[0], "Alice Jones", "2024-01-15", 55000.0, "new")
+    assert tracker.get_employee_by_id(9999) is None
+    assert tracker.update_employee(9999, "Nobody", "2024-01-01", 1, "x") is False
+
+
+def test_delete_employees_removes_attendance_and_summaries(db):
+    ids = tracker.add_employees(NEW_HIRES)
+    tracker.mark_attendance_bulk([(emp_id, f"2025-03-{day:02d}", "Present") for emp_id in ids for day in range(1, 6)])
+    assert tracker.calculate_salary(ids[0], 2025, 3) > 0
+
+    assert tracker.delete_employees([ids[0], ids[1], ids[1], 9999, "not an id"]) == 2
+    conn = tracker.get_connection()
+    assert [row[0] for row in tracker.get_employees()] == [ids[2]]
+    assert conn.execute("SELECT DISTINCT employee_id FROM attendance").fetchall() == [(ids[2],)]
+    assert conn.execute("SELECT DISTINCT employee_id FROM attendance_monthly").fetchall() == [(ids[2],)]
+    assert tracker.get_employee_by_id(ids[0]) is None
+    assert tracker.calculate_salary(ids[0], 2025, 3) == 0
+    assert tracker.get_monthly_status_counts(ids[0], 2025, 3) == {}
+    assert tracker.delete_employees([]) == 0
+    assert tracker.delete_employee(ids[0]) is False
@@ -0,0 +1,35 @@
+"""The streaming Excel export."""
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def test_excel_export_rolls_over_to_a_new_sheet_at_the_row_limit(db, tmp_path, monkeypatch):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 50000, "pw")
+    tracker.mark_attendance_bulk([(emp_id, f"2025-03-{day:02d}", "Present") for day in range(1, 11)])
+    monkeypatch.setattr(tracker, "EXCEL_MAX_ROWS", 4) # Header and three records per sheet
+    path = str(tmp_path / "export.xlsx")
+
+    assert tracker.export_attendance_to_excel(path, chunk_size=4) == 10
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["Attendance Data", "Attendance Data 2", "Attendance Data 3", "Attendance Data 4"]
+    rows = [list(sheet.values) for sheet in workbook.worksheets]
+    assert all(sheet_rows[0] == tuple(tracker.EXPORT_COLUMNS) for sheet_rows in rows)
+    assert [len(sheet_rows) for sheet_rows in rows] == [4, 4, 4, 2]
+    dates = [record[2] for sheet_rows in rows for record in sheet_rows[1:]]
+    assert dates == [f"2025-03-{day:02d}" for day in range(1, 11)]
+
+
+def test_excel_export_below_the_row_limit_is_one_sheet(db, tmp_path):
+    emp_id = tracker.add_employee("Alice Smith", "2024-01-01", 50000, "pw")
+    tracker.mark_attendance(emp_id, "2025-03-03", "Absent")
+    path = str(tmp_path / "export.xlsx")
+
+    assert tracker.export_attendance_to_excel(path) == 1
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["Attendance Data"]
+    assert list(workbook.active.values) == [tuple(tracker.EXPORT_COLUMNS), (emp_id, "Alice Smith", "2025-03-03", "Absent")]
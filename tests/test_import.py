@@ -0,0 +1,101 @@
+"""Streaming CSV/XLSX import of attendance and employees."""
+import csv
+from datetime import datetime
+
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+def rejects(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["Row"], row["Reason"]) for row in csv.DictReader(f)]
+
+
+@pytest.fixture
+def staff(db):
+    return tracker.add_employees([("Alice Smith", "2024-01-01", 1000, "pw"), ("Bob Jones", "2024-01-01", 1000, "pw"),
+                                  ("Bob Jones", "2024-02-01", 1000, "pw")])
+
+
+def test_attendance_import_upserts_and_rejects_bad_rows(staff, tmp_path):
+    alice, bob, _ = staff
+    tracker.mark_attendance(alice, "2025-03-03", "Absent")
+    source = write_csv(tmp_path / "punches.csv", [
+        ["Emp ID", "Employee Name", "Punch Time", "Status"],
+        [alice, "", "2025-03-03 08:55:03", "P"],  # updates the Absent
+        ["", "alice smith", "04/03/2025", "absent"],
+        [bob, "", "2025-03-05T09:00:00", "Present"],
+        [bob, "", "2025-03-05", "Absent"],        # the last row for a day wins
+        ["", "", "", ""],                         # blank line, not counted
+        [9999, "", "2025-03-03", "P"],
+        ["", "Bob Jones", "2025-03-03", "P"],
+        ["", "Nobody", "2025-03-03", "P"],
+        [alice, "", "2025-02-30", "P"],
+        [alice, "", "2025-03-06", "late"],
+    ])
+    summary = tracker.import_attendance(source)
+    assert summary == {"rows": 9, "inserted": 2, "updated": 1, "rejected": 5,
+                       "reject_path": str(tmp_path / "punches.rejects.csv")}
+    assert tracker.get_attendance_by_employee(alice) == [("2025-03-04", "Absent"), ("2025-03-03", "Present")]
+    assert tracker.get_attendance_by_employee(bob) == [("2025-03-05", "Absent")]
+    assert rejects(summary["reject_path"]) == [
+        ("7", "unknown employee ID '9999'"),
+        ("8", "several employees are named 'Bob Jones'; use the employee ID"),
+        ("9", "unknown employee 'Nobody'"),
+        ("10", "unrecognized date '2025-02-30'"),
+        ("11", "invalid status 'late'"),
+    ]
+    # Importing again changes nothing
+    again = tracker.import_attendance(source, reject_path=str(tmp_path / "again.csv"))
+    assert (again["inserted"], again["updated"]) == (0, 3)
+
+
+def test_attendance_import_without_status_uses_the_default(staff, tmp_path):
+    alice, bob, _ = staff
+    source = write_csv(tmp_path / "badge.csv", [["badge_id", "date"], [alice, "2025-03-03"], [bob, "2025-03-03"]])
+    assert tracker.import_attendance(source, chunk_size=1)["inserted"] == 2
+    assert tracker.get_monthly_status_counts(bob, 2025, 3) == {"Present": 1}
+    with pytest.raises(ValueError, match="no Status column"):
+        tracker.import_attendance(source, default_status="Late")
+
+
+def test_attendance_import_needs_a_date_and_an_employee_column(staff, tmp_path):
+    source = write_csv(tmp_path / "bad.csv", [["Employee ID", "Status"], [staff[0], "P"]])
+    with pytest.raises(ValueError, match="needs a Date column"):
+        tracker.import_attendance(source)
+
+
+def test_attendance_import_reads_excel(staff, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Employee ID", "Date", "Status"])
+    workbook.active.append([float(staff[0]), datetime(2025, 3, 3, 8, 30), "A"])
+    path = str(tmp_path / "punches.xlsx")
+    workbook.save(path)
+    assert tracker.import_attendance(path)["inserted"] == 1
+    assert tracker.get_attendance_by_employee(staff[0]) == [("2025-03-03", "Absent")]
+
+
+def test_employee_import_adds_and_updates(staff, tmp_path):
+    alice = staff[0]
+    source = write_csv(tmp_path / "staff.csv", [
+        ["Employee ID", "Employee Name", "Join Date", "Salary", "Password"],
+        [alice, "Alice Jones", "2024-01-01", "2,000", "pw2"],
+        ["", "Carol White", "01/06/2024", "3000", "pw3"],
+        [500, "Dan Green", "2024-07-01", "4000", "pw4"],
+        ["", "Eve Black", "2024-07-01", "-1", "pw5"],
+    ])
+    tracker.get_employee_by_id(alice) # Cached, and must be refreshed by the import
+    summary = tracker.import_employees(source)
+    assert (summary["inserted"], summary["updated"], summary["rejected"]) == (2, 1, 1)
+    assert tracker.get_employee_by_id(alice) == (alice, "Alice Jones", "2024-01-01", 2000.0, "pw2")
+    assert tracker.get_employee_by_id(500) == (500, "Dan Green", "2024-07-01", 4000.0, "pw4")
+    assert [row[1:3] for row in tracker.search_employees("Carol")] == [("Carol White", "2024-06-01")]
+    assert rejects(summary["reject_path"]) == [("5", "negative salary '-1'")]
@@ -0,0 +1,97 @@
+"""The change log and the incremental export's watermark."""
+import csv
+
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+
+def log_size():
+    return tracker.get_connection().execute("SELECT COUNT(*) FROM attendance_changes").fetchone()[0]
+
+
+def export(tmp_path, name):
+    """Runs an incremental CSV export and returns its rows as (employee_id, date, status, change)."""
+    path = tmp_path / name
+    count = tracker.export_attendance_changes(str(path))
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == count
+    return sorted((int(row["Employee ID"]), row["Date"], row["Status"], row["Change"]) for row in rows)
+
+
+@pytest.fixture(params=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+def staff(request, db):
+    if request.param == tracker.STORAGE_BITMAP:
+        tracker.migrate_attendance_storage(request.param)
+    return tracker.add_employees([("Alice", "2024-01-01", 1000, "pw"), ("Bob", "2024-01-01", 1000, "pw")])
+
+
+def test_change_log_stays_off_until_the_first_incremental_export(staff, tmp_path):
+    alice, bob = staff
+    tracker.mark_attendance_bulk([(alice, "2025-03-03", "Present"), (bob, "2025-03-03", "Absent")])
+    tracker.mark_attendance(alice, "2025-03-03", "Absent")
+    assert tracker.get_export_watermark() is None
+    assert log_size() == 0
+
+    assert export(tmp_path, "first.csv") == [(alice, "2025-03-03", "Absent", "new"), (bob, "2025-03-03", "Absent", "new")]
+    tracker.mark_attendance(bob, "2025-03-04", "Present")
+    assert log_size() == 1
+
+
+def test_watermark_moves_forward_and_changes_are_not_emitted_twice(staff, tmp_path):
+    alice, bob = staff
+    tracker.mark_attendance_bulk([(alice, "2025-03-03", "Present"), (bob, "2025-03-03", "Present")])
+    export(tmp_path, "first.csv")
+    first_watermark = tracker.get_export_watermark()
+
+    tracker.mark_attendance(alice, "2025-03-03", "Absent")     # updated
+    tracker.mark_attendance(alice, "2025-03-04", "Present")    # new
+    tracker.mark_attendance(bob, "2025-03-05", "Present")      # new, then back to where it started
+    tracker.delete_employee(bob)                               # deletes 03-03 and 03-05
+    assert export(tmp_path, "second.csv") == [(alice, "2025-03-03", "Absent", "updated"),
+                                              (alice, "2025-03-04", "Present", "new"),
+                                              (bob, "2025-03-03", "", "deleted")]
+    second_watermark = tracker.get_export_watermark()
+    assert second_watermark > first_watermark
+    assert log_size() == 0 # Pruned up to the watermark
+
+    assert export(tmp_path, "third.csv") == []
+    assert tracker.get_export_watermark() == second_watermark
+    tracker.mark_attendance(alice, "2025-03-04", "Absent")
+    assert export(tmp_path, "fourth.csv") == [(alice, "2025-03-04", "Absent", "updated")]
+    assert tracker.get_export_watermark() > second_watermark
+
+
+def test_a_failed_export_leaves_its_changes_for_the_next_run(staff, tmp_path):
+    alice, _ = staff
+    export(tmp_path, "first.csv")
+    tracker.mark_attendance(alice, "2025-03-03", "Present")
+    watermark = tracker.get_export_watermark()
+    with pytest.raises(RuntimeError):
+        with tracker.pending_attendance_changes() as (_, chunks):
+            list(chunks)
+            raise RuntimeError("disk full")
+    assert tracker.get_export_watermark() == watermark
+    assert export(tmp_path, "retry.csv") == [(alice, "2025-03-03", "Present", "new")]
+
+
+def test_a_failed_first_export_starts_the_log_but_exports_everything_next_time(staff, tmp_path):
+    alice, bob = staff
+    tracker.mark_attendance(alice, "2025-03-03", "Present")
+    with pytest.raises(RuntimeError):
+        with tracker.pending_attendance_changes():
+            raise RuntimeError("disk full")
+    assert tracker.get_export_watermark() is None
+    tracker.mark_attendance(bob, "2025-03-03", "Absent")
+    assert log_size() == 1
+    assert export(tmp_path, "first.csv") == [(alice, "2025-03-03", "Present", "new"), (bob, "2025-03-03", "Absent", "new")]
+    assert log_size() == 0
+
+
+def test_init_db_empties_a_log_kept_without_a_watermark(db):
+    conn = tracker.get_connection()
+    conn.execute("INSERT INTO attendance_changes (employee_id, date, old_status, status) VALUES (1, '2025-03-03', NULL, 'Present')")
+    conn.execute("PRAGMA user_version = 5")
+    tracker.init_db(preload_dummy_data=False)
+    assert log_size() == 0
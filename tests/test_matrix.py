@@ -0,0 +1,42 @@
+"""The NumPy attendance matrix agrees with the SQL report queries."""
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture(params=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+def marked(request, db):
+    """Three employees with March 2025 attendance, in the given storage."""
+    ids = tracker.add_employees([("Carol", "2024-01-01", 31000, "pw"), ("Alice", "2024-01-01", 62000, "pw"),
+                                 ("Bob", "2024-01-01", 40000, "pw")])
+    statuses = {ids[0]: "PPAAAPP", ids[1]: "PPPPPPP", ids[2]: "A"}
+    tracker.mark_attendance_bulk([(emp_id, f"2025-03-{day + 1:02d}", "Present" if code == "P" else "Absent")
+                                  for emp_id, codes in statuses.items() for day, code in enumerate(codes)])
+    if request.param == tracker.STORAGE_BITMAP:
+        tracker.migrate_attendance_storage(request.param)
+    return ids
+
+
+def test_matrix_payroll_matches_the_grouped_query(marked):
+    matrix = tracker.load_attendance_matrix(2025, 3)
+    assert matrix.payroll() == tracker.get_monthly_payroll(2025, 3)
+    assert matrix.low_attendance(20) == tracker.get_employees_low_attendance(2025, 3, 20)
+
+
+def test_matrix_streaks(marked):
+    carol, alice, bob = marked
+    rows = {row[0]: row[-1] for row in tracker.get_monthly_payroll_with_streaks(2025, 3)}
+    assert rows == {carol: 3, alice: 0, bob: 1}
+    matrix = tracker.load_attendance_matrix(2025, 3, employee_ids=[carol])
+    assert matrix.longest_streaks().tolist() == [2]
+    assert matrix.current_streaks().tolist() == [2]
+
+
+def test_matrix_spans_months(marked):
+    tracker.mark_attendance(marked[2], "2025-04-02", "Present")
+    matrix = tracker.load_attendance_matrix(2025, 3, months=2)
+    assert matrix.days == 61
+    assert matrix.month_starts.tolist() == [0, 31, 61]
+    assert dict(zip(matrix.employee_ids.tolist(), matrix.present_days().tolist())) == {marked[0]: 4, marked[1]: 7, marked[2]: 1}
@@ -0,0 +1,128 @@
+"""month_window() and the query plans of the monthly report queries.
+
+Every monthly query must be answered by a search on its intended index,
+never by a scan of the attendance table. The SQL each report function
+actually runs is captured with a trace callback and fed to EXPLAIN QUERY
+PLAN, so the test follows the functions if their queries change.
+"""
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emp_attendance_trackerr as tracker  # noqa: E402
+
+YEAR, MONTH = 2025, 3
+EMPLOYEE_ID = 3
+
+# function name -> {storage: index the query over that storage must search}
+INTENDED_INDEX = {
+    "get_monthly_status_counts": {
+        tracker.STORAGE_ROWS: "attendance_monthly USING PRIMARY KEY",
+        tracker.STORAGE_BITMAP: "attendance_bitmap USING PRIMARY KEY",
+    },
+    "get_monthly_payroll": {
+        tracker.STORAGE_ROWS: "USING COVERING INDEX idx_attendance_monthly_month",
+        tracker.STORAGE_BITMAP: "attendance_bitmap USING COVERING INDEX idx_attendance_bitmap_month",
+    },
+    "get_employees_low_attendance": {
+        tracker.STORAGE_ROWS: "USING COVERING INDEX idx_attendance_monthly_month",
+        tracker.STORAGE_BITMAP: "attendance_bitmap USING COVERING INDEX idx_attendance_bitmap_month",
+    },
+    "load_attendance_matrix": {
+        tracker.STORAGE_ROWS: "attendance USING COVERING INDEX idx_attendance_date_employee_status",
+        tracker.STORAGE_BITMAP: "attendance_bitmap USING COVERING INDEX idx_attendance_bitmap_month",
+    },
+}
+
+REPORT_CALLS = {
+    "get_monthly_status_counts": lambda: tracker.get_monthly_status_counts(EMPLOYEE_ID, YEAR, MONTH),
+    "get_monthly_payroll": lambda: tracker.get_monthly_payroll(YEAR, MONTH),
+    "get_employees_low_attendance": lambda: tracker.get_employees_low_attendance(YEAR, MONTH),
+    "load_attendance_matrix": lambda: tracker.load_attendance_matrix(YEAR, MONTH),
+}
+
+SCAN_ATTENDANCE = re.compile(r"\bSCAN (attendance|attendance_monthly|attendance_bitmap)\b")
+
+
+@pytest.fixture(params=[tracker.STORAGE_ROWS, tracker.STORAGE_BITMAP])
+def storage(request, tmp_path):
+    """A temporary database with six months of attendance in the given storage."""
+    saved = tracker.DB_NAME
+    tracker.close_connection()
+    tracker.DB_NAME = str(tmp_path / "attendance.db")
+    tracker.init_db(preload_dummy_data=False)
+    ids = tracker.add_employees([(f"Employee {i}", "2024-01-01", 30000 + i, f"pw{i}") for i in range(60)])
+    tracker.mark_attendance_bulk([(emp_id, f"{YEAR}-{month:02d}-{day:02d}", "Present" if (emp_id + day) % 4 else "Absent")
+                                  for emp_id in ids for month in range(1, 7) for day in range(1, 29)])
+    if request.param == tracker.STORAGE_BITMAP:
+        tracker.migrate_attendance_storage(request.param)
+    tracker.get_connection().execute("ANALYZE")
+    tracker.clear_caches()
+    yield request.param
+    tracker.close_connection()
+    tracker.DB_NAME = saved
+
+
+def report_plans(call):
+    """Runs call() and returns (sql, plan details) for each attendance query it ran."""
+    conn = tracker.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    plans = []
+    for sql in statements:
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")) or "attendance" not in sql:
+            continue
+        if "attendance_archives" in sql:
+            continue
+        plans.append((sql, [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]))
+    return plans
+
+
+@pytest.mark.parametrize("year, month, expected", [
+    (2025, 3, ("2025-03-01", "2025-04-01", 31)),
+    (2025, 12, ("2025-12-01", "2026-01-01", 31)),
+    (2024, 2, ("2024-02-01", "2024-03-01", 29)),
+    (2025, 2, ("2025-02-01", "2025-03-01", 28)),
+])
+def test_month_window(year, month, expected):
+    assert tracker.month_window(year, month) == expected
+
+
+@pytest.mark.parametrize("name", list(REPORT_CALLS))
+def test_monthly_query_uses_intended_index(storage, name):
+    if name == "load_attendance_matrix" and not tracker.load_numpy():
+        pytest.skip("numpy is not installed")
+    plans = report_plans(REPORT_CALLS[name])
+    assert plans, f"{name} ran no attendance query"
+    intended = INTENDED_INDEX[name][storage]
+    for sql, details in plans:
+        plan = "\n".join(details)
+        assert not SCAN_ATTENDANCE.search(plan), f"{name} scans attendance:\n{sql}\n{plan}"
+    assert any(intended in detail for _, details in plans for detail in details), \
+        f"{name} does not search {intended}:\n" + "\n".join("\n".join(details) for _, details in plans)
+
+
+def test_range_predicates_use_covering_indexes(storage):
+    """The month_window() range predicates on the attendance table itself."""
+    if storage != tracker.STORAGE_ROWS:
+        pytest.skip("the attendance table is empty under bitmap storage")
+    first_day, next_month, _ = tracker.month_window(YEAR, MONTH)
+    queries = [
+        ("SELECT status, COUNT(*) FROM attendance WHERE employee_id = ? AND date >= ? AND date < ? GROUP BY status",
+         (EMPLOYEE_ID, first_day, next_month), "idx_attendance_employee_date_status"),
+        ("SELECT employee_id, status FROM attendance WHERE date >= ? AND date < ?",
+         (first_day, next_month), "idx_attendance_date_employee_status"),
+    ]
+    conn = tracker.get_connection()
+    for sql, params, index in queries:
+        plan = "\n".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert f"USING COVERING INDEX {index}" in plan, plan
+        assert not SCAN_ATTENDANCE.search(plan), plan
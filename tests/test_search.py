@@ -0,0 +1,75 @@
+"""Employee search: ID lookups, short LIKE queries and trigram-indexed name queries."""
+import pytest
+
+import emp_attendance_trackerr as tracker
+
+NAMES = ["Alice Smith", "Bob Johnson", "Charlie Brown", "Diana Prince", "Al O'Brien", 'Eve "Evie" Adams', "alicia keys"]
+
+
+@pytest.fixture
+def staff(db):
+    return dict(zip(NAMES, tracker.add_employees([(name, "2024-01-01", 1000, "pw") for name in NAMES])))
+
+
+def names(results):
+    return [row[1] for row in results]
+
+
+def expected(query):
+    """What a plain case-insensitive substring match over the names finds, ordered by name."""
+    return sorted((name for name in NAMES if query.lower() in name.lower()), key=str)
+
+
+def queries_run(call):
+    statements = []
+    conn = tracker.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        return call(), " ".join(statements)
+    finally:
+        conn.set_trace_callback(None)
+
+
+@pytest.mark.parametrize("query", ["a", "Al", "br", "o'", " b "])
+def test_short_queries_match_substrings(staff, query):
+    results, sql = queries_run(lambda: tracker.search_employees(query))
+    assert names(results) == expected(query.strip())
+    assert "employees_fts" not in sql
+
+
+@pytest.mark.parametrize("query", ["ali", "ALICE", "rown", "O'Bri", '"Evie"', "son", "smith", "zzz"])
+def test_trigram_length_queries_use_the_index(staff, query):
+    if not tracker._has_employee_search_index(tracker.get_connection()):
+        pytest.skip("this SQLite build has no FTS5 trigram tokenizer")
+    results, sql = queries_run(lambda: tracker.search_employees(query))
+    assert names(results) == expected(query)
+    assert "employees_fts MATCH" in sql
+
+
+def test_digits_look_up_the_employee_id(staff):
+    bob = staff["Bob Johnson"]
+    assert names(tracker.search_employees(str(bob))) == ["Bob Johnson"]
+    assert tracker.search_employees("999999") == []
+    assert names(tracker.get_employees()) == sorted(NAMES, key=str)
+
+
+def test_the_index_follows_renames_deletes_and_imports(staff, tmp_path):
+    tracker.update_employee(staff["Alice Smith"], "Alice Walker", "2024-01-01", 1000, "pw")
+    tracker.delete_employee(staff["Charlie Brown"])
+    employees = tmp_path / "employees.csv"
+    employees.write_text("Employee Name,Join Date,Salary,Password\nWalker Texas,2024-01-01,1,pw\n", encoding="utf-8")
+    tracker.import_employees(str(employees))
+    assert names(tracker.search_employees("smith")) == []
+    assert names(tracker.search_employees("walker")) == ["Alice Walker", "Walker Texas"]
+    assert names(tracker.search_employees("Brown")) == []
+
+
+def test_incremental_search_narrows_cached_results(staff):
+    search = tracker.EmployeeSearch()
+    assert names(search.search("al")) == expected("al")
+    _, sql = queries_run(lambda: search.search("ali"))
+    assert sql == "" # Extends the previous query: filtered in memory
+    assert names(search.search("alic")) == expected("alic")
+    tracker.add_employee("Alicia Silverstone", "2024-01-01", 1000, "pw")
+    search.invalidate()
+    assert names(search.search("alic")) == sorted(expected("alic") + ["Alicia Silverstone"], key=str)